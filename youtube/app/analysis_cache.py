@@ -0,0 +1,105 @@
+"""Content-addressed cache of LLM video analyses."""
+import hashlib
+import json
+import os
+import threading
+import time
+
+from arcade_youtube.core.cache import MetadataCache
+
+ANALYSIS_CACHE_PATH = os.getenv(
+    "ANALYSIS_CACHE_PATH", os.path.expanduser("~/.cache/arcade_youtube/analyses.sqlite3")
+)
+# Seconds an analysis is served from cache; unset keeps analyses until evicted
+ANALYSIS_CACHE_TTL = float(os.getenv("ANALYSIS_CACHE_TTL") or "inf")
+ANALYSIS_CACHE_MAX_ENTRIES = int(os.getenv("ANALYSIS_CACHE_MAX_ENTRIES", "10000"))
+
+
+def analysis_fingerprint(**settings: object) -> str:
+    """Hash everything that shapes an analysis besides the video itself.
+
+    Pass the prompt templates, model and temperature; changing any of them
+    yields a new fingerprint, so entries made with the old settings are never
+    served again and age out of the LRU."""
+    encoded = json.dumps(settings, sort_keys=True).encode()
+    return hashlib.sha256(encoded).hexdigest()[:16]
+
+
+class AnalysisCache:
+    """Analyses keyed by video ID and settings fingerprint, with optional TTL and LRU eviction.
+
+    Stored in its own `MetadataCache`, so hits are served from memory or a single
+    SQLite lookup and the cache survives restarts."""
+
+    def __init__(
+        self,
+        path: str = ANALYSIS_CACHE_PATH,
+        ttl: float = ANALYSIS_CACHE_TTL,
+        max_entries: int = ANALYSIS_CACHE_MAX_ENTRIES,
+    ):
+        self._cache = MetadataCache(path, max_entries=max_entries)
+        self.ttl = ttl
+
+    @property
+    def stats(self):
+        return self._cache.stats
+
+    def get(self, video_id: str, fingerprint: str) -> dict | None:
+        """Return a cached analysis that is still within its TTL."""
+        entry = self._cache.get(f"analyses:{fingerprint}", video_id)
+        if entry is None:
+            self._cache.stats.misses += 1
+            return None
+        if not entry.is_fresh(self.ttl, time.time()):
+            self._cache.stats.stale += 1
+            return None
+        self._cache.stats.hits += 1
+        return entry.value
+
+    def put(self, video_id: str, fingerprint: str, analysis: dict) -> None:
+        self._cache.put(f"analyses:{fingerprint}", video_id, analysis, None, video_id)
+
+    def channel_reputation(self, channel: str, fingerprint: str) -> dict | None:
+        """Return the running tally of LLM analyses for a channel's videos."""
+        entry = self._cache.get(f"channels:{fingerprint}", channel)
+        return entry.value if entry is not None else None
+
+    def record_channel(self, channel: str, fingerprint: str, analysis: dict) -> None:
+        """Fold an LLM analysis of one of a channel's videos into its reputation."""
+        reputation = self.channel_reputation(channel, fingerprint) or {
+            "count": 0,
+            "score_sum": 0.0,
+            "score_squares": 0.0,
+            "topics": {},
+            "age_appropriateness": {},
+            "learning_potential": {},
+            "concerns": {},
+        }
+        score = float(analysis["educational_score"])
+        reputation["count"] += 1
+        reputation["score_sum"] += score
+        reputation["score_squares"] += score * score
+        for key in ("topics", "concerns"):
+            for value in analysis.get(key, []):
+                reputation[key][value] = reputation[key].get(value, 0) + 1
+        for key in ("age_appropriateness", "learning_potential"):
+            value = analysis.get(key)
+            reputation[key][value] = reputation[key].get(value, 0) + 1
+        self._cache.put(f"channels:{fingerprint}", channel, reputation, None, channel)
+
+    def clear(self) -> None:
+        self._cache.clear()
+
+
+_default_cache: AnalysisCache | None = None
+_default_cache_lock = threading.Lock()
+
+
+def get_analysis_cache() -> AnalysisCache:
+    """Return the process-wide analysis cache, creating it on first use."""
+    global _default_cache
+    if _default_cache is None:
+        with _default_cache_lock:
+            if _default_cache is None:
+                _default_cache = AnalysisCache()
+    return _default_cache
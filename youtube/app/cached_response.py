@@ -0,0 +1,105 @@
+"""Build-once responses served from memory with ETags and precompressed variants."""
+import gzip
+import hashlib
+import os
+import threading
+from collections.abc import Callable
+from dataclasses import dataclass
+from pathlib import Path
+
+from fastapi import Request, Response
+
+# Rebuild file-backed responses when the file changes; run.py turns this on for development
+RELOAD_ASSETS = os.getenv("RELOAD_ASSETS", "").lower() in ("1", "true", "yes")
+
+
+def _brotli_compress(body: bytes) -> bytes | None:
+    """Compress with brotli when the optional brotli package is installed."""
+    try:
+        import brotli
+    except ImportError:
+        return None
+    return brotli.compress(body, quality=11)
+
+
+def _accepted_encodings(header: str) -> set[str]:
+    accepted = set()
+    for part in header.split(","):
+        coding, _, params = part.strip().partition(";")
+        # Codings with q=0 are explicitly refused
+        quality = params.strip().removeprefix("q=")
+        if params and quality.replace(".", "").strip("0") == "":
+            continue
+        accepted.add(coding.strip().lower())
+    return accepted
+
+
+@dataclass(frozen=True)
+class _Variant:
+    body: bytes
+    etag: str
+    encoding: str | None
+
+
+class CachedResponse:
+    """A response body built once, compressed once and revalidated by ETag.
+
+    Each encoding gets its own strong ETag, since its bytes differ. Requests
+    whose If-None-Match names the ETag of the variant they would receive get an
+    empty 304."""
+
+    def __init__(
+        self,
+        build: Callable[[], bytes],
+        media_type: str,
+        cache_control: str,
+        source: Path | None = None,
+    ):
+        self._build = build
+        self.media_type = media_type
+        self.cache_control = cache_control
+        self._source = source
+        self._source_mtime: float | None = None
+        self._variants: dict[str | None, _Variant] | None = None
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_file(cls, path: Path, media_type: str, cache_control: str) -> "CachedResponse":
+        return cls(path.read_bytes, media_type, cache_control, source=path)
+
+    def _current_variants(self) -> dict[str | None, _Variant]:
+        mtime = self._source.stat().st_mtime if self._source and RELOAD_ASSETS else None
+        variants = self._variants
+        if variants is not None and mtime == self._source_mtime:
+            return variants
+        with self._lock:
+            if self._variants is None or mtime != self._source_mtime:
+                body = self._build()
+                digest = hashlib.sha256(body).hexdigest()[:32]
+                encoded = {None: body, "gzip": gzip.compress(body, compresslevel=9, mtime=0)}
+                compressed = _brotli_compress(body)
+                if compressed is not None:
+                    encoded["br"] = compressed
+                self._variants = {
+                    encoding: _Variant(data, f'"{digest}-{encoding or "identity"}"', encoding)
+                    for encoding, data in encoded.items()
+                }
+                self._source_mtime = mtime
+            return self._variants
+
+    def respond(self, request: Request) -> Response:
+        variants = self._current_variants()
+        accepted = _accepted_encodings(request.headers.get("accept-encoding", ""))
+        encoding = next((e for e in ("br", "gzip") if e in accepted and e in variants), None)
+        variant = variants[encoding]
+        headers = {
+            "ETag": variant.etag,
+            "Cache-Control": self.cache_control,
+            "Vary": "Accept-Encoding",
+        }
+        if_none_match = request.headers.get("if-none-match", "")
+        if variant.etag in (tag.strip().removeprefix("W/") for tag in if_none_match.split(",")):
+            return Response(status_code=304, headers=headers)
+        if encoding:
+            headers["Content-Encoding"] = encoding
+        return Response(variant.body, media_type=self.media_type, headers=headers)
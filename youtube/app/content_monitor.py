@@ -1,11 +1,23 @@
-import json
+import asyncio
+import hashlib
 import logging
 import os
+import threading
+import time
+import weakref
+from collections.abc import AsyncGenerator, AsyncIterator, Iterable, Iterator
+from contextlib import aclosing
 from typing import Annotated, Any
 
 from google.oauth2.credentials import Credentials
-from openai import OpenAI
+from openai import AsyncOpenAI
+from pydantic import ValidationError
 
+from app.analysis_cache import analysis_fingerprint, get_analysis_cache
+from app.json_stream import JSONObjectStream
+from app.models import AIAnalysis
+from app.preclassifier import PRECLASSIFIER_THRESHOLD, analysis_stats, preclassify
+from arcade_youtube.core.coalesce import get_single_flight
 from arcade_youtube.tools.youtube_client import get_watch_history
 
 # Configure logging to only show WARNING and above
@@ -15,25 +27,19 @@ logging.getLogger("openai").setLevel(logging.WARNING)
 logging.getLogger("httpcore").setLevel(logging.WARNING)
 logging.getLogger("httpx").setLevel(logging.WARNING)
 
-async def analyze_latest_video(
-    credentials: Annotated[Credentials, "OAuth credentials for YouTube API"],
-) -> Annotated[dict[str, Any], "Analysis results including video details and AI assessment"]:
-    """Analyze the educational value of the most recently watched video using AI."""
+ANALYSIS_MODEL = "gpt-4"
+ANALYSIS_TEMPERATURE = 0.3
 
-    history = await get_watch_history(None, credentials=credentials, limit=1)
-
-    if not history:
-        return {"error": "No watch history found"}
+SYSTEM_PROMPT = (
+    "You are an expert in educational content analysis, with deep knowledge of "
+    "how games and interactive content can provide educational value. Consider "
+    "both direct educational content and indirect learning benefits "
+    "when analyzing content."
+)
 
-    video = history[0]
-
-    prompt = f"""Based on the text content from a video, analyze its educational value:
-
-Title: {video['title']}
-Channel: {video['channel_title']}
-Description: {video.get('description', '')}
-
-Please analyze this content and provide:
+# Criteria and output fields shared by the single-video and batch prompts. The fields
+# are the ones `app.models.AIAnalysis` validates.
+ANALYSIS_CRITERIA = """Please analyze this content and provide:
 1. Educational value (score 0-10)
 2. Main topics/subjects covered
 3. Age appropriateness
@@ -46,57 +52,339 @@ Important considerations for board games and educational content:
 - They can develop various skills (problem-solving, decision-making, social interaction)
 - Even entertainment-focused games can have significant educational value
 - Consider both direct educational content (e.g., historical facts) and indirect learning
-  (e.g., strategic thinking)
+  (e.g., strategic thinking)"""
 
-Format the response as a JSON object with these fields:
-- educational_score (number 0-10)
+ANALYSIS_FIELDS = """- educational_score (number 0-10)
 - topics (array of strings, include both primary and secondary topics)
 - age_appropriateness (string: "Young Children", "Teens", "Adults", or "All Ages")
 - learning_potential (string: "High", "Medium", or "Low")
 - concerns (array of strings, empty if none)
 - explanation (string explaining the score and analysis, including both direct and indirect
-  educational benefits)
+  educational benefits)"""
 
-Note: You are analyzing the provided text content only, not watching any video."""
+TEXT_ONLY_NOTE = "Note: You are analyzing the provided text content only, not watching any video."
 
-    # Initialize OpenAI client with Arcade configuration
-    arcade_api_key = os.environ.get("ARCADE_API_KEY")
-    cloud_host = "https://api.arcade.dev/v1"
+PROMPT_TEMPLATE = f"""Based on the text content from a video, analyze its educational value:
 
-    client = OpenAI(
-        api_key=arcade_api_key,
-        base_url=cloud_host,
-    )
+Title: {{title}}
+Channel: {{channel_title}}
+Description: {{description}}
 
-    response = client.chat.completions.create(
-        messages=[
-            {
-                "role": "system",
-                "content": (
-                    "You are an expert in educational content analysis, with deep knowledge of "
-                    "how games and interactive content can provide educational value. Consider "
-                    "both direct educational content and indirect learning benefits "
-                    "when analyzing content."
-                )
-            },
-            {"role": "user", "content": prompt}
-        ],
-        model="gpt-4",
-        temperature=0.3
-    )
+{ANALYSIS_CRITERIA}
+
+Format the response as a JSON object with these fields:
+{ANALYSIS_FIELDS}
+
+{TEXT_ONLY_NOTE}"""
+
+# Several videos per request share the instructions above, amortizing their tokens
+BATCH_INSTRUCTION = (
+    "Based on the text content from several videos, analyze the educational value of each one:"
+)
+BATCH_PROMPT_TEMPLATE = f"""{BATCH_INSTRUCTION}
+
+{{videos}}
+
+{ANALYSIS_CRITERIA}
+
+For each video, produce a JSON object with these fields:
+{ANALYSIS_FIELDS}
+
+Format the response as a single JSON object mapping each video ID to its analysis.
+
+{TEXT_ONLY_NOTE}"""
+
+BATCH_VIDEO_TEMPLATE = """Video ID: {video_id}
+Title: {title}
+Channel: {channel_title}
+Description: {description}"""
+
+# LLM requests in flight at once while analyzing many videos
+ANALYSIS_MAX_CONCURRENCY = int(os.getenv("ANALYSIS_MAX_CONCURRENCY", "4"))
+
+# OpenAI-compatible endpoint serving the analysis model; point it at a stub for load tests
+LLM_BASE_URL = os.getenv("LLM_BASE_URL", "https://api.arcade.dev/v1")
+
+# Seconds an LLM request may take, and retries of connection errors and 5xx responses
+LLM_TIMEOUT = 120.0
+LLM_MAX_RETRIES = 2
+
+# Change whenever the prompts, model or temperature change, invalidating cached analyses
+ANALYSIS_FINGERPRINT = analysis_fingerprint(
+    system_prompt=SYSTEM_PROMPT,
+    prompt_template=PROMPT_TEMPLATE,
+    model=ANALYSIS_MODEL,
+    temperature=ANALYSIS_TEMPERATURE,
+)
+BATCH_ANALYSIS_FINGERPRINT = analysis_fingerprint(
+    system_prompt=SYSTEM_PROMPT,
+    prompt_template=BATCH_PROMPT_TEMPLATE,
+    video_template=BATCH_VIDEO_TEMPLATE,
+    model=ANALYSIS_MODEL,
+    temperature=ANALYSIS_TEMPERATURE,
+)
+
+async def analyze_latest_video(
+    credentials: Annotated[Credentials, "OAuth credentials for YouTube API"],
+) -> Annotated[dict[str, Any], "Analysis results including video details and AI assessment"]:
+    """Analyze the educational value of the most recently watched video using AI."""
+
+    history = await get_watch_history(None, credentials=credentials, limit=1)
+
+    if not history:
+        return {"error": "No watch history found"}
+
+    video = history[0]
+
+    # Repeat visits and obvious videos are answered locally, skipping the LLM
+    started = time.perf_counter()
+    analysis, escalated = _local_analysis(video, started)
+    if analysis is None:
+        try:
+            analysis = await _request_analysis(video)
+        except ValidationError as e:
+            return {"error": f"Invalid analysis from the AI: {e}"}
+        _record_llm_analysis(video, ANALYSIS_FINGERPRINT, analysis, started, escalated)
+
+    return _video_result(video, analysis)
+
+
+async def stream_latest_video_analysis(
+    credentials: Annotated[Credentials, "OAuth credentials for YouTube API"],
+) -> AsyncIterator[dict[str, Any]]:
+    """Analyze the most recently watched video, yielding the analysis field by field.
+
+    Yields {"video": ...} with the video details first, then {"field": ..., "value": ...}
+    for each analysis field as soon as the model has finished writing it, and
+    finally {"ai_analysis": ...} with the complete analysis. Failures are yielded
+    as {"error": ...}."""
+    history = await get_watch_history(None, credentials=credentials, limit=1)
+
+    if not history:
+        yield {"error": "No watch history found"}
+        return
+
+    video = history[0]
+    details = _video_result(video, {})
+    del details["ai_analysis"]
+    yield {"video": details}
+
+    started = time.perf_counter()
+    analysis, escalated = _local_analysis(video, started)
+    if analysis is not None:
+        for event in _replay_analysis(analysis):
+            yield event
+        return
 
-    # Extract JSON from markdown code block if present
-    content = response.choices[0].message.content
-    if "```json" in content:
-        # Find the JSON block between ```json and ```
-        json_start = content.find("```json") + 7
-        json_end = content.find("```", json_start)
-        content = content[json_start:json_end].strip()
+    # Join an analysis of the same video that is already in flight, e.g. from the
+    # monitor worker or another tab, rather than asking the LLM a second time
+    prompt = _analysis_prompt(video)
+    key = _analysis_key([video], prompt)
+    future, leader = get_single_flight().claim(key)
+    if not leader:
+        try:
+            joined = await asyncio.shield(future)
+        except Exception as e:
+            yield {"error": str(e)}
+            return
+        for event in _replay_analysis(joined):
+            yield event
+        return
 
-    # Parse the JSON content
-    analysis = json.loads(content)
+    # Closed with this generator, so joined callers hear about a disconnect at once
+    events = _lead_streamed_analysis(video, prompt, key, started, escalated)
+    async with aclosing(events):
+        async for event in events:
+            yield event
 
-    data = {
+
+def _replay_analysis(analysis: dict[str, Any]) -> Iterator[dict[str, Any]]:
+    """Stream events for an analysis that is already complete."""
+    for field, value in analysis.items():
+        yield {"field": field, "value": value}
+    yield {"ai_analysis": analysis}
+
+
+async def _lead_streamed_analysis(
+    video: dict[str, Any], prompt: str, key: tuple, started: float, escalated: bool
+) -> AsyncGenerator[dict[str, Any], None]:
+    """Stream a new LLM analysis, then settle it for the callers that joined it.
+
+    Only a complete analysis that matches the AIAnalysis schema is shared and
+    cached; anything else is rejected, so joined callers see the error too."""
+    coalescer = get_single_flight()
+    analysis = {}
+    try:
+        async for field, value in _stream_fields(prompt):
+            analysis[field] = value
+            yield {"field": field, "value": value}
+    except Exception as e:
+        coalescer.reject(key, e)
+        yield {"error": str(e)}
+        return
+    except BaseException as e:
+        # The client went away mid-stream; don't leave joined callers waiting
+        cancelled = e if isinstance(e, asyncio.CancelledError) else asyncio.CancelledError()
+        coalescer.reject(key, cancelled)
+        raise
+    try:
+        analysis = _validate_analysis(analysis)
+    except ValidationError as e:
+        coalescer.reject(key, e)
+        yield {"error": f"Invalid analysis from the AI: {e}"}
+        return
+    coalescer.resolve(key, analysis)
+    _record_llm_analysis(video, ANALYSIS_FINGERPRINT, analysis, started, escalated)
+    yield {"ai_analysis": analysis}
+
+
+async def analyze_videos(
+    videos: Annotated[Iterable[dict[str, Any]], "Watch history items to analyze"],
+    max_concurrency: Annotated[
+        int, "Maximum LLM requests in flight"
+    ] = ANALYSIS_MAX_CONCURRENCY,
+    batch_size: Annotated[int, "Videos packed into a single LLM request"] = 1,
+) -> AsyncIterator[dict[str, Any]]:
+    """Analyze many videos concurrently, yielding each result as soon as it is ready.
+
+    Cached and confidently pre-classified analyses are yielded first. The remaining
+    videos are grouped into requests of `batch_size` videos, of which at most
+    `max_concurrency` run at once. A video whose analysis fails or does not match
+    the AIAnalysis schema is yielded with an "error" instead of an "ai_analysis"."""
+    started = time.perf_counter()
+    answered, pending, escalations = _partition_local(videos, started)
+    for result in answered:
+        yield result
+
+    semaphore = asyncio.Semaphore(max_concurrency)
+
+    async def analyze_batch(batch: list[dict[str, Any]]) -> list[dict[str, Any]]:
+        async with semaphore:
+            try:
+                analyses, fingerprint = await _request_batch(batch)
+            except Exception as e:
+                return [{"video_id": video["video_id"], "error": str(e)} for video in batch]
+        return _batch_results(batch, analyses, fingerprint, started, escalations)
+
+    size = max(batch_size, 1)
+    batches = [pending[start:start + size] for start in range(0, len(pending), size)]
+    tasks = [asyncio.create_task(analyze_batch(batch)) for batch in batches]
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            for result in await next_done:
+                yield result
+    finally:
+        for task in tasks:
+            task.cancel()
+
+
+def _partition_local(
+    videos: Iterable[dict[str, Any]], started: float
+) -> tuple[list[dict[str, Any]], list[dict[str, Any]], set[str]]:
+    """Split distinct videos into results answered locally and videos left for the LLM.
+
+    Also returns the IDs of the videos the pre-classifier escalated."""
+    answered = []
+    pending = []
+    escalations = set()
+    for video in {video["video_id"]: video for video in videos}.values():
+        analysis, escalated = _local_analysis(video, started)
+        if analysis is not None:
+            answered.append(_video_result(video, analysis))
+            continue
+        pending.append(video)
+        if escalated:
+            escalations.add(video["video_id"])
+    return answered, pending, escalations
+
+
+async def _request_batch(batch: list[dict[str, Any]]) -> tuple[dict[str, Any], str]:
+    """Ask the LLM about a batch, returning analyses keyed by video ID and their fingerprint."""
+    if len(batch) == 1:
+        analysis = await _request_analysis(batch[0])
+        return {batch[0]["video_id"]: analysis}, ANALYSIS_FINGERPRINT
+    return await _request_batch_analysis(batch), BATCH_ANALYSIS_FINGERPRINT
+
+
+def _batch_results(
+    batch: list[dict[str, Any]],
+    analyses: dict[str, Any],
+    fingerprint: str,
+    started: float,
+    escalations: set[str],
+) -> list[dict[str, Any]]:
+    """Validate and record each video's analysis from a batch response."""
+    results = []
+    for video in batch:
+        if video["video_id"] not in analyses:
+            results.append({"video_id": video["video_id"], "error": "No analysis returned"})
+            continue
+        try:
+            analysis = _validate_analysis(analyses[video["video_id"]])
+        except ValidationError as e:
+            results.append({"video_id": video["video_id"], "error": str(e)})
+            continue
+        escalated = video["video_id"] in escalations
+        _record_llm_analysis(video, fingerprint, analysis, started, escalated)
+        results.append(_video_result(video, analysis))
+    return results
+
+
+def _local_analysis(
+    video: dict[str, Any], started: float
+) -> tuple[dict[str, Any] | None, bool]:
+    """Answer from the cache or the pre-classifier without calling the LLM.
+
+    Returns the analysis, or None and whether a pre-classifier rule applied but
+    was not confident enough, i.e. the video is being escalated to the LLM."""
+    analysis = _cached_analysis(video["video_id"])
+    if analysis is not None:
+        analysis_stats.record("cache", started)
+        return analysis, False
+    classification = preclassify(video, get_analysis_cache(), ANALYSIS_FINGERPRINT)
+    if classification is None:
+        return None, False
+    if classification.confidence < PRECLASSIFIER_THRESHOLD:
+        return None, True
+    analysis_stats.record("preclassifier", started)
+    return {**classification.analysis, "confidence": classification.confidence}, False
+
+
+def _validate_analysis(analysis: Any) -> dict[str, Any]:
+    """Check an LLM response against the AIAnalysis schema, raising ValidationError."""
+    return AIAnalysis.model_validate(analysis).model_dump(exclude_none=True)
+
+
+def _record_llm_analysis(
+    video: dict[str, Any],
+    fingerprint: str,
+    analysis: dict[str, Any],
+    started: float,
+    escalated: bool,
+) -> None:
+    """Cache an LLM analysis and learn the channel's reputation from it.
+
+    Only pass analyses that went through `_validate_analysis`; anything cached
+    here is served without the LLM until it expires."""
+    cache = get_analysis_cache()
+    cache.put(video["video_id"], fingerprint, analysis)
+    cache.record_channel(video.get("channel_title", ""), ANALYSIS_FINGERPRINT, analysis)
+    analysis_stats.record("llm", started, escalated)
+
+
+def _cached_analysis(video_id: str) -> dict[str, Any] | None:
+    """Return an analysis made with the current settings, from either prompt."""
+    cache = get_analysis_cache()
+    for fingerprint in (ANALYSIS_FINGERPRINT, BATCH_ANALYSIS_FINGERPRINT):
+        analysis = cache.get(video_id, fingerprint)
+        if analysis is not None:
+            return analysis
+    return None
+
+
+def _video_result(video: dict[str, Any], analysis: dict[str, Any]) -> dict[str, Any]:
+    """Combine a history item and its analysis into a VideoAnalysis-shaped result."""
+    return {
         "video_id": video["video_id"],
         "title": video["title"],
         "published_at": video["published_at"],
@@ -105,4 +393,109 @@ Note: You are analyzing the provided text content only, not watching any video."
         "ai_analysis": analysis
     }
 
-    return data
+
+_openai_clients: weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, AsyncOpenAI] = (
+    weakref.WeakKeyDictionary()
+)
+_openai_clients_lock = threading.Lock()
+
+
+def get_openai_client() -> AsyncOpenAI:
+    """Return the running event loop's OpenAI client, creating it on first use.
+
+    The client keeps its HTTP connections alive between requests. It is tied to
+    the event loop its connections were opened on, so each loop gets its own."""
+    loop = asyncio.get_running_loop()
+    client = _openai_clients.get(loop)
+    if client is None:
+        with _openai_clients_lock:
+            client = _openai_clients.get(loop)
+            if client is None:
+                # OpenAI client with Arcade configuration
+                client = AsyncOpenAI(
+                    api_key=os.environ.get("ARCADE_API_KEY"),
+                    base_url=LLM_BASE_URL,
+                    timeout=LLM_TIMEOUT,
+                    max_retries=LLM_MAX_RETRIES,
+                )
+                _openai_clients[loop] = client
+    return client
+
+
+async def _stream_fields(prompt: str) -> AsyncIterator[tuple[str, Any]]:
+    """Send a prompt to the LLM, yielding each top-level field of its JSON response.
+
+    Fields are parsed as the response streams in, so early fields are available
+    while later ones are still being written. Markdown fences around the JSON
+    are ignored."""
+    stream = await get_openai_client().chat.completions.create(
+        messages=[
+            {
+                "role": "system",
+                "content": SYSTEM_PROMPT
+            },
+            {"role": "user", "content": prompt}
+        ],
+        model=ANALYSIS_MODEL,
+        temperature=ANALYSIS_TEMPERATURE,
+        stream=True,
+    )
+    parser = JSONObjectStream()
+    async with stream:
+        async for chunk in stream:
+            if not chunk.choices:
+                continue
+            for field in parser.feed(chunk.choices[0].delta.content or ""):
+                yield field
+            if parser.done:
+                break
+    parser.close()
+
+
+async def _complete(prompt: str) -> dict[str, Any]:
+    """Send a prompt to the LLM and return the JSON object it responds with."""
+    return {key: value async for key, value in _stream_fields(prompt)}
+
+
+def _analysis_prompt(video: dict[str, Any]) -> str:
+    return PROMPT_TEMPLATE.format(
+        title=video["title"],
+        channel_title=video["channel_title"],
+        description=video.get("description", ""),
+    )
+
+
+def _analysis_key(videos: list[dict[str, Any]], prompt: str) -> tuple:
+    """Identify an LLM request by the videos it covers and the exact prompt sent."""
+    digest = hashlib.sha256(prompt.encode()).hexdigest()[:16]
+    return ("analysis", tuple(video["video_id"] for video in videos), digest)
+
+
+async def _request_analysis(video: dict[str, Any]) -> dict[str, Any]:
+    """Ask the LLM for an analysis of a video's text content, validated against AIAnalysis.
+
+    Concurrent requests for the same video and prompt share one LLM call, and get
+    the same validated analysis or the same ValidationError."""
+    prompt = _analysis_prompt(video)
+
+    async def complete() -> dict[str, Any]:
+        return _validate_analysis(await _complete(prompt))
+
+    return await get_single_flight().do_async(_analysis_key([video], prompt), complete)
+
+
+async def _request_batch_analysis(videos: list[dict[str, Any]]) -> dict[str, Any]:
+    """Ask the LLM for analyses of several videos in one request, keyed by video ID."""
+    listing = "\n\n".join(
+        BATCH_VIDEO_TEMPLATE.format(
+            video_id=video["video_id"],
+            title=video["title"],
+            channel_title=video["channel_title"],
+            description=video.get("description", ""),
+        )
+        for video in videos
+    )
+    prompt = BATCH_PROMPT_TEMPLATE.format(videos=listing)
+    return await get_single_flight().do_async(
+        _analysis_key(videos, prompt), lambda: _complete(prompt)
+    )
@@ -0,0 +1,230 @@
+"""Fan-out of live monitor events to any number of connected clients."""
+import asyncio
+import itertools
+import json
+import os
+import threading
+from collections import deque
+from collections.abc import AsyncIterator
+from dataclasses import dataclass
+from typing import Any
+
+from arcade_youtube.core.storage import open_database
+
+# Events buffered per client before the oldest are dropped, and kept for reconnects
+EVENT_QUEUE_SIZE = 100
+EVENT_REPLAY_SIZE = 100
+# Seconds between keep-alive comments on an idle stream
+EVENT_HEARTBEAT_INTERVAL = 15.0
+# SQLite file through which worker processes share events; unset keeps them in-process
+MONITOR_EVENTS_PATH = os.getenv("MONITOR_EVENTS_PATH")
+# Events kept in the shared log, and seconds between checks for new ones
+EVENT_LOG_SIZE = 1000
+EVENT_LOG_POLL_INTERVAL = 0.5
+
+
+@dataclass(frozen=True)
+class Event:
+    id: int
+    type: str
+    data: Any
+
+    def to_sse(self) -> str:
+        return f"id: {self.id}\nevent: {self.type}\ndata: {json.dumps(self.data)}\n\n"
+
+
+class EventLog:
+    """SQLite table of published events, shared by every process that opens the file.
+
+    IDs come from the table, so they are the same in every process and a client
+    can resume from its last event ID whichever worker it reconnects to. The
+    latest event of each type is kept apart, so it outlives the log's pruning."""
+
+    def __init__(self, path: str, max_events: int = EVENT_LOG_SIZE):
+        self._db = open_database(path)
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS events ("
+            " id INTEGER PRIMARY KEY AUTOINCREMENT, type TEXT NOT NULL, data TEXT NOT NULL)"
+        )
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS latest_events ("
+            " type TEXT PRIMARY KEY, id INTEGER NOT NULL, data TEXT NOT NULL)"
+        )
+        self._max_events = max_events
+        self._lock = threading.Lock()
+
+    def append(self, event_type: str, data: Any) -> Event:
+        encoded = json.dumps(data)
+        with self._lock:
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                cursor = self._db.execute(
+                    "INSERT INTO events (type, data) VALUES (?, ?)", (event_type, encoded)
+                )
+                event_id = cursor.lastrowid or 0
+                self._db.execute(
+                    "INSERT OR REPLACE INTO latest_events VALUES (?, ?, ?)",
+                    (event_type, event_id, encoded),
+                )
+                self._db.execute(
+                    "DELETE FROM events WHERE id <= ?", (event_id - self._max_events,)
+                )
+            except BaseException:
+                self._db.execute("ROLLBACK")
+                raise
+            self._db.execute("COMMIT")
+        return Event(event_id, event_type, data)
+
+    def after(self, event_id: int, limit: int) -> list[Event]:
+        """The oldest `limit` events published after `event_id`."""
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT id, type, data FROM events WHERE id > ? ORDER BY id LIMIT ?",
+                (event_id, limit),
+            ).fetchall()
+        return [Event(row[0], row[1], json.loads(row[2])) for row in rows]
+
+    def recent(self, event_id: int, limit: int) -> list[Event]:
+        """The newest `limit` events published after `event_id`, oldest first."""
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT id, type, data FROM events WHERE id > ? ORDER BY id DESC LIMIT ?",
+                (event_id, limit),
+            ).fetchall()
+        return [Event(row[0], row[1], json.loads(row[2])) for row in reversed(rows)]
+
+    def latest(self, event_type: str) -> Event | None:
+        with self._lock:
+            row = self._db.execute(
+                "SELECT id, data FROM latest_events WHERE type = ?", (event_type,)
+            ).fetchone()
+        return Event(row[0], event_type, json.loads(row[1])) if row is not None else None
+
+    def last_id(self) -> int:
+        with self._lock:
+            (last,) = self._db.execute("SELECT COALESCE(MAX(id), 0) FROM events").fetchone()
+        return int(last)
+
+
+class EventBroadcaster:
+    """Publishes each event once to every subscriber.
+
+    Every subscriber has its own bounded queue, so one slow client never holds up
+    the producer or the other clients: when its queue is full, its oldest
+    undelivered event is dropped. Recent events are kept so a reconnecting client
+    can resume from the last event ID it saw.
+
+    With an `EventLog`, events are written to the log instead and every process
+    delivers them to its own subscribers as it reads them back, so clients see
+    the events of whichever worker published them."""
+
+    def __init__(
+        self,
+        queue_size: int = EVENT_QUEUE_SIZE,
+        replay_size: int = EVENT_REPLAY_SIZE,
+        log: EventLog | None = None,
+        poll_interval: float = EVENT_LOG_POLL_INTERVAL,
+    ):
+        self._queue_size = queue_size
+        self._replay_size = replay_size
+        self._subscribers: set[asyncio.Queue[Event]] = set()
+        self._recent: deque[Event] = deque(maxlen=replay_size)
+        self._latest: dict[str, Event] = {}
+        self._ids = itertools.count(1)
+        self._log = log
+        self._poll_interval = poll_interval
+        self._last_read = 0
+        self._tail_task: asyncio.Task | None = None
+        self.dropped = 0
+
+    @property
+    def subscriber_count(self) -> int:
+        return len(self._subscribers)
+
+    def publish(self, event_type: str, data: Any) -> Event:
+        if self._log is not None:
+            # Delivered by every process's tail of the log, this one's included
+            return self._log.append(event_type, data)
+        event = Event(next(self._ids), event_type, data)
+        self._recent.append(event)
+        self._latest[event_type] = event
+        self._deliver(event)
+        return event
+
+    def _deliver(self, event: Event) -> None:
+        for queue in self._subscribers:
+            if queue.full():
+                queue.get_nowait()
+                self.dropped += 1
+            queue.put_nowait(event)
+
+    def _backlog(self, last_event_id: int | None, snapshot: str | None) -> list[Event]:
+        if last_event_id is not None:
+            if self._log is not None:
+                return self._log.recent(last_event_id, self._replay_size)
+            return [event for event in self._recent if event.id > last_event_id]
+        if snapshot is None:
+            return []
+        latest = self._latest.get(snapshot) if self._log is None else self._log.latest(snapshot)
+        return [latest] if latest is not None else []
+
+    async def _tail(self, log: EventLog) -> None:
+        """Deliver events every process logged, for as long as anyone is subscribed."""
+        while self._subscribers:
+            events = log.after(self._last_read, self._queue_size)
+            for event in events:
+                self._deliver(event)
+                self._last_read = event.id
+            if len(events) < self._queue_size:
+                await asyncio.sleep(self._poll_interval)
+
+    def _ensure_tail(self) -> None:
+        if self._log is None or (self._tail_task is not None and not self._tail_task.done()):
+            return
+        # Only events logged from now on are live; older ones are for replays
+        self._last_read = self._log.last_id()
+        self._tail_task = asyncio.get_running_loop().create_task(self._tail(self._log))
+
+    async def subscribe(
+        self,
+        last_event_id: int | None = None,
+        heartbeat: float = EVENT_HEARTBEAT_INTERVAL,
+        snapshot: str | None = None,
+    ) -> AsyncIterator[Event | None]:
+        """Yield events as they are published, or None after `heartbeat` idle seconds.
+
+        With `last_event_id`, buffered events published after it are replayed first.
+        Without one, a `snapshot` event type starts the stream with the most recent
+        event of that type, to bring a new client up to date. The subscriber is
+        registered before either is read, and events are never yielded twice."""
+        queue: asyncio.Queue[Event] = asyncio.Queue(self._queue_size)
+        self._subscribers.add(queue)
+        self._ensure_tail()
+        try:
+            seen = 0
+            for event in self._backlog(last_event_id, snapshot):
+                yield event
+                seen = event.id
+            while True:
+                try:
+                    event = await asyncio.wait_for(queue.get(), heartbeat)
+                except asyncio.TimeoutError:
+                    yield None
+                    continue
+                if event.id > seen:
+                    seen = event.id
+                    yield event
+        finally:
+            self._subscribers.discard(queue)
+
+    async def close(self) -> None:
+        """Stop reading the shared log."""
+        if self._tail_task is not None:
+            self._tail_task.cancel()
+            await asyncio.gather(self._tail_task, return_exceptions=True)
+            self._tail_task = None
+
+
+def default_event_log() -> EventLog | None:
+    """Return an EventLog at MONITOR_EVENTS_PATH, if one is configured."""
+    return EventLog(MONITOR_EVENTS_PATH) if MONITOR_EVENTS_PATH else None
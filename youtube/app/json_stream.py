@@ -0,0 +1,81 @@
+"""Incremental parsing of a JSON object as it streams in from an LLM."""
+import json
+from collections.abc import Iterator
+from typing import Any
+
+
+class IncompleteJSONError(ValueError):
+    """Raised when a response ends before its JSON object is complete."""
+
+    def __init__(self) -> None:
+        super().__init__("Response ended before the JSON object was complete")
+
+
+class JSONObjectStream:
+    """Yields the top-level fields of a JSON object as soon as each one is complete.
+
+    Anything before the opening brace, such as a ```json fence or a sentence of
+    preamble, is ignored, as is anything after the closing brace."""
+
+    def __init__(self) -> None:
+        self._buffer: list[str] = []
+        self._depth = 0
+        self._in_string = False
+        self._escaped = False
+        self._started = False
+        self.done = False
+        self.fields: dict[str, Any] = {}
+
+    def feed(self, text: str) -> Iterator[tuple[str, Any]]:
+        """Consume a chunk of the response, yielding each (key, value) it completes."""
+        for char in text:
+            if self.done:
+                return
+            if not self._started:
+                if char == "{":
+                    self._started = True
+                    self._depth = 1
+                continue
+            if self._in_string:
+                self._buffer.append(char)
+                self._consume_string_char(char)
+                continue
+            if self._ends_member(char):
+                self.done = self._depth == 0
+                yield from self._flush()
+            else:
+                self._buffer.append(char)
+
+    def close(self) -> dict[str, Any]:
+        """Return the whole object, raising IncompleteJSONError if it never finished."""
+        if not self.done:
+            raise IncompleteJSONError()
+        return self.fields
+
+    def _consume_string_char(self, char: str) -> None:
+        """Track escapes inside a string and notice its closing quote."""
+        if self._escaped:
+            self._escaped = False
+        elif char == "\\":
+            self._escaped = True
+        elif char == '"':
+            self._in_string = False
+
+    def _ends_member(self, char: str) -> bool:
+        """Track nesting outside strings; True at a top-level comma or the closing brace."""
+        if char == '"':
+            self._in_string = True
+        elif char in "[{":
+            self._depth += 1
+        elif char in "]}":
+            self._depth -= 1
+        return self._depth == 0 or (self._depth == 1 and char == ",")
+
+    def _flush(self) -> Iterator[tuple[str, Any]]:
+        member = "".join(self._buffer).strip()
+        self._buffer.clear()
+        if not member:
+            return
+        ((key, value),) = json.loads("{" + member + "}").items()
+        self.fields[key] = value
+        yield key, value
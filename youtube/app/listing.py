@@ -0,0 +1,173 @@
+"""Cursor-paginated, filterable listings of watch history and subscriptions."""
+import base64
+import binascii
+import json
+from collections.abc import Iterable
+from typing import Any
+
+from google.oauth2.credentials import Credentials
+
+from arcade_youtube.core.async_backend import AsyncYouTubeBackend
+from arcade_youtube.core.projection import SUBSCRIPTION_SUMMARY
+from arcade_youtube.core.scheduler import credential_key
+from arcade_youtube.core.sync import get_sync_engine, normalize_timestamp
+from arcade_youtube.tools.records import ActivityRecord, SubscriptionRecord
+from arcade_youtube.tools.utils import get_activity_video_id
+
+HISTORY_FIELDS = ActivityRecord.__slots__
+SUBSCRIPTION_FIELDS = SubscriptionRecord.__slots__
+
+
+# Types of the first part of each kind of cursor's position, the second is an int:
+# history is (published_at, rowid), subscriptions (page token, offset into the page)
+_CURSOR_KEY_TYPES: dict[str, tuple[type, ...]] = {
+    "history": (str,),
+    "subscriptions": (str, type(None)),
+}
+
+
+class InvalidListingRequest(ValueError):
+    """A cursor or field selection the listing cannot honour."""
+
+
+class InvalidCursorError(InvalidListingRequest):
+    def __init__(self, kind: str) -> None:
+        super().__init__(f"Not a valid {kind} cursor")
+
+
+class UnknownFieldsError(InvalidListingRequest):
+    def __init__(self, names: list[str]) -> None:
+        super().__init__(f"Unknown fields: {', '.join(names)}")
+
+
+def encode_cursor(kind: str, position: Any) -> str:
+    payload = json.dumps({"kind": kind, "position": position}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(kind: str, cursor: str) -> list[Any]:
+    """Return the position a cursor of the given kind points at.
+
+    Cursors come back from clients, so anything but a well-formed position of
+    the right kind is rejected rather than passed on to the store or the API."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded))
+    except (binascii.Error, UnicodeDecodeError, ValueError) as e:
+        raise InvalidCursorError(kind) from e
+    if not isinstance(payload, dict) or payload.get("kind") != kind:
+        raise InvalidCursorError(kind)
+    position = payload.get("position")
+    if not isinstance(position, list) or len(position) != 2:
+        raise InvalidCursorError(kind)
+    key, index = position
+    if not isinstance(key, _CURSOR_KEY_TYPES[kind]):
+        raise InvalidCursorError(kind)
+    # bool is an int, but never a valid rowid or offset
+    if not isinstance(index, int) or isinstance(index, bool) or index < 0:
+        raise InvalidCursorError(kind)
+    return position
+
+
+def select_fields(
+    records: Iterable[dict[str, Any]], fields: list[str] | None, allowed: Iterable[str]
+) -> list[dict[str, Any]]:
+    """Keep only the requested fields of each record."""
+    if not fields:
+        return list(records)
+    unknown = [name for name in fields if name not in allowed]
+    if unknown:
+        raise UnknownFieldsError(unknown)
+    return [{name: record[name] for name in fields} for record in records]
+
+
+async def list_history(
+    credentials: Credentials,
+    limit: int,
+    cursor: str | None = None,
+    published_after: str | None = None,
+    published_before: str | None = None,
+    channel: str | None = None,
+    fields: list[str] | None = None,
+) -> dict[str, Any]:
+    """Return one page of watched videos, newest first, and the cursor of the next page.
+
+    Pages are read from the local activity store, which is synced when the first
+    page is requested. Cursors are positions in the store, so paging stays stable
+    while newer videos arrive."""
+    engine = get_sync_engine()
+    after_key = tuple(decode_cursor("history", cursor)) if cursor else None
+    if after_key is None:
+        account = await engine.sync(AsyncYouTubeBackend(credentials))
+    else:
+        # Later pages continue the listing the first page started, without re-syncing
+        account = credential_key(credentials)
+
+    records: list[dict[str, Any]] = []
+    last_key = None
+    keyed = engine.store.iter_keyed_activities(
+        account, published_after, published_before, after_key=after_key
+    )
+    for key, activity in keyed:
+        if not get_activity_video_id(activity):
+            continue
+        record = ActivityRecord.from_api(activity)
+        if channel and record.channel_title.casefold() != channel.casefold():
+            continue
+        if len(records) == limit:
+            break
+        records.append(record.to_dict())
+        last_key = key
+    else:
+        last_key = None
+
+    next_cursor = encode_cursor("history", last_key) if last_key else None
+    return {"items": select_fields(records, fields, HISTORY_FIELDS), "next_cursor": next_cursor}
+
+
+async def list_subscriptions(
+    credentials: Credentials,
+    limit: int,
+    cursor: str | None = None,
+    subscribed_after: str | None = None,
+    subscribed_before: str | None = None,
+    channel: str | None = None,
+    fields: list[str] | None = None,
+) -> dict[str, Any]:
+    """Return one page of subscriptions and the cursor of the next page.
+
+    Follows the API's own page tokens. A cursor is a page token plus an offset
+    into that page, so filtered pages never skip or repeat subscriptions."""
+    backend = AsyncYouTubeBackend(credentials)
+    subscribed_after = subscribed_after and normalize_timestamp(subscribed_after)
+    subscribed_before = subscribed_before and normalize_timestamp(subscribed_before)
+    page_token, offset = decode_cursor("subscriptions", cursor) if cursor else (None, 0)
+    records: list[dict[str, Any]] = []
+    next_position = None
+    while next_position is None:
+        items, next_token = await backend.fetch_subscriptions_page(
+            page_token=page_token, projection=SUBSCRIPTION_SUMMARY
+        )
+        for index in range(offset, len(items)):
+            record = SubscriptionRecord.from_api(items[index])
+            subscribed_at = normalize_timestamp(record.subscribed_at or "1970-01-01T00:00:00Z")
+            if channel and channel.casefold() not in (record.channel_title or "").casefold():
+                continue
+            if subscribed_after and subscribed_at < subscribed_after:
+                continue
+            if subscribed_before and subscribed_at >= subscribed_before:
+                continue
+            if len(records) == limit:
+                next_position = [page_token, index]
+                break
+            records.append(record.to_dict())
+        else:
+            if not next_token:
+                break
+            page_token, offset = next_token, 0
+
+    next_cursor = encode_cursor("subscriptions", next_position) if next_position else None
+    return {
+        "items": select_fields(records, fields, SUBSCRIPTION_FIELDS),
+        "next_cursor": next_cursor,
+    }
@@ -0,0 +1,73 @@
+"""Response models shared by the dashboard API and the content monitor."""
+from pydantic import BaseModel, Field
+
+
+class AIAnalysis(BaseModel):
+    educational_score: float = Field(
+        ..., ge=0, le=10, description="Educational value score from 0 to 10"
+    )
+    topics: list[str] = Field(..., description="List of topics covered in the video")
+    age_appropriateness: str = Field(..., description="Age group the content is appropriate for")
+    learning_potential: str = Field(..., description="Potential for learning from the content")
+    concerns: list[str] = Field(..., description="List of potential concerns")
+    explanation: str = Field(..., description="Detailed explanation of the analysis")
+    confidence: float | None = Field(
+        None, ge=0, le=1, description="Confidence of a rule-based analysis; absent for AI analyses"
+    )
+
+
+class VideoAnalysis(BaseModel):
+    video_id: str = Field(..., description="YouTube video ID")
+    title: str = Field(..., description="Video title")
+    published_at: str = Field(..., description="Publication date and time")
+    description: str = Field(..., description="Video description")
+    channel: str = Field(..., description="Channel name")
+    ai_analysis: AIAnalysis = Field(..., description="AI-generated analysis of the video")
+
+
+class DailyWatchTime(BaseModel):
+    date: str = Field(..., description="Local calendar date (YYYY-MM-DD)")
+    seconds: int = Field(..., description="Seconds watched that day")
+    videos: int = Field(..., description="Videos watched that day")
+    rolling_average_seconds: float = Field(
+        ..., description="Trailing 7-day average of seconds watched"
+    )
+
+
+class ChannelWatchTime(BaseModel):
+    channel_title: str = Field(..., description="Channel name")
+    seconds: int = Field(..., description="Seconds watched from this channel")
+    videos: int = Field(..., description="Videos watched from this channel")
+
+
+class WatchAnalytics(BaseModel):
+    total_seconds: int = Field(..., description="Total seconds watched")
+    total_hours: float = Field(..., description="Total hours watched")
+    video_count: int = Field(..., description="Number of videos watched")
+    average_duration: float = Field(..., description="Average video duration in seconds")
+    percentiles: dict[str, float] = Field(..., description="Video duration percentiles in seconds")
+    hourly_seconds: list[int] = Field(
+        ..., description="Seconds watched per local hour of day (0-23)"
+    )
+    daily: list[DailyWatchTime] = Field(..., description="Watch time per day")
+    channels: list[ChannelWatchTime] = Field(..., description="Most-watched channels")
+
+
+class TierStats(BaseModel):
+    count: int = Field(..., description="Videos answered by this tier")
+    hit_rate: float = Field(..., description="Share of all videos answered by this tier")
+    average_seconds: float = Field(..., description="Mean time to answer")
+    p50_seconds: float = Field(..., description="Median time to answer, over recent videos")
+    p95_seconds: float = Field(
+        ..., description="95th percentile time to answer, over recent videos"
+    )
+
+
+class AnalysisStats(BaseModel):
+    videos: int = Field(..., description="Videos analyzed since startup")
+    escalations: int = Field(
+        ..., description="Videos the pre-classifier was unsure of and sent to the AI"
+    )
+    tiers: dict[str, TierStats] = Field(
+        ..., description="Counters for the cache, preclassifier and llm tiers"
+    )
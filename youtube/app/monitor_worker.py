@@ -0,0 +1,194 @@
+"""Background worker that keeps the latest video analysis precomputed."""
+import asyncio
+import contextlib
+import fcntl
+import logging
+import os
+import time
+from collections.abc import Callable
+from typing import Any
+
+from google.oauth2.credentials import Credentials
+
+from app.content_monitor import analyze_videos
+from app.events import EventBroadcaster, default_event_log
+from arcade_youtube.tools.youtube_client import get_watch_history
+
+logger = logging.getLogger(__name__)
+
+# Seconds between watch history polls; 0 disables the background loop
+MONITOR_POLL_INTERVAL = float(os.getenv("MONITOR_POLL_INTERVAL", "300"))
+# Most recent videos analyzed ahead of time on every poll
+MONITOR_PREFETCH = int(os.getenv("MONITOR_PREFETCH", "5"))
+# Lock file that elects a single polling worker when several processes serve the app
+MONITOR_LOCK_PATH = os.getenv("MONITOR_LOCK_PATH")
+
+
+class MonitorRefreshError(RuntimeError):
+    """Raised when a refresh could not produce an analysis of the latest video."""
+
+
+class LatestAnalysisError(MonitorRefreshError):
+    """Raised when every other step worked but the latest video could not be analyzed."""
+
+    def __init__(self, video_id: str) -> None:
+        super().__init__(f"Analysis of the latest video {video_id} failed")
+
+
+class MonitorWorker:
+    """Polls watch history and analyzes new videos before anyone asks for them.
+
+    `latest()` serves the newest precomputed analysis straight away. Once the
+    result is older than the poll interval it is still served, and a refresh is
+    started in the background (stale-while-revalidate). At most one refresh runs
+    at a time, however many requests find the result stale.
+
+    Newly watched videos and their analyses are published to `events` as
+    "video" and "analysis" events, and the analysis of the newest video as a
+    "latest" event whenever it changes, so clients can be pushed updates
+    instead of polling.
+
+    With a `lock_path`, only the process holding the lock polls and publishes
+    events; the others still refresh on demand, mostly from the caches the
+    poller fills, and deliver the poller's events through a shared `EventLog`.
+    When the poller exits, another process takes the lock over on its next
+    attempt."""
+
+    def __init__(
+        self,
+        get_credentials: Callable[[], Credentials],
+        interval: float = MONITOR_POLL_INTERVAL,
+        prefetch: int = MONITOR_PREFETCH,
+        events: EventBroadcaster | None = None,
+        lock_path: str | None = MONITOR_LOCK_PATH,
+    ):
+        self._get_credentials = get_credentials
+        self.interval = interval
+        self.prefetch = prefetch
+        self.events = events or EventBroadcaster(log=default_event_log())
+        self._lock_path = lock_path
+        self._lock_fd: int | None = None
+        self.latest_result: dict[str, Any] | None = None
+        self.refreshed_at: float | None = None
+        self._analyzed: dict[str, dict[str, Any]] = {}
+        self._refresh_task: asyncio.Task | None = None
+        self._loop_task: asyncio.Task | None = None
+
+    @property
+    def age(self) -> float | None:
+        """Seconds since the last successful refresh."""
+        return None if self.refreshed_at is None else time.monotonic() - self.refreshed_at
+
+    def is_stale(self) -> bool:
+        return self.age is None or self.age >= self.interval
+
+    async def latest(self) -> dict[str, Any]:
+        """Return the latest video's analysis, refreshing it in the background when stale.
+
+        Only the very first call, before anything was precomputed, waits for a refresh."""
+        if self.latest_result is None:
+            return await self.refresh()
+        if self.is_stale():
+            self.revalidate()
+        return self.latest_result
+
+    def revalidate(self) -> asyncio.Task:
+        """Start a refresh unless one is already running, and return it."""
+        if self._refresh_task is None or self._refresh_task.done():
+            self._refresh_task = asyncio.create_task(self._refresh())
+            self._refresh_task.add_done_callback(self._log_failure)
+        return self._refresh_task
+
+    async def refresh(self) -> dict[str, Any]:
+        """Refresh now, joining a refresh that is already running."""
+        return await asyncio.shield(self.revalidate())
+
+    async def _refresh(self) -> dict[str, Any]:
+        try:
+            return await self._analyze_history()
+        except MonitorRefreshError:
+            raise
+        except Exception as e:
+            raise MonitorRefreshError(e) from e
+
+    async def _analyze_history(self) -> dict[str, Any]:
+        history = await get_watch_history(
+            None, credentials=self._get_credentials(), limit=self.prefetch
+        )
+        if not history:
+            result = {"error": "No watch history found"}
+        else:
+            new = [video for video in history if video["video_id"] not in self._analyzed]
+            for video in new:
+                self._publish("video", video)
+            async for analysis in analyze_videos(new):
+                if "error" in analysis:
+                    logger.warning(f"Could not analyze {analysis['video_id']}: {analysis['error']}")
+                else:
+                    self._analyzed[analysis["video_id"]] = analysis
+                    self._publish("analysis", analysis)
+            # Forget videos that dropped out of the prefetch window
+            recent = {video["video_id"] for video in history}
+            self._analyzed = {k: v for k, v in self._analyzed.items() if k in recent}
+            latest_id = history[0]["video_id"]
+            if latest_id not in self._analyzed:
+                raise LatestAnalysisError(latest_id)
+            result = self._analyzed[latest_id]
+        if result != self.latest_result and "error" not in result:
+            self._publish("latest", result)
+        self.latest_result = result
+        self.refreshed_at = time.monotonic()
+        return result
+
+    def _publish(self, event_type: str, data: Any) -> None:
+        # The poller publishes for every process; on-demand refreshes elsewhere would repeat it
+        if self._lock_path is None or self._lock_fd is not None:
+            self.events.publish(event_type, data)
+
+    @staticmethod
+    def _log_failure(task: asyncio.Task) -> None:
+        if not task.cancelled() and task.exception() is not None:
+            logger.warning(f"Monitor refresh failed: {task.exception()}")
+
+    def start(self) -> None:
+        """Start polling in the background; does nothing if polling is disabled."""
+        if self.interval > 0 and self._loop_task is None:
+            self._loop_task = asyncio.create_task(self._poll())
+
+    async def stop(self) -> None:
+        for task in (self._loop_task, self._refresh_task):
+            if task is not None:
+                task.cancel()
+        await asyncio.gather(
+            *(task for task in (self._loop_task, self._refresh_task) if task is not None),
+            return_exceptions=True,
+        )
+        self._loop_task = self._refresh_task = None
+        await self.events.close()
+        if self._lock_fd is not None:
+            # Closing the file releases the lock for another process to take over
+            os.close(self._lock_fd)
+            self._lock_fd = None
+
+    def is_poller(self) -> bool:
+        """Whether this process polls, taking the poller lock if it is free."""
+        if self._lock_path is None or self._lock_fd is not None:
+            return True
+        # Held open, and so locked, for as long as this process polls
+        lock_fd = os.open(self._lock_path, os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o644)
+        try:
+            fcntl.flock(lock_fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            os.close(lock_fd)
+            return False
+        self._lock_fd = lock_fd
+        logger.info(f"Process {os.getpid()} is now the monitor poller")
+        return True
+
+    async def _poll(self) -> None:
+        while True:
+            if self.is_poller():
+                # Logged by the refresh task; keep serving the last good result
+                with contextlib.suppress(MonitorRefreshError):
+                    await self.refresh()
+            await asyncio.sleep(self.interval)
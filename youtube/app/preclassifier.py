@@ -0,0 +1,256 @@
+"""Cheap offline first tier of video analysis that runs before the LLM."""
+import hashlib
+import math
+import os
+import re
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any
+
+from app.analysis_cache import AnalysisCache
+
+# Analyses below this confidence are escalated to the LLM
+PRECLASSIFIER_THRESHOLD = float(os.getenv("PRECLASSIFIER_THRESHOLD", "0.8"))
+# LLM analyses of a channel needed before its reputation stands in for new ones
+MIN_CHANNEL_ANALYSES = 3
+# Share of the videos a channel reputation could answer that still go to the LLM, so the
+# reputation keeps learning, and adapts when the channel changes
+CHANNEL_AUDIT_RATE = float(os.getenv("CHANNEL_AUDIT_RATE", "0.1"))
+
+# Most confidence a keyword match can reach, kept below the default threshold: keywords
+# alone only mark a video as escalated, they never stand in for the LLM
+KEYWORD_MAX_CONFIDENCE = 0.6
+# Confidence of an analysis from ALLOWED_CHANNELS
+ALLOWED_CHANNEL_CONFIDENCE = 0.9
+
+_NON_WORD = re.compile(r"[^a-z0-9']+")
+
+
+@dataclass(frozen=True)
+class Category:
+    """A kind of video recognised by phrases that rarely mean anything else."""
+
+    name: str
+    phrases: frozenset[str]
+    educational_score: float
+    topics: tuple[str, ...]
+    learning_potential: str
+
+
+CATEGORIES = (
+    Category(
+        "music",
+        frozenset({
+            "official music video", "lyric video", "lyrics video", "official audio",
+            "full album", "karaoke version", "vevo",
+        }),
+        2.0, ("Music",), "Low",
+    ),
+    Category(
+        "gaming",
+        frozenset({
+            "let's play", "lets play", "gameplay", "walkthrough", "playthrough", "speedrun",
+            "minecraft", "fortnite", "roblox",
+        }),
+        3.0, ("Video Games",), "Low",
+    ),
+    Category(
+        "education",
+        frozenset({
+            "lecture", "tutorial", "crash course", "full course", "lesson", "documentary",
+            "explained", "for beginners",
+        }),
+        8.0, ("Education",), "High",
+    ),
+)
+CATEGORIES_BY_NAME = {category.name: category for category in CATEGORIES}
+
+# Channels known to publish only one kind of video, with the age rating that fits all
+# of it. Keyed by lower-cased channel title; the only videos whose age rating and
+# concerns are settled without the LLM, apart from learned channel reputations.
+ALLOWED_CHANNELS: dict[str, tuple[str, str]] = {
+    "khan academy": ("education", "All Ages"),
+    "ted-ed": ("education", "All Ages"),
+    "crashcourse": ("education", "Teens"),
+    "scishow kids": ("education", "Young Children"),
+    "numberphile": ("education", "Teens"),
+}
+
+
+@dataclass
+class Classification:
+    """A first-tier analysis and how sure the rule that produced it is."""
+
+    analysis: dict[str, Any]
+    confidence: float
+    rule: str
+
+
+def _channel_classification(reputation: dict) -> Classification | None:
+    count = reputation["count"]
+    if count < MIN_CHANNEL_ANALYSES:
+        return None
+    mean = reputation["score_sum"] / count
+    variance = max(reputation["score_squares"] / count - mean * mean, 0.0)
+    # More analyses raise confidence, disagreement between them lowers it
+    confidence = (1 - 1 / (count + 1)) * (1 - min(math.sqrt(variance) / 5, 1))
+
+    def most_common(key: str) -> str:
+        return max(reputation[key], key=reputation[key].get)
+
+    def recurring(key: str) -> list[str]:
+        return sorted(value for value, seen in reputation[key].items() if seen * 2 >= count)
+
+    analysis = {
+        "educational_score": round(mean, 1),
+        "topics": recurring("topics"),
+        "age_appropriateness": most_common("age_appropriateness"),
+        "learning_potential": most_common("learning_potential"),
+        "concerns": recurring("concerns"),
+        "explanation": (
+            f"Estimated from {count} earlier analyses of videos from this channel, "
+            f"which averaged an educational score of {mean:.1f}."
+        ),
+    }
+    return Classification(analysis, round(confidence, 3), "channel")
+
+
+def _audited(video: dict[str, Any]) -> bool:
+    """Whether a video is in the CHANNEL_AUDIT_RATE sample, the same one in every process."""
+    digest = hashlib.sha256(video.get("video_id", "").encode()).digest()
+    return int.from_bytes(digest[:4], "big") < CHANNEL_AUDIT_RATE * 2**32
+
+
+def _normalize(text: str) -> str:
+    """Lower-case text down to single-spaced words, padded so phrases match whole words."""
+    return f" {_NON_WORD.sub(' ', text.lower()).strip()} "
+
+
+def _allowed_channel_classification(video: dict[str, Any]) -> Classification | None:
+    allowed = ALLOWED_CHANNELS.get(video.get("channel_title", "").strip().lower())
+    if allowed is None:
+        return None
+    category_name, age_appropriateness = allowed
+    category = CATEGORIES_BY_NAME[category_name]
+    analysis = {
+        "educational_score": category.educational_score,
+        "topics": list(category.topics),
+        "age_appropriateness": age_appropriateness,
+        "learning_potential": category.learning_potential,
+        "concerns": [],
+        "explanation": f"Published by a channel known for {category.name} content.",
+    }
+    return Classification(analysis, ALLOWED_CHANNEL_CONFIDENCE, "allowlist")
+
+
+def _keyword_classification(video: dict[str, Any]) -> Classification | None:
+    # Title phrases count double, they say more about a video than its description
+    title = _normalize(video.get("title", ""))
+    description = _normalize(video.get("description", ""))
+    hits = {
+        category: sum(
+            2 * (f" {phrase} " in title) + (f" {phrase} " in description)
+            for phrase in category.phrases
+        )
+        for category in CATEGORIES
+    }
+    best = max(hits, key=hits.get)
+    if not hits[best]:
+        return None
+    # Share of matches agreeing on the category, scaled down until there are a few
+    confidence = hits[best] / sum(hits.values()) * min(hits[best] / 3, 1)
+    analysis = {
+        "educational_score": best.educational_score,
+        "topics": list(best.topics),
+        # Keywords say nothing about who a video is suitable for
+        "age_appropriateness": "Unrated",
+        "learning_potential": best.learning_potential,
+        "concerns": ["Not reviewed by the AI, so suitability is unknown"],
+        "explanation": (
+            f"Looks like {best.name} content from phrases in its title and description."
+        ),
+    }
+    return Classification(analysis, round(confidence * KEYWORD_MAX_CONFIDENCE, 3), "keywords")
+
+
+def preclassify(
+    video: dict[str, Any], cache: AnalysisCache, fingerprint: str
+) -> Classification | None:
+    """Return the most confident rule-based analysis of a video, if any rule applies.
+
+    Allow-listed channels and channels the LLM has analysed consistently can be
+    confident enough to skip the LLM. Phrases from CATEGORIES in the title and
+    description never are; they only mark the video as escalated. Reputations
+    are not used for the CHANNEL_AUDIT_RATE sample of videos, whose LLM
+    analyses keep updating them."""
+    candidates = [_allowed_channel_classification(video), _keyword_classification(video)]
+    if not _audited(video):
+        reputation = cache.channel_reputation(video.get("channel_title", ""), fingerprint)
+        if reputation is not None:
+            candidates.append(_channel_classification(reputation))
+    candidates = [candidate for candidate in candidates if candidate is not None]
+    return max(candidates, key=lambda candidate: candidate.confidence, default=None)
+
+
+@dataclass
+class TierStats:
+    """How often an analysis tier answered and how long it took."""
+
+    count: int = 0
+    seconds: float = 0.0
+    recent: deque = field(default_factory=lambda: deque(maxlen=1000))
+
+    def as_dict(self, total: int) -> dict[str, float]:
+        latencies = sorted(self.recent)
+
+        def percentile(share: float) -> float:
+            if not latencies:
+                return 0.0
+            return round(latencies[min(int(share * len(latencies)), len(latencies) - 1)], 4)
+
+        return {
+            "count": self.count,
+            "hit_rate": round(self.count / total, 4) if total else 0.0,
+            "average_seconds": round(self.seconds / self.count, 4) if self.count else 0.0,
+            "p50_seconds": percentile(0.5),
+            "p95_seconds": percentile(0.95),
+        }
+
+
+class AnalysisStats:
+    """Per-tier counters for the cache, pre-classifier and LLM tiers."""
+
+    TIERS = ("cache", "preclassifier", "llm")
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        with self._lock:
+            self.tiers = {tier: TierStats() for tier in self.TIERS}
+            self.escalations = 0
+
+    def record(self, tier: str, started: float, escalated: bool = False) -> None:
+        """Record that `tier` answered a video whose analysis began at `started`."""
+        elapsed = time.perf_counter() - started
+        with self._lock:
+            stats = self.tiers[tier]
+            stats.count += 1
+            stats.seconds += elapsed
+            stats.recent.append(elapsed)
+            self.escalations += escalated
+
+    def as_dict(self) -> dict[str, Any]:
+        with self._lock:
+            total = sum(stats.count for stats in self.tiers.values())
+            return {
+                "videos": total,
+                "escalations": self.escalations,
+                "tiers": {tier: stats.as_dict(total) for tier, stats in self.tiers.items()},
+            }
+
+
+analysis_stats = AnalysisStats()
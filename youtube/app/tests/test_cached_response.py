@@ -0,0 +1,78 @@
+import gzip
+
+import pytest
+from starlette.requests import Request
+
+from app import cached_response
+from app.cached_response import CachedResponse
+
+BODY = b"<html>" + b"dashboard " * 100 + b"</html>"
+
+
+@pytest.fixture(autouse=True)
+def fake_brotli(monkeypatch):
+    """Stand in for the optional brotli package, installed or not."""
+    monkeypatch.setattr(cached_response, "_brotli_compress", lambda body: b"br:" + body)
+
+
+def request(**headers: str) -> Request:
+    raw = [(name.replace("_", "-").encode(), value.encode()) for name, value in headers.items()]
+    return Request({"type": "http", "method": "GET", "path": "/", "headers": raw})
+
+
+@pytest.fixture
+def page():
+    return CachedResponse(lambda: BODY, "text/html", "public, no-cache")
+
+
+def test_each_encoding_has_its_own_etag(page):
+    plain = page.respond(request())
+    gzipped = page.respond(request(accept_encoding="gzip, deflate"))
+    brotli = page.respond(request(accept_encoding="gzip, br"))
+
+    assert plain.body == BODY
+    assert gzip.decompress(gzipped.body) == BODY
+    assert brotli.body == b"br:" + BODY
+    assert "content-encoding" not in plain.headers
+    assert gzipped.headers["content-encoding"] == "gzip"
+    assert brotli.headers["content-encoding"] == "br"
+    etags = {response.headers["etag"] for response in (plain, gzipped, brotli)}
+    assert len(etags) == 3
+    assert all(response.headers["vary"] == "Accept-Encoding" for response in (plain, brotli))
+
+
+def test_refused_encoding_is_not_used(page):
+    response = page.respond(request(accept_encoding="br;q=0, gzip;q=0.5"))
+
+    assert response.headers["content-encoding"] == "gzip"
+
+
+def test_matching_if_none_match_gets_an_empty_304(page):
+    etag = page.respond(request(accept_encoding="gzip")).headers["etag"]
+
+    response = page.respond(request(accept_encoding="gzip", if_none_match=f'"other", W/{etag}'))
+
+    assert response.status_code == 304
+    assert response.body == b""
+    assert response.headers["etag"] == etag
+    assert "content-encoding" not in response.headers
+
+
+def test_etag_of_another_encoding_does_not_match(page):
+    """Test that a client switching encodings gets the new bytes, not a 304."""
+    gzip_etag = page.respond(request(accept_encoding="gzip")).headers["etag"]
+
+    response = page.respond(request(if_none_match=gzip_etag))
+
+    assert response.status_code == 200
+    assert response.body == BODY
+
+
+def test_body_is_built_once():
+    builds = []
+    page = CachedResponse(lambda: builds.append(1) or BODY, "text/html", "no-cache")
+
+    for _ in range(3):
+        page.respond(request(accept_encoding="gzip"))
+
+    assert builds == [1]
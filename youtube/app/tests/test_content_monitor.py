@@ -0,0 +1,138 @@
+import asyncio
+
+import pytest
+from pydantic import ValidationError
+
+from app import analysis_cache, content_monitor
+from arcade_youtube.core import coalesce
+
+VIDEO = {
+    "video_id": "vid1",
+    "title": "Untitled upload",
+    "published_at": "2025-05-02T03:16:22Z",
+    "description": "",
+    "channel_title": "Someone",
+}
+
+ANALYSIS = {
+    "educational_score": 7,
+    "topics": ["history"],
+    "age_appropriateness": "Teens",
+    "learning_potential": "High",
+    "concerns": [],
+    "explanation": "Covers the fall of Rome.",
+}
+
+
+@pytest.fixture
+def cache(monkeypatch):
+    """Give the test an empty in-memory analysis cache and a one-video history."""
+    cache = analysis_cache.AnalysisCache(":memory:")
+    monkeypatch.setattr(analysis_cache, "_default_cache", cache)
+
+    async def get_watch_history(context, credentials, limit):
+        return [VIDEO]
+
+    monkeypatch.setattr(content_monitor, "get_watch_history", get_watch_history)
+    return cache
+
+
+def answer_with(monkeypatch, analysis):
+    async def complete(prompt):
+        return analysis
+
+    monkeypatch.setattr(content_monitor, "_complete", complete)
+
+
+@pytest.mark.asyncio
+async def test_valid_analysis_is_cached(cache, monkeypatch):
+    answer_with(monkeypatch, ANALYSIS)
+
+    result = await content_monitor.analyze_latest_video(None)
+
+    assert result["ai_analysis"] == ANALYSIS
+    assert cache.get("vid1", content_monitor.ANALYSIS_FINGERPRINT) == ANALYSIS
+
+
+@pytest.mark.asyncio
+async def test_invalid_analysis_is_not_cached(cache, monkeypatch):
+    """Test that a response missing fields is reported and never served from the cache."""
+    answer_with(monkeypatch, {"educational_score": 11, "topics": "history"})
+
+    result = await content_monitor.analyze_latest_video(None)
+
+    assert "error" in result
+    assert cache.get("vid1", content_monitor.ANALYSIS_FINGERPRINT) is None
+    assert cache.channel_reputation("Someone", content_monitor.ANALYSIS_FINGERPRINT) is None
+
+
+@pytest.mark.asyncio
+async def test_analyze_videos_reports_each_video_of_a_batch(cache, monkeypatch):
+    """Test that cached videos come first and a batch answer is checked video by video."""
+    videos = [{**VIDEO, "video_id": f"vid{i}"} for i in range(1, 5)]
+    cache.put("vid1", content_monitor.ANALYSIS_FINGERPRINT, ANALYSIS)
+
+    async def request_batch_analysis(batch):
+        return {"vid2": ANALYSIS, "vid3": {"topics": []}}
+
+    monkeypatch.setattr(content_monitor, "_request_batch_analysis", request_batch_analysis)
+
+    results = [
+        result async for result in content_monitor.analyze_videos(videos * 2, batch_size=3)
+    ]
+
+    assert [result["video_id"] for result in results] == ["vid1", "vid2", "vid3", "vid4"]
+    assert results[1]["ai_analysis"] == ANALYSIS
+    assert "error" in results[2]
+    assert results[3]["error"] == "No analysis returned"
+    assert cache.get("vid2", content_monitor.BATCH_ANALYSIS_FINGERPRINT) == ANALYSIS
+    assert cache.get("vid3", content_monitor.BATCH_ANALYSIS_FINGERPRINT) is None
+
+
+@pytest.mark.asyncio
+async def test_invalid_streamed_analysis_is_rejected(cache, monkeypatch):
+    """Test that joined callers get the error and nothing is cached."""
+    single_flight = coalesce.SingleFlight()
+    monkeypatch.setattr(coalesce, "_default_single_flight", single_flight)
+
+    async def stream_fields(prompt):
+        yield "educational_score", 4
+        key = content_monitor._analysis_key([VIDEO], prompt)
+        followers.append(single_flight.claim(key))
+
+    followers = []
+    monkeypatch.setattr(content_monitor, "_stream_fields", stream_fields)
+
+    events = [event async for event in content_monitor.stream_latest_video_analysis(None)]
+
+    (future, leader), = followers
+    assert not leader
+    assert isinstance(future.exception(), ValidationError)
+    assert "error" in events[-1]
+    assert {"field": "educational_score", "value": 4} in events
+    assert cache.get("vid1", content_monitor.ANALYSIS_FINGERPRINT) is None
+
+
+@pytest.mark.asyncio
+async def test_stream_joining_a_request_gets_the_validated_analysis(cache, monkeypatch):
+    """Test that a stream that joins a plain request replays the analysis it validated."""
+    release = asyncio.Event()
+
+    async def complete(prompt):
+        await release.wait()
+        return {**ANALYSIS, "confidence": None}
+
+    monkeypatch.setattr(content_monitor, "_complete", complete)
+    request = asyncio.create_task(content_monitor.analyze_latest_video(None))
+    while not coalesce.get_single_flight().stats.leaders:
+        await asyncio.sleep(0)
+
+    stream = content_monitor.stream_latest_video_analysis(None)
+    assert "video" in await anext(stream)
+    joined = asyncio.ensure_future(anext(stream))
+    await asyncio.sleep(0)
+    release.set()
+
+    assert (await request)["ai_analysis"] == ANALYSIS
+    assert await joined == {"field": "educational_score", "value": 7}
+    assert [event async for event in stream][-1] == {"ai_analysis": ANALYSIS}
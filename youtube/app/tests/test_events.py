@@ -0,0 +1,156 @@
+import asyncio
+
+import pytest
+
+from app.events import Event, EventBroadcaster, EventLog
+
+
+async def drain(subscription, count):
+    return [await anext(subscription) for _ in range(count)]
+
+
+@pytest.mark.asyncio
+async def test_every_subscriber_gets_every_event():
+    events = EventBroadcaster()
+    first, second = events.subscribe(), events.subscribe()
+    # Subscriptions register on their first step, so start both waiting
+    waiting = [asyncio.ensure_future(anext(first)), asyncio.ensure_future(anext(second))]
+    await asyncio.sleep(0)
+
+    published = events.publish("video", {"video_id": "vid1"})
+
+    assert await asyncio.gather(*waiting) == [published, published]
+    assert published == Event(1, "video", {"video_id": "vid1"})
+    await first.aclose()
+    await second.aclose()
+    assert events.subscriber_count == 0
+
+
+@pytest.mark.asyncio
+async def test_full_queue_drops_the_oldest_events():
+    """Test that a slow subscriber loses its oldest events, not the newest or the producer."""
+    events = EventBroadcaster(queue_size=3)
+    subscription = events.subscribe()
+    waiting = asyncio.ensure_future(anext(subscription))
+    await asyncio.sleep(0)
+    events.publish("video", 1)
+    assert (await waiting).data == 1
+
+    for index in range(2, 7):
+        events.publish("video", index)
+
+    assert [event.data for event in await drain(subscription, 3)] == [4, 5, 6]
+    assert events.dropped == 2
+    await subscription.aclose()
+
+
+@pytest.mark.asyncio
+async def test_reconnect_replays_events_after_the_last_seen_id():
+    events = EventBroadcaster(replay_size=3)
+    for index in range(1, 6):
+        events.publish("analysis", index)
+
+    subscription = events.subscribe(last_event_id=3)
+
+    assert [(event.id, event.data) for event in await drain(subscription, 2)] == [(4, 4), (5, 5)]
+    await subscription.aclose()
+
+
+@pytest.mark.asyncio
+async def test_replay_is_limited_to_the_buffered_events():
+    events = EventBroadcaster(replay_size=2)
+    for index in range(1, 6):
+        events.publish("analysis", index)
+
+    subscription = events.subscribe(last_event_id=0)
+
+    assert [event.id for event in await drain(subscription, 2)] == [4, 5]
+    await subscription.aclose()
+
+
+@pytest.mark.asyncio
+async def test_idle_stream_yields_heartbeats():
+    events = EventBroadcaster()
+    subscription = events.subscribe(heartbeat=0.01)
+
+    assert await anext(subscription) is None
+    await subscription.aclose()
+
+
+@pytest.mark.asyncio
+async def test_new_subscriber_starts_from_the_latest_snapshot():
+    """Test that a new client gets the latest event first, then only newer ones."""
+    events = EventBroadcaster()
+    events.publish("latest", "old")
+    snapshot = events.publish("latest", "current")
+    events.publish("video", "vid1")
+
+    subscription = events.subscribe(snapshot="latest")
+    assert await anext(subscription) == snapshot
+    waiting = asyncio.ensure_future(anext(subscription))
+    await asyncio.sleep(0)
+    newer = events.publish("latest", "newer")
+
+    assert await waiting == newer
+    await subscription.aclose()
+
+
+@pytest.mark.asyncio
+async def test_events_are_shared_between_processes_through_the_log(tmp_path):
+    """Test that subscribers of one worker get the events another worker publishes."""
+    path = str(tmp_path / "events.sqlite3")
+    publisher = EventBroadcaster(log=EventLog(path))
+    reader = EventBroadcaster(log=EventLog(path), poll_interval=0.01)
+    subscription = reader.subscribe()
+    waiting = asyncio.ensure_future(anext(subscription))
+    await asyncio.sleep(0)
+
+    published = publisher.publish("video", {"video_id": "vid1"})
+
+    assert await waiting == published == Event(1, "video", {"video_id": "vid1"})
+    await subscription.aclose()
+    await reader.close()
+
+
+@pytest.mark.asyncio
+async def test_reconnect_to_another_process_resumes_after_the_shared_id(tmp_path):
+    path = str(tmp_path / "events.sqlite3")
+    publisher = EventBroadcaster(log=EventLog(path))
+    for index in range(1, 4):
+        publisher.publish("analysis", index)
+    reader = EventBroadcaster(log=EventLog(path), poll_interval=0.01)
+
+    subscription = reader.subscribe(last_event_id=1)
+    assert [event.id for event in await drain(subscription, 2)] == [2, 3]
+    publisher.publish("latest", 4)
+
+    assert await anext(subscription) == Event(4, "latest", 4)
+    await subscription.aclose()
+    await reader.close()
+
+
+@pytest.mark.asyncio
+async def test_snapshot_from_the_log_is_not_repeated(tmp_path):
+    """Test that a snapshot the log tail then delivers again reaches the client once."""
+    events = EventBroadcaster(log=EventLog(str(tmp_path / "events.sqlite3")), poll_interval=0.05)
+    # Keeps the log tail running, a poll behind the newest event
+    other = events.subscribe()
+    waiting = asyncio.ensure_future(anext(other))
+    await asyncio.sleep(0)
+    snapshot = events.publish("latest", "current")
+
+    subscription = events.subscribe(snapshot="latest")
+    assert await anext(subscription) == snapshot
+    assert await waiting == snapshot
+    newer = events.publish("latest", "newer")
+
+    assert await anext(subscription) == newer
+    await subscription.aclose()
+    await other.aclose()
+    await events.close()
+
+
+def test_event_is_formatted_as_server_sent_event():
+    event = Event(7, "latest", {"score": 5})
+
+    assert event.to_sse() == 'id: 7\nevent: latest\ndata: {"score": 5}\n\n'
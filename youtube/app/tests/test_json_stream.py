@@ -0,0 +1,65 @@
+import json
+
+import pytest
+
+from app.json_stream import IncompleteJSONError, JSONObjectStream
+
+ANALYSIS = {
+    "educational_score": 7.5,
+    "topics": ["history", "strategy, tactics"],
+    "explanation": 'Says "hello, world" {not a brace} and ends in a backslash \\',
+    "nested": {"a": [1, {"b": "]"}], "c": '"quoted", still a string'},
+    "concerns": [],
+}
+
+
+def feed_in_chunks(text: str, size: int) -> tuple[JSONObjectStream, list[tuple[str, object]]]:
+    parser = JSONObjectStream()
+    fields = []
+    for start in range(0, len(text), size):
+        fields.extend(parser.feed(text[start:start + size]))
+    return parser, fields
+
+
+@pytest.mark.parametrize("size", [1, 2, 3, 7, 1000])
+def test_fields_survive_any_chunk_boundary(size):
+    """Test that splits inside strings, escapes and nested values do not change the result."""
+    parser, fields = feed_in_chunks(json.dumps(ANALYSIS), size)
+
+    assert fields == list(ANALYSIS.items())
+    assert parser.close() == ANALYSIS
+
+
+def test_fields_are_yielded_as_soon_as_they_end():
+    parser = JSONObjectStream()
+
+    assert list(parser.feed('{"a": 1, "b": "x')) == [("a", 1)]
+    assert list(parser.feed('y", "c"')) == [("b", "xy")]
+    assert list(parser.feed(": [2]}")) == [("c", [2])]
+    assert parser.done
+
+
+def test_code_fences_and_surrounding_text_are_ignored():
+    text = 'Here you go:\n```json\n{"topics": ["maths"], "score": 3}\n```\nAnything else?'
+
+    parser, fields = feed_in_chunks(text, 4)
+
+    assert fields == [("topics", ["maths"]), ("score", 3)]
+    assert parser.close() == {"topics": ["maths"], "score": 3}
+
+
+def test_truncated_response_keeps_finished_fields():
+    """Test that a cut-off response yields what was complete and then fails on close."""
+    parser, fields = feed_in_chunks('{"a": 1, "b": "unfinished \\"str', 5)
+
+    assert fields == [("a", 1)]
+    with pytest.raises(IncompleteJSONError):
+        parser.close()
+
+
+def test_response_without_an_object_is_incomplete():
+    parser, fields = feed_in_chunks("I cannot analyze this video.", 3)
+
+    assert fields == []
+    with pytest.raises(ValueError, match="before the JSON object was complete"):
+        parser.close()
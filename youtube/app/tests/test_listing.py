@@ -0,0 +1,66 @@
+import base64
+import json
+
+import httpx
+import pytest
+from google.auth.credentials import AnonymousCredentials
+
+from app import web_interface
+from app.listing import (
+    InvalidListingRequest,
+    decode_cursor,
+    encode_cursor,
+    select_fields,
+)
+
+
+def raw_cursor(payload) -> str:
+    return base64.urlsafe_b64encode(json.dumps(payload).encode()).decode().rstrip("=")
+
+
+TAMPERED_CURSORS = [
+    "not base64 at all!",
+    "é",
+    base64.urlsafe_b64encode(b"\xff\xfe").decode(),
+    raw_cursor("just a string"),
+    raw_cursor({"kind": "subscriptions", "position": [None, 0]}),
+    raw_cursor({"kind": "history"}),
+    raw_cursor({"kind": "history", "position": "2025-01-01T00:00:00Z"}),
+    raw_cursor({"kind": "history", "position": ["2025-01-01T00:00:00Z", 3, 4]}),
+    raw_cursor({"kind": "history", "position": [None, 3]}),
+    raw_cursor({"kind": "history", "position": ["2025-01-01T00:00:00Z", "3"]}),
+    raw_cursor({"kind": "history", "position": ["2025-01-01T00:00:00Z", True]}),
+    raw_cursor({"kind": "history", "position": ["2025-01-01T00:00:00Z", -1]}),
+]
+
+
+@pytest.mark.parametrize(
+    ("kind", "position"),
+    [("history", ["2025-01-01T00:00:00Z", 42]), ("subscriptions", [None, 0])],
+)
+def test_cursor_round_trip(kind, position):
+    assert decode_cursor(kind, encode_cursor(kind, position)) == position
+
+
+@pytest.mark.parametrize("cursor", TAMPERED_CURSORS)
+def test_tampered_cursor_is_rejected(cursor):
+    with pytest.raises(InvalidListingRequest, match="Not a valid history cursor"):
+        decode_cursor("history", cursor)
+
+
+def test_unknown_fields_are_rejected():
+    with pytest.raises(InvalidListingRequest, match="Unknown fields: colour, size"):
+        select_fields([{"title": "x"}], ["title", "colour", "size"], ["title"])
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("path", ["/api/history", "/api/subscriptions"])
+@pytest.mark.parametrize("cursor", [TAMPERED_CURSORS[0], TAMPERED_CURSORS[7]])
+async def test_bad_cursor_is_a_client_error(monkeypatch, path, cursor):
+    monkeypatch.setattr(web_interface, "get_credentials", AnonymousCredentials)
+    transport = httpx.ASGITransport(app=web_interface.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as http:
+        response = await http.get(path, params={"cursor": cursor})
+
+    assert response.status_code == 400
+    assert "cursor" in response.json()["detail"]
@@ -0,0 +1,134 @@
+import asyncio
+
+import pytest
+
+from app import monitor_worker
+from app.events import EventBroadcaster
+from app.monitor_worker import MonitorWorker
+
+
+class FakeYouTube:
+    """Watch history and analyses the worker sees, counting how often it asks."""
+
+    def __init__(self):
+        self.latest_id = "vid1"
+        self.history_calls = 0
+        self.failures = 0
+        self.release = asyncio.Event()
+        self.release.set()
+
+    async def get_watch_history(self, context, credentials, limit):
+        self.history_calls += 1
+        await self.release.wait()
+        if self.failures:
+            self.failures -= 1
+            raise RuntimeError("YouTube is down")
+        return [{"video_id": self.latest_id, "title": f"Video {self.latest_id}"}]
+
+    async def analyze_videos(self, videos):
+        for video in videos:
+            yield {"video_id": video["video_id"], "educational_score": 5}
+
+
+@pytest.fixture
+def youtube(monkeypatch):
+    youtube = FakeYouTube()
+    monkeypatch.setattr(monitor_worker, "get_watch_history", youtube.get_watch_history)
+    monkeypatch.setattr(monitor_worker, "analyze_videos", youtube.analyze_videos)
+    return youtube
+
+
+def make_worker(interval=60.0, lock_path=None):
+    return MonitorWorker(
+        lambda: None, interval=interval, events=EventBroadcaster(), lock_path=lock_path
+    )
+
+
+@pytest.mark.asyncio
+async def test_stale_result_is_served_while_it_is_revalidated(youtube):
+    worker = make_worker()
+    assert (await worker.latest())["video_id"] == "vid1"
+
+    # Stale, and the refresh it starts is held up until released
+    worker.refreshed_at -= worker.interval
+    youtube.latest_id = "vid2"
+    youtube.release.clear()
+    results = await asyncio.gather(*(worker.latest() for _ in range(5)))
+
+    assert [result["video_id"] for result in results] == ["vid1"] * 5
+    await asyncio.sleep(0)
+    assert youtube.history_calls == 2
+
+    youtube.release.set()
+    await worker.refresh()
+    assert (await worker.latest())["video_id"] == "vid2"
+    assert not worker.is_stale()
+    await worker.stop()
+
+
+@pytest.mark.asyncio
+async def test_failed_revalidation_keeps_the_last_good_result(youtube):
+    worker = make_worker()
+    await worker.latest()
+    worker.refreshed_at -= worker.interval
+    youtube.failures = 1
+
+    assert (await worker.latest())["video_id"] == "vid1"
+    with pytest.raises(monitor_worker.MonitorRefreshError, match="YouTube is down"):
+        await worker.refresh()
+    assert worker.latest_result["video_id"] == "vid1"
+    assert worker.is_stale()
+    await worker.stop()
+
+
+@pytest.mark.asyncio
+async def test_poll_loop_survives_failed_refreshes(youtube):
+    youtube.failures = 2
+    worker = make_worker(interval=0.01)
+
+    worker.start()
+    for _ in range(100):
+        if worker.latest_result is not None:
+            break
+        await asyncio.sleep(0.01)
+    await worker.stop()
+
+    assert worker.latest_result["video_id"] == "vid1"
+    assert youtube.history_calls >= 3
+
+
+@pytest.mark.asyncio
+async def test_one_process_at_a_time_is_elected_poller(tmp_path):
+    lock_path = str(tmp_path / "monitor.lock")
+    first, second = make_worker(lock_path=lock_path), make_worker(lock_path=lock_path)
+
+    assert first.is_poller()
+    assert not second.is_poller()
+    assert first.is_poller()
+
+    # The lock is released when the poller stops, and taken over on the next attempt
+    await first.stop()
+    assert second.is_poller()
+    assert not first.is_poller()
+    await second.stop()
+
+
+def test_without_a_lock_path_every_process_polls():
+    assert make_worker().is_poller()
+    assert make_worker().is_poller()
+
+
+@pytest.mark.asyncio
+async def test_only_the_poller_publishes_events(youtube, tmp_path):
+    """Test that an on-demand refresh in another process does not repeat the poller's events."""
+    lock_path = str(tmp_path / "monitor.lock")
+    poller, other = make_worker(lock_path=lock_path), make_worker(lock_path=lock_path)
+    assert poller.is_poller()
+
+    await poller.refresh()
+    assert (await other.latest())["video_id"] == "vid1"
+
+    assert [event.type for event in poller.events._recent] == ["video", "analysis", "latest"]
+    assert not other.events._recent
+    await poller.stop()
+    await other.stop()
@@ -0,0 +1,80 @@
+import pytest
+
+from app.analysis_cache import AnalysisCache
+from app.preclassifier import (
+    CHANNEL_AUDIT_RATE,
+    KEYWORD_MAX_CONFIDENCE,
+    PRECLASSIFIER_THRESHOLD,
+    preclassify,
+)
+
+
+def classify(title, description="", channel_title="Someone"):
+    video = {"title": title, "description": description, "channel_title": channel_title}
+    return preclassify(video, AnalysisCache(":memory:"), "fingerprint")
+
+
+@pytest.mark.parametrize(
+    "title",
+    [
+        "How I lost everything",
+        "Why nobody talks about this",
+        "Official trailer - LIVE stream reaction",
+        "Beating the final boss on level 99",
+    ],
+)
+def test_generic_words_do_not_classify(title):
+    """Test that everyday words no longer pick a category."""
+    assert classify(title) is None
+
+
+def test_keywords_never_skip_the_llm():
+    """Test that piling up phrases stays below the threshold."""
+    title = "Physics lecture: full course for beginners, explained (documentary lesson)"
+    classification = classify(title, description=title)
+
+    assert classification.rule == "keywords"
+    assert classification.confidence <= KEYWORD_MAX_CONFIDENCE < PRECLASSIFIER_THRESHOLD
+
+
+def test_music_is_not_rated_all_ages_from_keywords():
+    """Test that explicit music cannot come out as suitable for everyone without the LLM."""
+    classification = classify("Explicit Rapper - Track (Official Music Video)", "lyric video")
+
+    assert classification.analysis["age_appropriateness"] != "All Ages"
+    assert classification.analysis["concerns"]
+    assert classification.confidence < PRECLASSIFIER_THRESHOLD
+
+
+def test_allowed_channel_skips_the_llm():
+    classification = classify("Intro to fractions", channel_title="Khan Academy")
+
+    assert classification.rule == "allowlist"
+    assert classification.confidence >= PRECLASSIFIER_THRESHOLD
+    assert classification.analysis["age_appropriateness"] == "All Ages"
+    assert classification.analysis["concerns"] == []
+
+
+def test_a_sample_of_reputation_hits_still_goes_to_the_llm():
+    """Test that a learned channel reputation answers most videos but not the audited share."""
+    cache = AnalysisCache(":memory:")
+    analysis = {
+        "educational_score": 7,
+        "topics": ["History"],
+        "age_appropriateness": "Teens",
+        "learning_potential": "High",
+        "concerns": [],
+    }
+    for _ in range(20):
+        cache.record_channel("Someone", "fingerprint", analysis)
+    videos = [
+        {"video_id": f"vid{i}", "title": "Untitled", "description": "", "channel_title": "Someone"}
+        for i in range(1000)
+    ]
+
+    answered = [preclassify(video, cache, "fingerprint") for video in videos]
+
+    audited = sum(classification is None for classification in answered)
+    assert all(c is None or c.rule == "channel" for c in answered)
+    assert abs(audited / len(videos) - CHANNEL_AUDIT_RATE) < 0.05
+    assert answered == [preclassify(video, cache, "fingerprint") for video in videos]
@@ -1,37 +1,77 @@
+import asyncio
+import json
+import logging
 import os
+from collections.abc import AsyncIterator, Callable
+from contextlib import aclosing, asynccontextmanager
+from functools import partial
+from pathlib import Path
 from typing import Annotated, Any
 
 import uvicorn
 from dotenv import load_dotenv
-from fastapi import FastAPI, HTTPException
-from fastapi.openapi.docs import get_swagger_ui_html, get_redoc_html
-from fastapi.openapi.utils import get_openapi
-from fastapi.responses import HTMLResponse, JSONResponse
+from fastapi import FastAPI, Header, HTTPException, Query, Request
+from fastapi.openapi.docs import get_redoc_html, get_swagger_ui_html
+from fastapi.responses import HTMLResponse, JSONResponse, Response, StreamingResponse
 from google.oauth2.credentials import Credentials
-from pydantic import BaseModel, Field
 
-from app.content_monitor import analyze_latest_video
+from app.analysis_cache import get_analysis_cache
+from app.cached_response import CachedResponse
+from app.content_monitor import analyze_videos, stream_latest_video_analysis
+from app.listing import (
+    HISTORY_FIELDS,
+    SUBSCRIPTION_FIELDS,
+    list_history,
+    list_subscriptions,
+)
+from app.models import AnalysisStats, VideoAnalysis, WatchAnalytics
+from app.monitor_worker import MonitorWorker
+from app.preclassifier import analysis_stats
+from arcade_youtube.core.cache import get_metadata_cache
+from arcade_youtube.core.constants import FANOUT_ACCOUNT_TIMEOUT, TOKEN_STORE_WAIT
+from arcade_youtube.core.credentials import CredentialManager, default_token_store
+from arcade_youtube.core.fanout import fan_out
+from arcade_youtube.core.sync import get_sync_engine
 from arcade_youtube.tools.constants import YOUTUBE_READONLY_SCOPE
+from arcade_youtube.tools.youtube_client import (
+    ACCOUNT_OPERATIONS,
+    fetch_account_overview,
+    get_watch_history,
+    get_watch_time_breakdown,
+)
 
 # Load environment variables
 load_dotenv()
 
-# Define response models
-class AIAnalysis(BaseModel):
-    educational_score: float = Field(..., ge=0, le=10, description="Educational value score from 0 to 10")
-    topics: list[str] = Field(..., description="List of topics covered in the video")
-    age_appropriateness: str = Field(..., description="Age group the content is appropriate for")
-    learning_potential: str = Field(..., description="Potential for learning from the content")
-    concerns: list[str] = Field(..., description="List of potential concerns")
-    explanation: str = Field(..., description="Detailed explanation of the analysis")
-
-class VideoAnalysis(BaseModel):
-    video_id: str = Field(..., description="YouTube video ID")
-    title: str = Field(..., description="Video title")
-    published_at: str = Field(..., description="Publication date and time")
-    description: str = Field(..., description="Video description")
-    channel: str = Field(..., description="Channel name")
-    ai_analysis: AIAnalysis = Field(..., description="AI-generated analysis of the video")
+logger = logging.getLogger(__name__)
+
+# Keeps the latest video's analysis precomputed while the app is running
+monitor_worker = MonitorWorker(lambda: get_credentials())
+
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    # Warm up before taking traffic: open the shared stores and get valid tokens
+    get_metadata_cache()
+    get_sync_engine()
+    get_analysis_cache()
+    load_account_managers()
+    managers = [credential_manager, *account_managers.values()]
+    # The poller refreshes for every process; the others adopt its tokens from the store
+    poller = monitor_worker.is_poller()
+    if poller:
+        results = await asyncio.gather(
+            *(manager.get_fresh() for manager in managers), return_exceptions=True
+        )
+        for result in results:
+            if isinstance(result, Exception):
+                logger.warning(f"Could not refresh credentials during startup: {result}")
+    for manager in managers:
+        manager.start(delay=0.0 if poller else TOKEN_STORE_WAIT)
+    monitor_worker.start()
+    yield
+    # Let in-flight refreshes stop and release the poller lock before exiting
+    await monitor_worker.stop()
+    await asyncio.gather(*(manager.stop() for manager in managers))
 
 # Initialize FastAPI app with metadata
 app = FastAPI(
@@ -40,10 +80,12 @@ app = FastAPI(
     version="1.0.0",
     docs_url=None,  # Disable default docs
     redoc_url=None,  # Disable default redoc
+    openapi_url=None,  # Disable default schema route, served from cache below
+    lifespan=lifespan,
 )
 
-def get_credentials() -> Credentials:
-    """Get credentials from environment variables."""
+def credentials_from_env() -> Credentials:
+    """Build credentials from environment variables."""
     return Credentials(
         token=os.getenv("YOUTUBE_TOKEN"),
         refresh_token=os.getenv("YOUTUBE_REFRESH_TOKEN"),
@@ -53,12 +95,67 @@ def get_credentials() -> Credentials:
         scopes=[YOUTUBE_READONLY_SCOPE]
     )
 
+# Tokens refreshed for one request are kept for the next, and renewed before they expire
+token_store = default_token_store()
+credential_manager = CredentialManager(credentials_from_env, store=token_store)
+account_managers: dict[str, CredentialManager] = {}
+
+def get_credentials() -> Credentials:
+    """Get the long-lived credentials of the account configured in the environment."""
+    return credential_manager.get()
+
+def account_credentials_from_file(path: str) -> dict[str, Callable[[], Credentials]]:
+    """Read credential builders for every account in an accounts file."""
+    with open(path) as f:
+        accounts = json.load(f)
+    return {
+        name: partial(
+            Credentials,
+            token=account.get("token"),
+            refresh_token=account.get("refresh_token"),
+            token_uri=account.get("token_uri"),
+            client_id=account.get("client_id"),
+            client_secret=account.get("client_secret"),
+            scopes=[YOUTUBE_READONLY_SCOPE]
+        )
+        for name, account in accounts.items()
+    }
+
+def load_account_managers() -> bool:
+    """Create a manager for every account in YOUTUBE_ACCOUNTS_FILE; False if it is unset."""
+    path = os.getenv("YOUTUBE_ACCOUNTS_FILE")
+    if not path:
+        return False
+    if not account_managers:
+        account_managers.update(
+            (name, CredentialManager(build, store=token_store))
+            for name, build in account_credentials_from_file(path).items()
+        )
+    return True
+
+def get_account_credentials() -> dict[str, Credentials]:
+    """Get credentials for every monitored account, keyed by account name.
+
+    Accounts are read from the JSON file named by YOUTUBE_ACCOUNTS_FILE, an object
+    mapping each account name to its token, refresh_token, token_uri, client_id and
+    client_secret. Without it the single account from the environment is used.
+    Each account's credentials are kept and refreshed like get_credentials'."""
+    if not load_account_managers():
+        return {"default": get_credentials()}
+    return {name: manager.get() for name, manager in account_managers.items()}
+
+# Built on first use and served from memory; the dashboard is always revalidated, since a
+# deploy can change it, while the generated docs only change with the code
+dashboard_page = CachedResponse.from_file(
+    Path(__file__).parent / "templates" / "index.html",
+    media_type="text/html; charset=utf-8",
+    cache_control="public, no-cache",
+)
+
 @app.get("/", response_class=HTMLResponse)
-async def home():
+async def home(request: Request) -> Response:
     """Serve the main dashboard interface."""
-    with open("youtube/app/templates/index.html") as f:
-        html_content = f.read()
-    return HTMLResponse(content=html_content)
+    return dashboard_page.respond(request)
 
 def handle_error(error_msg: str, status_code: int = 400) -> None:
     """Raise HTTPException with the given error message and status code."""
@@ -72,49 +169,357 @@ def handle_error(error_msg: str, status_code: int = 400) -> None:
         500: {"description": "Internal server error"}
     },
     summary="Analyze Latest Video",
-    description="Analyzes the educational value of the most recently watched YouTube video using AI."
+    description=(
+        "Analyzes the educational value of the most recently watched YouTube video using AI. "
+        "Serves the analysis precomputed by the background monitor; the Age header says how "
+        "old it is, and a stale analysis is refreshed in the background."
+    )
 )
-async def analyze_latest() -> Annotated[dict[str, Any], "Analysis results including video details and AI assessment"]:
+async def analyze_latest() -> Annotated[
+    dict[str, Any], "Analysis results including video details and AI assessment"
+]:
     """Analyze the educational value of the most recently watched video."""
     try:
-        credentials = get_credentials()
-        result = await analyze_latest_video(credentials)
+        result = await monitor_worker.latest()
 
         if "error" in result:
             handle_error(result["error"])
 
-        return JSONResponse(content=result)
+        return JSONResponse(content=result, headers={"Age": str(int(monitor_worker.age or 0))})
+
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e)) from e
+
+@app.get(
+    "/api/events",
+    responses={
+        200: {
+            "content": {"text/event-stream": {}},
+            "description": (
+                '"video" events for newly watched videos, "analysis" events with their '
+                'VideoAnalysis as the background monitor finds them, and a "latest" event '
+                "whenever the most recently watched video's analysis changes"
+            ),
+        },
+    },
+    summary="Live Monitor Events",
+    description=(
+        "Server-sent events pushed from the single background monitor to every connected "
+        "client, whichever worker serves it. New clients first get the latest event, and "
+        "reconnecting clients resume after their Last-Event-ID."
+    ),
+)
+async def monitor_events(
+    request: Request,
+    last_event_id: Annotated[
+        int | None, Header(description="ID of the last event received")
+    ] = None,
+) -> StreamingResponse:
+    """Stream monitor events to the client as server-sent events."""
+
+    async def stream() -> AsyncIterator[str]:
+        # New clients start from the latest analysis rather than wait for the next change
+        events = monitor_worker.events.subscribe(last_event_id, snapshot="latest")
+        async with aclosing(events):
+            async for event in events:
+                if await request.is_disconnected():
+                    break
+                yield ": keep-alive\n\n" if event is None else event.to_sse()
+
+    return StreamingResponse(
+        stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+@app.get(
+    "/api/analyze-latest/stream",
+    responses={
+        200: {
+            "content": {"application/x-ndjson": {}},
+            "description": (
+                'A {"video": ...} line, one {"field": ..., "value": ...} line per analysis '
+                'field as the model writes it, then {"ai_analysis": ...}; or an {"error": ...} line'
+            ),
+        },
+    },
+    summary="Stream Latest Video Analysis",
+    description="Streams the analysis of the most recently watched video field by field.",
+)
+async def analyze_latest_stream() -> StreamingResponse:
+    """Stream the latest video's analysis as newline-delimited JSON."""
+    credentials = get_credentials()
+
+    async def stream() -> AsyncIterator[str]:
+        events = stream_latest_video_analysis(credentials)
+        async with aclosing(events):
+            async for event in events:
+                yield json.dumps(event) + "\n"
+
+    return StreamingResponse(stream(), media_type="application/x-ndjson")
+
+@app.get(
+    "/api/analyze-history",
+    responses={
+        200: {
+            "content": {"application/x-ndjson": {}},
+            "description": (
+                "One VideoAnalysis per line in the order analyses finish, or an object "
+                "with video_id and error for videos that could not be analyzed"
+            ),
+        },
+        400: {"description": "No watch history found"},
+    },
+    summary="Analyze Watch History",
+    description=(
+        "Analyzes the educational value of recently watched videos concurrently, streaming "
+        "each video's analysis as soon as it is ready."
+    ),
+)
+async def analyze_history(
+    limit: Annotated[
+        int, Query(ge=1, le=50, description="Number of recent videos to analyze")
+    ] = 10,
+    batch_size: Annotated[
+        int, Query(ge=1, le=10, description="Videos analyzed per LLM request")
+    ] = 1,
+) -> StreamingResponse:
+    """Stream analyses of recently watched videos as newline-delimited JSON."""
+    credentials = get_credentials()
+    history = await get_watch_history(None, credentials=credentials, limit=limit)
+    if not history:
+        handle_error("No watch history found")
+
+    async def stream() -> AsyncIterator[str]:
+        results = analyze_videos(history, batch_size=batch_size)
+        async with aclosing(results):
+            async for result in results:
+                yield json.dumps(result) + "\n"
+
+    return StreamingResponse(stream(), media_type="application/x-ndjson")
+
+@app.get(
+    "/api/analysis-stats",
+    response_model=AnalysisStats,
+    summary="Analysis Tier Statistics",
+    description="Reports how often the cache, pre-classifier and AI answered, and how fast.",
+)
+async def get_analysis_stats() -> Annotated[dict[str, Any], "Per-tier hit rates and latencies"]:
+    """Report per-tier hit rates and latencies of video analyses."""
+    return analysis_stats.as_dict()
+
+def parse_fields(fields: str | None) -> list[str] | None:
+    """Split a comma-separated field selection."""
+    return [name.strip() for name in fields.split(",") if name.strip()] if fields else None
+
+@app.get(
+    "/api/history",
+    responses={400: {"description": "Invalid cursor, field or timestamp"}},
+    summary="Watch History",
+    description=(
+        "Lists watched videos newest first, one page at a time. Pass next_cursor back as "
+        "cursor to get the following page; it is null on the last page."
+    ),
+)
+async def history(
+    limit: Annotated[int, Query(ge=1, le=100, description="Videos per page")] = 20,
+    cursor: Annotated[str | None, Query(description="next_cursor of the previous page")] = None,
+    published_after: Annotated[
+        str | None, Query(description="Only videos watched at or after this RFC 3339 time")
+    ] = None,
+    published_before: Annotated[
+        str | None, Query(description="Only videos watched before this RFC 3339 time")
+    ] = None,
+    channel: Annotated[str | None, Query(description="Only videos from this channel")] = None,
+    fields: Annotated[
+        str | None, Query(description=f"Comma-separated subset of: {', '.join(HISTORY_FIELDS)}")
+    ] = None,
+) -> Annotated[dict[str, Any], "Page of watched videos and the cursor of the next page"]:
+    """List watch history with cursor pagination and filters."""
+    try:
+        return await list_history(
+            get_credentials(),
+            limit,
+            cursor=cursor,
+            published_after=published_after,
+            published_before=published_before,
+            channel=channel,
+            fields=parse_fields(fields),
+        )
+    except ValueError as e:
+        # Malformed cursors, unknown fields and unparseable timestamps
+        raise HTTPException(status_code=400, detail=str(e)) from e
+
+@app.get(
+    "/api/subscriptions",
+    responses={400: {"description": "Invalid cursor, field or timestamp"}},
+    summary="Subscriptions",
+    description=(
+        "Lists channel subscriptions one page at a time. Pass next_cursor back as cursor "
+        "to get the following page; it is null on the last page."
+    ),
+)
+async def subscriptions(
+    limit: Annotated[int, Query(ge=1, le=100, description="Subscriptions per page")] = 20,
+    cursor: Annotated[str | None, Query(description="next_cursor of the previous page")] = None,
+    subscribed_after: Annotated[
+        str | None, Query(description="Only subscriptions made at or after this RFC 3339 time")
+    ] = None,
+    subscribed_before: Annotated[
+        str | None, Query(description="Only subscriptions made before this RFC 3339 time")
+    ] = None,
+    channel: Annotated[
+        str | None, Query(description="Only channels whose title contains this text")
+    ] = None,
+    fields: Annotated[
+        str | None,
+        Query(description=f"Comma-separated subset of: {', '.join(SUBSCRIPTION_FIELDS)}"),
+    ] = None,
+) -> Annotated[dict[str, Any], "Page of subscriptions and the cursor of the next page"]:
+    """List subscriptions with cursor pagination and filters."""
+    try:
+        return await list_subscriptions(
+            get_credentials(),
+            limit,
+            cursor=cursor,
+            subscribed_after=subscribed_after,
+            subscribed_before=subscribed_before,
+            channel=channel,
+            fields=parse_fields(fields),
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e)) from e
 
+@app.get(
+    "/api/watch-analytics",
+    response_model=WatchAnalytics,
+    responses={500: {"description": "Internal server error"}},
+    summary="Watch Time Analytics",
+    description="Breaks watch time down by day, hour of day and channel, with duration percentiles."
+)
+async def watch_analytics(
+    days: Annotated[
+        int, Query(ge=1, le=365, description="Number of days of history to analyze")
+    ] = 30,
+    utc_offset_minutes: Annotated[
+        int, Query(ge=-720, le=840, description="Viewer's offset from UTC in minutes")
+    ] = 0,
+    top_channels: Annotated[
+        int, Query(ge=1, le=100, description="Number of most-watched channels to include")
+    ] = 10,
+) -> Annotated[dict[str, Any], "Watch time totals and breakdowns"]:
+    """Break watch time down by day, hour of day and channel."""
+    try:
+        credentials = get_credentials()
+        return await get_watch_time_breakdown(
+            None,
+            credentials=credentials,
+            days=days,
+            utc_offset_minutes=utc_offset_minutes,
+            top_channels=top_channels,
+        )
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e)) from e
 
+# Every operation, the default selection of the overview endpoint
+ALL_ACCOUNT_OPERATIONS = list(ACCOUNT_OPERATIONS)
+
+@app.get(
+    "/api/accounts/overview",
+    responses={
+        200: {
+            "content": {"application/x-ndjson": {}},
+            "description": "One JSON object per account, in the order accounts finish",
+        },
+        400: {"description": "Unknown operation or account"},
+    },
+    summary="Multi-Account Overview",
+    description=(
+        "Fetches history, subscriptions and watch time stats for every monitored account "
+        "concurrently and streams each account's result as soon as it is ready."
+    ),
+)
+async def accounts_overview(
+    operations: Annotated[
+        list[str], Query(description="Operations to run for each account")
+    ] = ALL_ACCOUNT_OPERATIONS,
+    accounts: Annotated[
+        list[str] | None, Query(description="Accounts to include, defaults to all")
+    ] = None,
+    limit: Annotated[
+        int, Query(ge=1, le=50, description="History items and subscriptions per account")
+    ] = 5,
+    timeout: Annotated[
+        float, Query(gt=0, le=600, description="Seconds allowed per account")
+    ] = FANOUT_ACCOUNT_TIMEOUT,
+) -> StreamingResponse:
+    """Stream per-account results as newline-delimited JSON."""
+    unknown = [name for name in operations if name not in ACCOUNT_OPERATIONS]
+    if unknown:
+        handle_error(f"Unknown operations: {', '.join(unknown)}")
+    credentials = get_account_credentials()
+    if accounts:
+        missing = [name for name in accounts if name not in credentials]
+        if missing:
+            handle_error(f"Unknown accounts: {', '.join(missing)}")
+        credentials = {name: credentials[name] for name in accounts}
+
+    async def stream() -> AsyncIterator[str]:
+        results = fan_out(
+            credentials,
+            lambda backend: fetch_account_overview(backend, operations, limit),
+            timeout=timeout,
+        )
+        # Closing the fan-out on client disconnect cancels accounts still in flight
+        async with aclosing(results):
+            async for result in results:
+                yield json.dumps(result.as_dict()) + "\n"
+
+    return StreamingResponse(stream(), media_type="application/x-ndjson")
+
 # Custom documentation endpoints
-@app.get("/docs", include_in_schema=False)
-async def custom_swagger_ui_html():
-    return get_swagger_ui_html(
+DOCS_CACHE_CONTROL = "public, max-age=3600"
+
+swagger_page = CachedResponse(
+    lambda: get_swagger_ui_html(
         openapi_url="/openapi.json",
         title=app.title + " - Swagger UI",
         oauth2_redirect_url=app.swagger_ui_oauth2_redirect_url,
         swagger_js_url="https://cdn.jsdelivr.net/npm/swagger-ui-dist@5.9.0/swagger-ui-bundle.js",
         swagger_css_url="https://cdn.jsdelivr.net/npm/swagger-ui-dist@5.9.0/swagger-ui.css",
-    )
+    ).body,
+    media_type="text/html; charset=utf-8",
+    cache_control=DOCS_CACHE_CONTROL,
+)
 
-@app.get("/redoc", include_in_schema=False)
-async def redoc_html():
-    return get_redoc_html(
+redoc_page = CachedResponse(
+    lambda: get_redoc_html(
         openapi_url="/openapi.json",
         title=app.title + " - ReDoc",
         redoc_js_url="https://cdn.jsdelivr.net/npm/redoc@next/bundles/redoc.standalone.js",
-    )
+    ).body,
+    media_type="text/html; charset=utf-8",
+    cache_control=DOCS_CACHE_CONTROL,
+)
+
+# Generated once, after every route has been registered
+openapi_schema = CachedResponse(
+    lambda: JSONResponse(app.openapi()).body,
+    media_type="application/json",
+    cache_control=DOCS_CACHE_CONTROL,
+)
+
+@app.get("/docs", include_in_schema=False)
+async def custom_swagger_ui_html(request: Request) -> Response:
+    return swagger_page.respond(request)
+
+@app.get("/redoc", include_in_schema=False)
+async def redoc_html(request: Request) -> Response:
+    return redoc_page.respond(request)
 
 @app.get("/openapi.json", include_in_schema=False)
-async def get_openapi_endpoint():
-    return get_openapi(
-        title=app.title,
-        version=app.version,
-        description=app.description,
-        routes=app.routes,
-    )
+async def get_openapi_endpoint(request: Request) -> Response:
+    return openapi_schema.respond(request)
 
 if __name__ == "__main__":
     uvicorn.run(app, host="127.0.0.1", port=8000)
@@ -0,0 +1,245 @@
+"""Asyncio YouTube API backend built on a pooled httpx client."""
+import asyncio
+from collections.abc import AsyncIterator, Iterable
+from typing import Annotated, Any, cast
+
+import httpx
+from google.oauth2.credentials import Credentials
+
+from .backend import YouTubeAPINotEnabledError
+from .cache import MetadataCache, VideoRequest, get_metadata_cache
+from .client import YouTubeClientFactory, get_client_factory
+from .coalesce import SingleFlight, get_single_flight
+from .constants import (
+    DEFAULT_MAX_CONCURRENCY,
+    DEFAULT_MAX_RESULTS,
+    MAX_PAGE_SIZE,
+)
+from .credentials import get_credential_manager
+from .projection import ACTIVITY_FULL, SUBSCRIPTION_FULL, VIDEO_FULL, Projection
+from .scheduler import Priority, QuotaScheduler, credential_key, get_quota_scheduler
+
+
+class AsyncYouTubeBackend:
+    """Low-level YouTube API interactions that never block the event loop.
+
+    Mirrors `YouTubeBackend`, but requests go through the factory's pooled
+    `httpx.AsyncClient` and at most `max_concurrency` of them are in flight."""
+
+    def __init__(
+        self,
+        credentials: Annotated[Credentials, "OAuth credentials for YouTube API"],
+        factory: Annotated[
+            YouTubeClientFactory | None, "Client factory, defaults to the process-wide one"
+        ] = None,
+        max_concurrency: Annotated[
+            int, "Maximum concurrent API requests"
+        ] = DEFAULT_MAX_CONCURRENCY,
+        cache: Annotated[
+            MetadataCache | None, "Metadata cache, defaults to the process-wide one"
+        ] = None,
+        scheduler: Annotated[
+            QuotaScheduler | None, "Quota scheduler, defaults to the process-wide one"
+        ] = None,
+        priority: Annotated[Priority, "Priority of this backend's requests"] = Priority.INTERACTIVE,
+        coalescer: Annotated[
+            SingleFlight | None, "Request coalescer, defaults to the process-wide one"
+        ] = None,
+    ):
+        """Initialize the backend.
+        Args: credentials: A Credentials object for OAuth authentication
+              factory: Source of the pooled async HTTP client
+              max_concurrency: Upper bound on requests in flight at once
+              cache: Where video metadata is cached between calls
+              scheduler: Enforces quota and rate limits and retries transient errors
+              priority: BACKGROUND requests are shed first when quota runs low
+              coalescer: Shares identical requests already in flight for the same account"""
+        self.credentials = credentials
+        self._factory = factory or get_client_factory()
+        self.cache = cache or get_metadata_cache()
+        self.scheduler = scheduler or get_quota_scheduler()
+        self.priority = priority
+        self.coalescer = coalescer or get_single_flight()
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+
+    async def _execute_request(
+        self, resource: str, params: dict[str, Any], etag: str | None = None
+    ) -> dict | None:
+        """Execute a GET against a YouTube Data API list endpoint.
+
+        Runs under quota, rate limits and retries. With an etag the request is
+        conditional, and None means 304 Not Modified. Identical requests for the
+        same account that are already in flight are joined instead of sent again."""
+        key = (credential_key(self.credentials), resource, tuple(sorted(params.items())), etag)
+        return await self.coalescer.do_async(
+            key,
+            lambda: self.scheduler.execute_async(
+                lambda: self._send_request(resource, params, etag),
+                f"youtube.{resource}.list",
+                self.credentials,
+                self.priority,
+            ),
+        )
+
+    async def _send_request(
+        self, resource: str, params: dict[str, Any], etag: str | None
+    ) -> dict | None:
+        """Send a GET to a YouTube Data API list endpoint once."""
+        query = {"alt": "json", **params}
+        query = {key: query[key] for key in sorted(query)}
+        client = self._factory.async_client()
+        # Refreshes go through the credentials' manager, so they are shared process-wide
+        manager = get_credential_manager(self.credentials)
+        async with self._semaphore:
+            for attempt in range(2):
+                if not self.credentials.valid:
+                    await manager.get_fresh()
+                headers: dict[str, str] = {"If-None-Match": etag} if etag else {}
+                sent_token = self.credentials.token
+                self.credentials.apply(headers)
+                response = await client.get(
+                    f"{self._factory.api_url}/{resource}", params=query, headers=headers
+                )
+                if response.status_code == httpx.codes.UNAUTHORIZED and attempt == 0:
+                    # Refreshes only if no other request replaced the rejected token yet
+                    await manager.get_fresh(rejected_token=sent_token)
+                    continue
+                break
+        if etag and response.status_code == httpx.codes.NOT_MODIFIED:
+            return None
+        if response.is_error and "API has not been used" in response.text:
+            raise YouTubeAPINotEnabledError()
+        response.raise_for_status()
+        return cast(dict, response.json())
+
+    async def _iter_pages(
+        self, resource: str, params: dict[str, Any], max_items: int | None = None
+    ) -> AsyncIterator[dict]:
+        """Yield items from every page of a list endpoint, following nextPageToken.
+
+        The next page is requested as a background task while the caller consumes
+        the current one, and no further page is requested once max_items items
+        have been seen."""
+        task: asyncio.Task | None = asyncio.create_task(self._execute_request(resource, params))
+        remaining = max_items
+        try:
+            while task is not None:
+                response = (await task) or {}
+                items = response.get("items", [])
+                if remaining is not None:
+                    items = items[:remaining]
+                    remaining -= len(items)
+                task = None
+                page_token = response.get("nextPageToken")
+                if page_token and remaining != 0:
+                    params = {**params, "pageToken": page_token}
+                    task = asyncio.create_task(self._execute_request(resource, params))
+                for item in items:
+                    yield item
+        finally:
+            if task is not None:
+                task.cancel()
+
+    def iter_activities(
+        self,
+        page_size: Annotated[int, "Number of activities requested per page"] = MAX_PAGE_SIZE,
+        max_items: Annotated[int | None, "Stop after this many activities"] = None,
+        published_after: Annotated[
+            str | None, "RFC 3339 timestamp; only activities from then on are returned"
+        ] = None,
+        projection: Annotated[Projection, "Parts and fields to request"] = ACTIVITY_FULL,
+    ) -> AsyncIterator[dict]:
+        """Lazily iterate over user activities, newest first."""
+        params: dict[str, Any] = {
+            "mine": "true",
+            "maxResults": min(page_size, MAX_PAGE_SIZE),
+            **projection.params,
+        }
+        if published_after:
+            params["publishedAfter"] = published_after
+        return self._iter_pages("activities", params, max_items)
+
+    def iter_subscriptions(
+        self,
+        page_size: Annotated[int, "Number of subscriptions requested per page"] = MAX_PAGE_SIZE,
+        max_items: Annotated[int | None, "Stop after this many subscriptions"] = None,
+        projection: Annotated[Projection, "Parts and fields to request"] = SUBSCRIPTION_FULL,
+    ) -> AsyncIterator[dict]:
+        """Lazily iterate over user subscriptions."""
+        params = {"mine": "true", "maxResults": min(page_size, MAX_PAGE_SIZE), **projection.params}
+        return self._iter_pages("subscriptions", params, max_items)
+
+    async def fetch_subscriptions_page(
+        self,
+        page_size: Annotated[int, "Number of subscriptions requested"] = MAX_PAGE_SIZE,
+        page_token: Annotated[str | None, "nextPageToken of the previous page"] = None,
+        projection: Annotated[Projection, "Parts and fields to request"] = SUBSCRIPTION_FULL,
+    ) -> tuple[list[dict], str | None]:
+        """Fetch one page of user subscriptions and the token of the page after it."""
+        params = {"mine": "true", "maxResults": min(page_size, MAX_PAGE_SIZE), **projection.params}
+        if page_token:
+            params["pageToken"] = page_token
+        response = await self._execute_request("subscriptions", params) or {}
+        return response.get("items", []), response.get("nextPageToken")
+
+    async def fetch_activities(
+        self,
+        max_results: Annotated[int, "Maximum number of activities to fetch"] = DEFAULT_MAX_RESULTS,
+        projection: Annotated[Projection, "Parts and fields to request"] = ACTIVITY_FULL,
+    ) -> list[dict]:
+        """Fetch user activities (watch history)."""
+        return [
+            activity
+            async for activity in self.iter_activities(
+                page_size=max_results, max_items=max_results, projection=projection
+            )
+        ]
+
+    async def fetch_subscriptions(
+        self,
+        max_results: Annotated[
+            int, "Maximum number of subscriptions to fetch"
+        ] = DEFAULT_MAX_RESULTS,
+        projection: Annotated[Projection, "Parts and fields to request"] = SUBSCRIPTION_FULL,
+    ) -> list[dict]:
+        """Fetch user subscriptions."""
+        return [
+            subscription
+            async for subscription in self.iter_subscriptions(
+                page_size=max_results, max_items=max_results, projection=projection
+            )
+        ]
+
+    async def fetch_video_details(
+        self,
+        video_id: Annotated[str, "YouTube video ID"],
+        projection: Annotated[Projection, "Parts and fields to request"] = VIDEO_FULL,
+    ) -> dict | None:
+        """Fetch detailed information about a video."""
+        return (await self.fetch_video_details_batch([video_id], projection)).get(video_id)
+
+    async def fetch_video_details_batch(
+        self,
+        video_ids: Annotated[Iterable[str], "YouTube video IDs, duplicates allowed"],
+        projection: Annotated[Projection, "Parts and fields to request"] = VIDEO_FULL,
+    ) -> dict[str, dict]:
+        """Fetch detailed information about many videos, keyed by video ID.
+
+        Fresh cache entries are served locally and stale ones are revalidated with
+        If-None-Match. The remaining IDs are deduplicated and split into chunks of
+        MAX_VIDEO_IDS_PER_REQUEST that are requested concurrently, bounded by the
+        backend's concurrency limit."""
+        unique_ids = list(dict.fromkeys(video_id for video_id in video_ids if video_id))
+        plan = self.cache.plan_video_requests(unique_ids, projection.cache_namespace("videos"))
+        responses = await asyncio.gather(*(
+            self._fetch_videos(planned, projection) for planned in plan.requests
+        ))
+        details = plan.cached
+        for planned, response in zip(plan.requests, responses, strict=True):
+            details.update(self.cache.store_video_response(planned, response))
+        return {video_id: details[video_id] for video_id in unique_ids if video_id in details}
+
+    async def _fetch_videos(self, planned: VideoRequest, projection: Projection) -> dict | None:
+        """Run a planned videos.list call; None means the cached copy is still current."""
+        params = {"id": ",".join(planned.ids), **projection.params}
+        return await self._execute_request("videos", params, etag=planned.etag)
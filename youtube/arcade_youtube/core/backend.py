@@ -1,9 +1,31 @@
-from typing import Annotated
+from collections.abc import Iterable, Iterator
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Annotated, cast
 
 from google.oauth2.credentials import Credentials
-from googleapiclient.discovery import build
+from googleapiclient.discovery import Resource
+from googleapiclient.errors import HttpError
+from googleapiclient.http import HttpRequest
 
-from .constants import DEFAULT_MAX_RESULTS
+from .cache import MetadataCache, VideoRequest, get_metadata_cache
+from .client import YouTubeClientFactory, get_client_factory
+from .coalesce import SingleFlight, get_single_flight
+from .constants import DEFAULT_MAX_RESULTS, MAX_PAGE_SIZE
+from .projection import ACTIVITY_FULL, SUBSCRIPTION_FULL, VIDEO_FULL, Projection
+from .scheduler import (
+    Priority,
+    QuotaScheduler,
+    YouTubeQuotaExceededError,
+    credential_key,
+    get_quota_scheduler,
+)
+
+__all__ = [
+    "YouTubeAPIError",
+    "YouTubeAPINotEnabledError",
+    "YouTubeBackend",
+    "YouTubeQuotaExceededError",
+]
 
 
 class YouTubeAPIError(Exception):
@@ -21,54 +43,194 @@ class YouTubeAPINotEnabledError(YouTubeAPIError):
 class YouTubeBackend:
     """Low-level YouTube API interactions."""
 
-    def __init__(self, credentials: Annotated[Credentials, "OAuth credentials for YouTube API"]):
+    def __init__(
+        self,
+        credentials: Annotated[Credentials, "OAuth credentials for YouTube API"],
+        factory: Annotated[
+            YouTubeClientFactory | None, "Client factory, defaults to the process-wide one"
+        ] = None,
+        cache: Annotated[
+            MetadataCache | None, "Metadata cache, defaults to the process-wide one"
+        ] = None,
+        scheduler: Annotated[
+            QuotaScheduler | None, "Quota scheduler, defaults to the process-wide one"
+        ] = None,
+        priority: Annotated[Priority, "Priority of this backend's requests"] = Priority.INTERACTIVE,
+        coalescer: Annotated[
+            SingleFlight | None, "Request coalescer, defaults to the process-wide one"
+        ] = None,
+    ):
         """Initialize the backend.
-        Args: credentials: A Credentials object for OAuth authentication"""
+        Args: credentials: A Credentials object for OAuth authentication
+              factory: Source of the shared API service and pooled transports
+              cache: Where video metadata is cached between calls
+              scheduler: Enforces quota and rate limits and retries transient errors
+              priority: BACKGROUND requests are shed first when quota runs low
+              coalescer: Shares identical requests already in flight for the same account"""
+        self.credentials = credentials
+        self._factory = factory or get_client_factory()
+        self.cache = cache or get_metadata_cache()
+        self.scheduler = scheduler or get_quota_scheduler()
+        self.priority = priority
+        self.coalescer = coalescer or get_single_flight()
         try:
-            self.youtube = build("youtube", "v3", credentials=credentials)
+            self.youtube = self._factory.service
         except Exception as e:
             if "API has not been used" in str(e):
                 raise YouTubeAPINotEnabledError() from e
             raise
 
-    def _execute_request(self, request):
-        """Execute a YouTube API request."""
-        # TODO: Add proper error handling
-        return request.execute()
+    def _execute_request(self, request: HttpRequest) -> dict:
+        """Execute a YouTube API request under quota, rate limits and retries.
 
-    def fetch_activities(
+        Identical requests for the same account that are already in flight, from
+        any backend in the process, are joined instead of sent again."""
+        key = (
+            credential_key(self.credentials),
+            request.methodId,
+            request.uri,
+            request.headers.get("If-None-Match"),
+        )
+        return self.coalescer.do(
+            key,
+            lambda: self.scheduler.execute(
+                lambda: self._send_request(request),
+                request.methodId,
+                self.credentials,
+                self.priority,
+            ),
+        )
+
+    def _send_request(self, request: HttpRequest) -> dict:
+        """Send a YouTube API request once."""
+        # Each execution gets its own pooled transport since httplib2 is not thread-safe
+        with self._factory.http(self.credentials) as http:
+            return cast(dict, request.execute(http=http))
+
+    def _iter_pages(
+        self, collection: Resource, request: HttpRequest | None, max_items: int | None = None
+    ) -> Iterator[dict]:
+        """Yield items from every page of a list request, following nextPageToken.
+
+        The next page is fetched on a worker thread while the caller consumes the
+        current one. No further page is requested once max_items items have been
+        seen, and closing the generator early discards at most one prefetched page."""
+        executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="youtube-prefetch")
+        future: Future | None = executor.submit(self._execute_request, request)
+        remaining = max_items
+        try:
+            while future is not None:
+                response = future.result()
+                items = response.get("items", [])
+                if remaining is not None:
+                    items = items[:remaining]
+                    remaining -= len(items)
+                request = collection.list_next(request, response)
+                future = None
+                if request is not None and remaining != 0:
+                    future = executor.submit(self._execute_request, request)
+                yield from items
+        finally:
+            if future is not None:
+                future.cancel()
+            executor.shutdown(wait=False)
+
+    def iter_activities(
         self,
-        max_results: Annotated[int, "Maximum number of activities to fetch"] = DEFAULT_MAX_RESULTS,
-    ) -> list[dict]:
-        """Fetch user activities (watch history)."""
+        page_size: Annotated[int, "Number of activities requested per page"] = MAX_PAGE_SIZE,
+        max_items: Annotated[int | None, "Stop after this many activities"] = None,
+        published_after: Annotated[
+            str | None, "RFC 3339 timestamp; only activities from then on are returned"
+        ] = None,
+        projection: Annotated[Projection, "Parts and fields to request"] = ACTIVITY_FULL,
+    ) -> Iterator[dict]:
+        """Lazily iterate over user activities, newest first."""
+        collection = self.youtube.activities()
+        filters = {"publishedAfter": published_after} if published_after else {}
+        request = collection.list(
+            mine=True,
+            maxResults=min(page_size, MAX_PAGE_SIZE),
+            **projection.params,
+            **filters,
+        )
         try:
-            request = self.youtube.activities().list(
-                part="snippet,contentDetails",
-                mine=True,
-                maxResults=max_results
-            )
-            response = self._execute_request(request)
-            return response.get("items", [])
+            yield from self._iter_pages(collection, request, max_items)
         except Exception as e:
             if "API has not been used" in str(e):
                 raise YouTubeAPINotEnabledError() from e
             raise
 
+    def iter_subscriptions(
+        self,
+        page_size: Annotated[int, "Number of subscriptions requested per page"] = MAX_PAGE_SIZE,
+        max_items: Annotated[int | None, "Stop after this many subscriptions"] = None,
+        projection: Annotated[Projection, "Parts and fields to request"] = SUBSCRIPTION_FULL,
+    ) -> Iterator[dict]:
+        """Lazily iterate over user subscriptions."""
+        collection = self.youtube.subscriptions()
+        request = collection.list(
+            mine=True, maxResults=min(page_size, MAX_PAGE_SIZE), **projection.params
+        )
+        yield from self._iter_pages(collection, request, max_items)
+
+    def fetch_activities(
+        self,
+        max_results: Annotated[int, "Maximum number of activities to fetch"] = DEFAULT_MAX_RESULTS,
+        projection: Annotated[Projection, "Parts and fields to request"] = ACTIVITY_FULL,
+    ) -> list[dict]:
+        """Fetch user activities (watch history)."""
+        return list(self.iter_activities(
+            page_size=max_results, max_items=max_results, projection=projection
+        ))
+
     def fetch_subscriptions(
         self,
         max_results: Annotated[
             int, "Maximum number of subscriptions to fetch"
         ] = DEFAULT_MAX_RESULTS,
+        projection: Annotated[Projection, "Parts and fields to request"] = SUBSCRIPTION_FULL,
     ) -> list[dict]:
         """Fetch user subscriptions."""
-        request = self.youtube.subscriptions().list(
-            part="snippet", mine=True, maxResults=max_results
-        )
-        response = self._execute_request(request)
-        return response.get("items", [])
+        return list(self.iter_subscriptions(
+            page_size=max_results, max_items=max_results, projection=projection
+        ))
 
-    def fetch_video_details(self, video_id: Annotated[str, "YouTube video ID"]) -> dict | None:
+    def fetch_video_details(
+        self,
+        video_id: Annotated[str, "YouTube video ID"],
+        projection: Annotated[Projection, "Parts and fields to request"] = VIDEO_FULL,
+    ) -> dict | None:
         """Fetch detailed information about a video."""
-        request = self.youtube.videos().list(part="snippet,contentDetails", id=video_id)
-        response = self._execute_request(request)
-        return response.get("items", [{}])[0] if response.get("items") else None
+        return self.fetch_video_details_batch([video_id], projection).get(video_id)
+
+    def fetch_video_details_batch(
+        self,
+        video_ids: Annotated[Iterable[str], "YouTube video IDs, duplicates allowed"],
+        projection: Annotated[Projection, "Parts and fields to request"] = VIDEO_FULL,
+    ) -> dict[str, dict]:
+        """Fetch detailed information about many videos, keyed by video ID.
+
+        Fresh cache entries are served locally and stale ones are revalidated with
+        If-None-Match. The remaining IDs are deduplicated, and the cache plans them
+        into chunks of MAX_VIDEO_IDS_PER_REQUEST, so N videos cost at most
+        ceil(N / 50) requests.
+        Videos that no longer exist are simply missing from the result."""
+        unique_ids = list(dict.fromkeys(video_id for video_id in video_ids if video_id))
+        plan = self.cache.plan_video_requests(unique_ids, projection.cache_namespace("videos"))
+        details = plan.cached
+        for planned in plan.requests:
+            response = self._fetch_videos(planned, projection)
+            details.update(self.cache.store_video_response(planned, response))
+        return {video_id: details[video_id] for video_id in unique_ids if video_id in details}
+
+    def _fetch_videos(self, planned: VideoRequest, projection: Projection) -> dict | None:
+        """Run a planned videos.list call; None means the cached copy is still current."""
+        request = self.youtube.videos().list(id=",".join(planned.ids), **projection.params)
+        if planned.etag:
+            request.headers["If-None-Match"] = planned.etag
+        try:
+            return self._execute_request(request)
+        except HttpError as e:
+            if planned.etag and e.resp.status == 304:
+                return None
+            raise
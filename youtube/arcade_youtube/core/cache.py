@@ -0,0 +1,282 @@
+"""Persistent cache for YouTube resource metadata."""
+import json
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import asdict, dataclass, field
+from typing import Annotated
+
+from .constants import (
+    MAX_VIDEO_IDS_PER_REQUEST,
+    METADATA_CACHE_MAX_ENTRIES,
+    METADATA_CACHE_MEMORY_SIZE,
+    METADATA_CACHE_PATH,
+    METADATA_CACHE_TTLS,
+)
+from .storage import open_database
+
+
+@dataclass
+class CacheEntry:
+    """A cached API item plus what is needed to revalidate it."""
+
+    value: dict
+    etag: str | None
+    # Comma-joined IDs of the request that produced the entry, so a conditional
+    # request for the same ID set can be answered with 304 Not Modified
+    batch: str
+    stored_at: float
+
+    def is_fresh(self, ttl: float, now: float) -> bool:
+        return now - self.stored_at < ttl
+
+
+@dataclass
+class CacheStats:
+    """Counters for sizing the cache."""
+
+    hits: int = 0
+    misses: int = 0
+    stale: int = 0
+    not_modified: int = 0
+    evictions: int = 0
+
+    def as_dict(self) -> dict[str, int]:
+        return asdict(self)
+
+
+@dataclass
+class VideoRequest:
+    """One videos.list call planned by `MetadataCache.plan_video_requests`."""
+
+    ids: list[str]
+    etag: str | None = None
+    namespace: str = "videos"
+
+
+@dataclass
+class VideoPlan:
+    """Cached results plus the requests still needed to answer a batch lookup."""
+
+    cached: dict[str, dict] = field(default_factory=dict)
+    requests: list[VideoRequest] = field(default_factory=list)
+
+
+class MetadataCache:
+    """In-memory LRU in front of a SQLite store, with per-resource TTLs.
+
+    Entries outlive their TTL on disk so they can be revalidated with
+    If-None-Match instead of being downloaded again. The SQLite store keeps at
+    most `max_entries` rows, evicting the least recently used ones. Access times
+    of entries served from memory are written along with the next write."""
+
+    def __init__(
+        self,
+        path: Annotated[str, "SQLite database path, or ':memory:'"] = METADATA_CACHE_PATH,
+        memory_size: Annotated[
+            int, "Entries kept in the in-memory LRU"
+        ] = METADATA_CACHE_MEMORY_SIZE,
+        max_entries: Annotated[int, "Entries kept in SQLite"] = METADATA_CACHE_MAX_ENTRIES,
+        ttls: Annotated[dict[str, float] | None, "Seconds each resource stays fresh"] = None,
+    ):
+        self._db = open_database(path)
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS entries ("
+            " resource TEXT NOT NULL, key TEXT NOT NULL, value TEXT NOT NULL, etag TEXT,"
+            " batch TEXT NOT NULL, stored_at REAL NOT NULL, accessed_at REAL NOT NULL,"
+            " PRIMARY KEY (resource, key))"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS entries_lru ON entries (accessed_at)")
+        self._memory: OrderedDict[tuple[str, str], CacheEntry] = OrderedDict()
+        self._memory_size = memory_size
+        self._max_entries = max_entries
+        self._ttls = {**METADATA_CACHE_TTLS, **(ttls or {})}
+        self._lock = threading.Lock()
+        # Access times not yet written to SQLite
+        self._accessed: dict[tuple[str, str], float] = {}
+        self.stats = CacheStats()
+
+    def ttl(self, resource: str) -> float:
+        return self._ttls.get(resource, 0)
+
+    def get(self, resource: str, key: str) -> CacheEntry | None:
+        """Return the entry for a key, fresh or stale, without touching the stats."""
+        with self._lock:
+            entry, loaded = self._get(resource, key)
+            if loaded:
+                self._flush_accessed()
+            return entry
+
+    def _get(self, resource: str, key: str) -> tuple[CacheEntry | None, bool]:
+        """Look an entry up with the lock held; True if it was loaded from SQLite.
+
+        The access is recorded in memory, for the caller to write with
+        `_flush_accessed` once a lookup from SQLite makes a write worthwhile."""
+        entry = self._memory.get((resource, key))
+        loaded = entry is None
+        if entry is not None:
+            self._memory.move_to_end((resource, key))
+        else:
+            row = self._db.execute(
+                "SELECT value, etag, batch, stored_at FROM entries WHERE resource = ? AND key = ?",
+                (resource, key),
+            ).fetchone()
+            if row is None:
+                return None, False
+            entry = CacheEntry(json.loads(row[0]), row[1], row[2], row[3])
+            self._remember(resource, key, entry)
+        self._accessed[(resource, key)] = time.time()
+        return entry, loaded
+
+    def _flush_accessed(self) -> None:
+        """Write the recorded access times, so the LRU order on disk is up to date."""
+        if self._accessed:
+            self._db.executemany(
+                "UPDATE entries SET accessed_at = ? WHERE resource = ? AND key = ?",
+                [(at, resource, key) for (resource, key), at in self._accessed.items()],
+            )
+            self._accessed.clear()
+
+    def put(self, resource: str, key: str, value: dict, etag: str | None, batch: str) -> None:
+        self.put_many(resource, {key: value}, etag, batch)
+
+    def put_many(
+        self, resource: str, values: dict[str, dict], etag: str | None, batch: str
+    ) -> None:
+        """Store several entries in one transaction, evicting once for all of them."""
+        now = time.time()
+        with self._lock:
+            self._db.execute("BEGIN")
+            try:
+                self._flush_accessed()
+                self._db.executemany(
+                    "INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    [
+                        (resource, key, json.dumps(value), etag, batch, now, now)
+                        for key, value in values.items()
+                    ],
+                )
+                self._evict()
+            except BaseException:
+                self._db.execute("ROLLBACK")
+                raise
+            self._db.execute("COMMIT")
+            for key, value in values.items():
+                self._remember(resource, key, CacheEntry(value, etag, batch, now))
+
+    def touch(self, resource: str, key: str) -> None:
+        """Mark an entry as fresh again after a 304 Not Modified."""
+        self.touch_many(resource, [key])
+
+    def touch_many(self, resource: str, keys: list[str]) -> None:
+        """Mark several entries as fresh again, in one write."""
+        now = time.time()
+        with self._lock:
+            for key in keys:
+                self._accessed[(resource, key)] = now
+            self._flush_accessed()
+            self._db.executemany(
+                "UPDATE entries SET stored_at = ? WHERE resource = ? AND key = ?",
+                [(now, resource, key) for key in keys],
+            )
+            for key in keys:
+                entry = self._memory.get((resource, key))
+                if entry is not None:
+                    entry.stored_at = now
+
+    def clear(self) -> None:
+        with self._lock:
+            self._memory.clear()
+            self._accessed.clear()
+            self._db.execute("DELETE FROM entries")
+
+    def _remember(self, resource: str, key: str, entry: CacheEntry) -> None:
+        self._memory[(resource, key)] = entry
+        self._memory.move_to_end((resource, key))
+        while len(self._memory) > self._memory_size:
+            self._memory.popitem(last=False)
+
+    def _evict(self) -> None:
+        (count,) = self._db.execute("SELECT COUNT(*) FROM entries").fetchone()
+        excess = count - self._max_entries
+        if excess <= 0:
+            return
+        evicted = self._db.execute(
+            "DELETE FROM entries WHERE rowid IN"
+            " (SELECT rowid FROM entries ORDER BY accessed_at LIMIT ?) RETURNING resource, key",
+            (excess,),
+        ).fetchall()
+        for resource, key in evicted:
+            self._memory.pop((resource, key), None)
+            self._accessed.pop((resource, key), None)
+        self.stats.evictions += len(evicted)
+
+    def plan_video_requests(
+        self,
+        video_ids: list[str],
+        namespace: Annotated[str, "Cache namespace of the projection, e.g. 'videos'"] = "videos",
+    ) -> VideoPlan:
+        """Split a batch lookup into cache hits and the videos.list calls still needed.
+
+        Stale entries are grouped by the request that originally fetched them and
+        replayed with If-None-Match, so an unchanged batch costs a 304. Misses are
+        chunked into MAX_VIDEO_IDS_PER_REQUEST-sized requests."""
+        plan = VideoPlan()
+        ttl = self.ttl(namespace.partition(":")[0])
+        now = time.time()
+        stale: dict[str, CacheEntry] = {}
+        missing: list[str] = []
+        loaded: list[str] = []
+        with self._lock:
+            for video_id in video_ids:
+                entry, from_disk = self._get(namespace, video_id)
+                if from_disk:
+                    loaded.append(video_id)
+                if entry is None:
+                    self.stats.misses += 1
+                    missing.append(video_id)
+                elif entry.is_fresh(ttl, now):
+                    self.stats.hits += 1
+                    plan.cached[video_id] = entry.value
+                else:
+                    self.stats.stale += 1
+                    stale.setdefault(entry.batch, entry)
+            if loaded:
+                self._flush_accessed()
+        for batch, entry in stale.items():
+            plan.requests.append(VideoRequest(batch.split(","), entry.etag, namespace))
+        for start in range(0, len(missing), MAX_VIDEO_IDS_PER_REQUEST):
+            chunk = missing[start:start + MAX_VIDEO_IDS_PER_REQUEST]
+            plan.requests.append(VideoRequest(chunk, namespace=namespace))
+        return plan
+
+    def store_video_response(self, request: VideoRequest, response: dict | None) -> dict[str, dict]:
+        """Record the outcome of a planned request; `None` means 304 Not Modified."""
+        batch = ",".join(request.ids)
+        if response is None:
+            with self._lock:
+                self.stats.not_modified += 1
+            self.touch_many(request.namespace, request.ids)
+            videos = {}
+            for video_id in request.ids:
+                entry = self.get(request.namespace, video_id)
+                if entry is not None:
+                    videos[video_id] = entry.value
+            return videos
+        videos = {item["id"]: item for item in response.get("items", [])}
+        self.put_many(request.namespace, videos, response.get("etag"), batch)
+        return videos
+
+
+_default_cache: MetadataCache | None = None
+_default_cache_lock = threading.Lock()
+
+
+def get_metadata_cache() -> MetadataCache:
+    """Return the process-wide metadata cache, creating it on first use."""
+    global _default_cache
+    if _default_cache is None:
+        with _default_cache_lock:
+            if _default_cache is None:
+                _default_cache = MetadataCache()
+    return _default_cache
@@ -0,0 +1,122 @@
+"""Process-wide YouTube API client factory with pooled HTTP transports."""
+import asyncio
+import queue
+import threading
+import weakref
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from typing import Annotated
+
+import google_auth_httplib2
+import httplib2
+import httpx
+from google.auth.credentials import Credentials
+from googleapiclient.discovery import Resource, build
+
+from .constants import HTTP_POOL_SIZE, HTTP_TIMEOUT, YOUTUBE_API_ROOT
+
+
+class YouTubeClientFactory:
+    """Shares one parsed discovery service and a pool of keep-alive transports.
+
+    `build()` parses the discovery document and opens a new transport, which
+    dominates small tool calls, so it runs once per factory. The resulting
+    service only constructs requests; they are executed on an `httplib2.Http`
+    checked out from the pool, so each transport is used by one thread at a
+    time and keeps its TLS connection open between calls.
+
+    The async backend gets an `httpx.AsyncClient` instead, one per event loop
+    since its connection pool is bound to the loop that created it."""
+
+    def __init__(
+        self,
+        pool_size: Annotated[int, "Maximum number of idle transports kept open"] = HTTP_POOL_SIZE,
+        http_factory: Annotated[
+            Callable[[], httplib2.Http], "Creates a new transport for the pool"
+        ] = httplib2.Http,
+        async_transport: Annotated[
+            httpx.AsyncBaseTransport | None, "Transport for async clients, defaults to network"
+        ] = None,
+        api_root: Annotated[str, "Root URL of the YouTube Data API"] = YOUTUBE_API_ROOT,
+    ):
+        self.api_root = api_root.rstrip("/")
+        self.api_url = f"{self.api_root}/youtube/v3"
+        self._http_factory = http_factory
+        self._async_transport = async_transport
+        self._async_clients: weakref.WeakKeyDictionary[
+            asyncio.AbstractEventLoop, httpx.AsyncClient
+        ] = weakref.WeakKeyDictionary()
+        self._pool: queue.LifoQueue[httplib2.Http] = queue.LifoQueue(maxsize=pool_size)
+        self._service: Resource | None = None
+        self._service_lock = threading.Lock()
+
+    @property
+    def service(self) -> Resource:
+        """The YouTube Data API v3 service, built on first use."""
+        if self._service is None:
+            with self._service_lock:
+                if self._service is None:
+                    self._service = build(
+                        "youtube",
+                        "v3",
+                        http=self._http_factory(),
+                        cache_discovery=False,
+                        client_options={"api_endpoint": f"{self.api_root}/"},
+                    )
+        return self._service
+
+    @contextmanager
+    def http(
+        self, credentials: Annotated[Credentials, "OAuth credentials to authorize requests with"]
+    ) -> Iterator[google_auth_httplib2.AuthorizedHttp]:
+        """Check out a pooled transport authorized with the given credentials."""
+        try:
+            transport = self._pool.get_nowait()
+        except queue.Empty:
+            transport = self._http_factory()
+        try:
+            yield google_auth_httplib2.AuthorizedHttp(credentials, http=transport)
+        finally:
+            try:
+                self._pool.put_nowait(transport)
+            except queue.Full:
+                transport.close()
+
+    def async_client(self) -> httpx.AsyncClient:
+        """Return the pooled async HTTP client for the running event loop."""
+        loop = asyncio.get_running_loop()
+        client = self._async_clients.get(loop)
+        if client is None or client.is_closed:
+            client = httpx.AsyncClient(
+                transport=self._async_transport,
+                timeout=HTTP_TIMEOUT,
+                limits=httpx.Limits(max_keepalive_connections=self._pool.maxsize),
+            )
+            self._async_clients[loop] = client
+        return client
+
+    def close(self) -> None:
+        """Close the idle transports and forget the async clients.
+
+        Async clients are bound to their event loop and closed with it, so they
+        are only dropped here."""
+        while True:
+            try:
+                self._pool.get_nowait().close()
+            except queue.Empty:
+                break
+        self._async_clients.clear()
+
+
+_default_factory: YouTubeClientFactory | None = None
+_default_factory_lock = threading.Lock()
+
+
+def get_client_factory() -> YouTubeClientFactory:
+    """Return the process-wide client factory, creating it on first use."""
+    global _default_factory
+    if _default_factory is None:
+        with _default_factory_lock:
+            if _default_factory is None:
+                _default_factory = YouTubeClientFactory()
+    return _default_factory
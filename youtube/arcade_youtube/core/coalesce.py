@@ -0,0 +1,138 @@
+"""Single-flight coalescing of identical requests that are in flight at the same time."""
+import asyncio
+import threading
+import weakref
+from collections.abc import Awaitable, Callable, Hashable
+from dataclasses import asdict, dataclass
+from typing import Any, TypeVar, cast
+
+T = TypeVar("T")
+
+
+@dataclass
+class CoalesceStats:
+    """How many calls did the work and how many joined a call already in flight."""
+
+    leaders: int = 0
+    joined: int = 0
+
+    def as_dict(self) -> dict[str, int]:
+        return asdict(self)
+
+
+class _Call:
+    """A blocking call in flight, awaited by threads that asked for the same key."""
+
+    def __init__(self) -> None:
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: BaseException | None = None
+
+
+class SingleFlight:
+    """Runs at most one call per key at a time; concurrent callers share its outcome.
+
+    Results are shared, not copied, so callers must not mutate them. Nothing is
+    kept once a call completes: this removes duplicate concurrent work, caching
+    is left to the caches."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._calls: dict[Hashable, _Call] = {}
+        self._futures: weakref.WeakKeyDictionary[
+            asyncio.AbstractEventLoop, dict[Hashable, asyncio.Future]
+        ] = weakref.WeakKeyDictionary()
+        self.stats = CoalesceStats()
+
+    def do(self, key: Hashable, fn: Callable[[], T]) -> T:
+        """Call `fn` for the first thread asking for `key`, and hand its outcome to the rest."""
+        with self._lock:
+            joined = self._calls.get(key)
+            if joined is None:
+                call = self._calls[key] = _Call()
+                self.stats.leaders += 1
+            else:
+                self.stats.joined += 1
+        if joined is not None:
+            joined.done.wait()
+            if joined.error is not None:
+                raise joined.error
+            return cast(T, joined.result)
+        try:
+            call.result = fn()
+        except BaseException as e:
+            call.error = e
+            raise
+        else:
+            return cast(T, call.result)
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+    def _pending(self) -> dict[Hashable, asyncio.Future]:
+        loop = asyncio.get_running_loop()
+        pending = self._futures.get(loop)
+        if pending is None:
+            pending = self._futures[loop] = {}
+        return pending
+
+    def claim(self, key: Hashable) -> tuple[asyncio.Future, bool]:
+        """Return the future for `key` and whether the caller must produce its result.
+
+        The leader, the first caller, must finish the call with `resolve` or
+        `reject`; everyone else awaits the future."""
+        pending = self._pending()
+        future = pending.get(key)
+        if future is not None:
+            self.stats.joined += 1
+            return future, False
+        future = pending[key] = asyncio.get_running_loop().create_future()
+        # Nobody may be waiting when the call fails; don't warn about an unretrieved error
+        future.add_done_callback(lambda f: f.cancelled() or f.exception())
+        self.stats.leaders += 1
+        return future, True
+
+    def resolve(self, key: Hashable, result: Any) -> None:
+        future = self._pending().pop(key)
+        if not future.done():
+            future.set_result(result)
+
+    def reject(self, key: Hashable, error: BaseException) -> None:
+        future = self._pending().pop(key)
+        if not future.done():
+            future.set_exception(error)
+
+    async def do_async(self, key: Hashable, fn: Callable[[], Awaitable[T]]) -> T:
+        """Await `fn` once for all coroutines asking for `key` at the same time.
+
+        The call runs as its own task, so a caller that is cancelled leaves it
+        running for the others."""
+        future, leader = self.claim(key)
+        if leader:
+            task = asyncio.ensure_future(fn())
+
+            def settle(task: asyncio.Task) -> None:
+                if task.cancelled():
+                    self.reject(key, asyncio.CancelledError())
+                elif (error := task.exception()) is not None:
+                    self.reject(key, error)
+                else:
+                    self.resolve(key, task.result())
+
+            task.add_done_callback(settle)
+        return await asyncio.shield(future)
+
+
+_default_single_flight: SingleFlight | None = None
+_default_single_flight_lock = threading.Lock()
+
+
+def get_single_flight() -> SingleFlight:
+    """Return the process-wide coalescer, creating it on first use."""
+    global _default_single_flight
+    if _default_single_flight is None:
+        with _default_single_flight_lock:
+            if _default_single_flight is None:
+                _default_single_flight = SingleFlight()
+    return _default_single_flight
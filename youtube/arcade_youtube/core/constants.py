@@ -1,5 +1,82 @@
 """Constants for YouTube API integration."""
+import os
+
+# Root URL of the YouTube Data API; point it at a local stand-in for offline benchmarks
+YOUTUBE_API_ROOT = os.getenv("YOUTUBE_API_ROOT", "https://youtube.googleapis.com")
+YOUTUBE_API_URL = f"{YOUTUBE_API_ROOT}/youtube/v3"
 
 DEFAULT_MAX_RESULTS = 50
 
+# Largest maxResults accepted by the list endpoints
+MAX_PAGE_SIZE = 50
+
+# Keep-alive HTTP transports kept warm by the shared client factory
+HTTP_POOL_SIZE = 10
+
+# Timeout in seconds for a single API request made by the async backend
+HTTP_TIMEOUT = 30.0
+
+# Concurrent API requests a single async backend issues at most
+DEFAULT_MAX_CONCURRENCY = int(os.getenv("YOUTUBE_MAX_CONCURRENCY", "4"))
+
+# Multi-account fan-out: accounts processed at once, API requests in flight per account
+# and seconds an account may take before it is reported as timed out
+FANOUT_MAX_ACCOUNTS = int(os.getenv("YOUTUBE_FANOUT_MAX_ACCOUNTS", "8"))
+FANOUT_ACCOUNT_CONCURRENCY = 2
+FANOUT_ACCOUNT_TIMEOUT = 60.0
+
+# Seconds a SQLite connection waits for another process's write lock before failing
+SQLITE_BUSY_TIMEOUT = 10.0
+
+# Metadata cache: SQLite file (":memory:" keeps it in-process), sizes and per-resource TTLs
+METADATA_CACHE_PATH = os.getenv(
+    "YOUTUBE_CACHE_PATH", os.path.expanduser("~/.cache/arcade_youtube/metadata.sqlite3")
+)
+METADATA_CACHE_MEMORY_SIZE = 1024
+METADATA_CACHE_MAX_ENTRIES = 100_000
+METADATA_CACHE_TTLS = {
+    "videos": 7 * 24 * 3600,
+}
+
+# Local activity store used for incremental watch-history sync
+ACTIVITY_STORE_PATH = os.getenv(
+    "YOUTUBE_ACTIVITY_STORE_PATH",
+    os.path.expanduser("~/.cache/arcade_youtube/activities.sqlite3"),
+)
+# Seconds a completed sync is trusted before the API is asked for new activities
+ACTIVITY_SYNC_INTERVAL = 60
+# Most activities the first sync of an account pulls; older history is never fetched
+ACTIVITY_BACKFILL_LIMIT = int(os.getenv("YOUTUBE_ACTIVITY_BACKFILL_LIMIT", "1000"))
+
+# Credential manager: refresh tokens this many seconds before they expire, and optionally
+# share refreshed tokens between processes through a SQLite file
+TOKEN_REFRESH_MARGIN = 300
+TOKEN_STORE_PATH = os.getenv("YOUTUBE_TOKEN_STORE_PATH")
+# Seconds a process that leaves the startup refresh to another waits for its token
+TOKEN_STORE_WAIT = 10
+
+# Quota scheduling. Costs are YouTube Data API units per call; the daily budget is per
+# Google Cloud project and resets at midnight Pacific time.
+QUOTA_COSTS = {
+    "youtube.activities.list": 1,
+    "youtube.subscriptions.list": 1,
+    "youtube.videos.list": 1,
+}
+DAILY_QUOTA_UNITS = int(os.getenv("YOUTUBE_DAILY_QUOTA", "10000"))
+QUOTA_TIMEZONE = "America/Los_Angeles"
+# Share of the daily budget held back for interactive calls once it runs low
+QUOTA_RESERVE_RATIO = 0.1
+PROJECT_REQUESTS_PER_SECOND = 20.0
+CREDENTIAL_REQUESTS_PER_SECOND = 5.0
+MAX_RETRIES = 5
+RETRY_BACKOFF_BASE = 0.5
+RETRY_BACKOFF_CAP = 32.0
+RETRYABLE_STATUS_CODES = frozenset({429, 500, 502, 503, 504})
+RETRYABLE_ERROR_REASONS = frozenset({
+    "rateLimitExceeded", "userRateLimitExceeded", "backendError", "internalError"
+})
+
+# videos.list accepts at most this many comma-separated IDs per request
+MAX_VIDEO_IDS_PER_REQUEST = 50
+
 YOUTUBE_READONLY_SCOPE = "https://www.googleapis.com/auth/youtube.readonly"
@@ -0,0 +1,219 @@
+"""Long-lived OAuth credentials that are refreshed ahead of expiry."""
+import asyncio
+import contextlib
+import datetime
+import logging
+import threading
+import weakref
+from collections.abc import Callable
+from typing import Annotated
+
+import google_auth_httplib2
+import httplib2
+from google.oauth2.credentials import Credentials
+
+from .constants import TOKEN_REFRESH_MARGIN, TOKEN_STORE_PATH
+from .scheduler import credential_key
+from .storage import open_database
+
+logger = logging.getLogger(__name__)
+
+# The manager of every Credentials object, so code handed the bare credentials
+# refreshes them through the one manager that keeps them alive
+_managers: "weakref.WeakKeyDictionary[Credentials, CredentialManager]" = (
+    weakref.WeakKeyDictionary()
+)
+_managers_lock = threading.Lock()
+
+
+class TokenStore:
+    """SQLite table of access tokens, so processes sharing the file share refreshes."""
+
+    def __init__(self, path: Annotated[str, "SQLite database path, or ':memory:'"]):
+        self._db = open_database(path)
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS tokens ("
+            " account TEXT PRIMARY KEY, token TEXT NOT NULL, expiry TEXT)"
+        )
+        self._lock = threading.Lock()
+
+    def load(self, account: str) -> tuple[str, datetime.datetime | None] | None:
+        with self._lock:
+            row = self._db.execute(
+                "SELECT token, expiry FROM tokens WHERE account = ?", (account,)
+            ).fetchone()
+        if row is None:
+            return None
+        return row[0], datetime.datetime.fromisoformat(row[1]) if row[1] else None
+
+    def save(self, account: str, token: str, expiry: datetime.datetime | None) -> None:
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO tokens VALUES (?, ?, ?)",
+                (account, token, expiry.isoformat() if expiry else None),
+            )
+
+
+class CredentialManager:
+    """Keeps one Credentials object per account alive and fresh.
+
+    Callers get the same object every time, so a refresh benefits every later
+    request instead of being thrown away. Tokens are refreshed in the background
+    `refresh_margin` seconds before they expire, and concurrent refreshes are
+    collapsed into one. With a TokenStore, a token another process already
+    refreshed is adopted instead of refreshing again."""
+
+    def __init__(
+        self,
+        build: Annotated[Callable[[], Credentials], "Creates the credentials on first use"],
+        store: Annotated[TokenStore | None, "Store shared with other processes"] = None,
+        refresh_margin: Annotated[
+            float, "Seconds before expiry at which tokens are refreshed"
+        ] = TOKEN_REFRESH_MARGIN,
+    ):
+        self._build = build
+        self._credentials: Credentials | None = None
+        self._store = store
+        self.refresh_margin = refresh_margin
+        self._refresh_task: asyncio.Task | None = None
+        self._loop_task: asyncio.Task | None = None
+        self._build_lock = threading.Lock()
+        self.refreshes = 0
+
+    @property
+    def credentials(self) -> Credentials:
+        if self._credentials is None:
+            with self._build_lock:
+                if self._credentials is None:
+                    credentials = self._build()
+                    with _managers_lock:
+                        _managers.setdefault(credentials, self)
+                    self._credentials = credentials
+        return self._credentials
+
+    def seconds_left(self) -> float | None:
+        """Seconds until the access token expires; None if its expiry is unknown."""
+        credentials = self.credentials
+        if not credentials.token:
+            return 0.0
+        expiry: datetime.datetime | None = credentials.expiry
+        if expiry is None:
+            return None
+        # google-auth keeps expiry as a naive UTC datetime
+        now = datetime.datetime.now(datetime.timezone.utc).replace(tzinfo=None)
+        return (expiry - now).total_seconds()
+
+    def needs_refresh(self) -> bool:
+        left = self.seconds_left()
+        if left is None:
+            # Refresh once to learn when a token of unknown age expires
+            return self.refreshes == 0 and bool(self.credentials.refresh_token)
+        return left <= self.refresh_margin
+
+    def get(self) -> Credentials:
+        """Return the credentials, starting a background refresh if they expire soon."""
+        credentials = self.credentials
+        if self.needs_refresh():
+            # Without a running event loop, the backend refreshes once it finds them expired
+            with contextlib.suppress(RuntimeError):
+                self.refresh()
+        return credentials
+
+    async def get_fresh(
+        self,
+        rejected_token: Annotated[
+            str | None, "A token the API refused, refreshed even if it has not expired"
+        ] = None,
+    ) -> Credentials:
+        """Return the credentials, waiting for a refresh if they expire soon."""
+        credentials = self.credentials
+        rejected = rejected_token is not None and credentials.token == rejected_token
+        if rejected or self.needs_refresh():
+            # Shielded, so one waiter giving up does not cancel the refresh for the others
+            await asyncio.shield(self.refresh())
+        return credentials
+
+    def refresh(self) -> asyncio.Task:
+        """Start a refresh unless one is already running, and return it."""
+        if self._refresh_task is None or self._refresh_task.done():
+            self._refresh_task = asyncio.get_running_loop().create_task(self._refresh())
+            self._refresh_task.add_done_callback(self._log_failure)
+        return self._refresh_task
+
+    @staticmethod
+    def _log_failure(task: asyncio.Task) -> None:
+        if not task.cancelled() and task.exception() is not None:
+            logger.warning(f"Token refresh failed: {task.exception()}")
+
+    async def _refresh(self) -> None:
+        credentials = self.credentials
+        account = credential_key(credentials)
+        if self._adopt_stored(account):
+            return
+        request = google_auth_httplib2.Request(httplib2.Http())
+        # google-auth only ships a blocking refresh, keep it off the event loop
+        await asyncio.to_thread(credentials.refresh, request)
+        self.refreshes += 1
+        if self._store is not None and credentials.token:
+            self._store.save(account, credentials.token, credentials.expiry)
+
+    def _adopt_stored(self, account: str) -> bool:
+        """Take over a token another process refreshed, if it outlives ours."""
+        stored = self._store.load(account) if self._store is not None else None
+        if stored is None:
+            return False
+        token, expiry = stored
+        credentials = self.credentials
+        if token == credentials.token or (
+            expiry is not None and credentials.expiry is not None and expiry <= credentials.expiry
+        ):
+            return False
+        credentials.token, credentials.expiry = token, expiry
+        return not self.needs_refresh()
+
+    def start(
+        self,
+        delay: Annotated[float, "Seconds to wait before the first check"] = 0.0,
+    ) -> None:
+        """Keep refreshing in the background ahead of every expiry."""
+        if self._loop_task is None:
+            self._loop_task = asyncio.get_running_loop().create_task(self._keep_fresh(delay))
+
+    async def stop(self) -> None:
+        tasks = [task for task in (self._loop_task, self._refresh_task) if task is not None]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._loop_task = self._refresh_task = None
+
+    async def _keep_fresh(self, delay: float) -> None:
+        await asyncio.sleep(delay)
+        while True:
+            try:
+                await self.get_fresh()
+            except Exception:
+                # Logged by the refresh task; retry well before the token runs out
+                await asyncio.sleep(self.refresh_margin / 10)
+                continue
+            left = self.seconds_left()
+            if left is None:
+                # Nothing to schedule by; look again in case a refresh reveals the expiry
+                await asyncio.sleep(self.refresh_margin)
+                continue
+            await asyncio.sleep(max(left - self.refresh_margin, 1.0))
+
+
+def get_credential_manager(credentials: Credentials) -> CredentialManager:
+    """Return the manager of `credentials`, giving them a new one if they have none."""
+    with _managers_lock:
+        manager = _managers.get(credentials)
+        if manager is None:
+            manager = CredentialManager(lambda: credentials)
+            manager._credentials = credentials
+            _managers[credentials] = manager
+    return manager
+
+
+def default_token_store() -> TokenStore | None:
+    """Return a TokenStore at YOUTUBE_TOKEN_STORE_PATH, if one is configured."""
+    return TokenStore(TOKEN_STORE_PATH) if TOKEN_STORE_PATH else None
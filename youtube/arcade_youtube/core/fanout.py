@@ -0,0 +1,98 @@
+"""Run the same YouTube work across many accounts concurrently."""
+import asyncio
+import time
+from collections.abc import AsyncIterator, Awaitable, Callable, Mapping
+from dataclasses import dataclass, field
+from typing import Annotated, Any
+
+from google.oauth2.credentials import Credentials
+
+from .async_backend import AsyncYouTubeBackend
+from .client import YouTubeClientFactory
+from .constants import (
+    FANOUT_ACCOUNT_CONCURRENCY,
+    FANOUT_ACCOUNT_TIMEOUT,
+    FANOUT_MAX_ACCOUNTS,
+)
+from .scheduler import Priority
+
+AccountOperation = Callable[[AsyncYouTubeBackend], Awaitable[Any]]
+
+
+@dataclass
+class AccountResult:
+    """Outcome of an operation for one account; exactly one of result and error is set."""
+
+    account: str
+    result: Any = None
+    error: str | None = None
+    timed_out: bool = False
+    elapsed: float = field(default=0.0)
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "account": self.account,
+            "ok": self.ok,
+            "result": self.result,
+            "error": self.error,
+            "timed_out": self.timed_out,
+            "elapsed": round(self.elapsed, 3),
+        }
+
+
+async def fan_out(
+    accounts: Annotated[Mapping[str, Credentials], "Credentials keyed by account name"],
+    operation: Annotated[AccountOperation, "Coroutine function run with each account's backend"],
+    max_accounts: Annotated[int, "Accounts processed at once"] = FANOUT_MAX_ACCOUNTS,
+    account_concurrency: Annotated[
+        int, "API requests in flight per account"
+    ] = FANOUT_ACCOUNT_CONCURRENCY,
+    timeout: Annotated[float | None, "Seconds allowed per account"] = FANOUT_ACCOUNT_TIMEOUT,
+    priority: Annotated[Priority, "Priority of the fanned-out requests"] = Priority.INTERACTIVE,
+    factory: Annotated[
+        YouTubeClientFactory | None, "Client factory, defaults to the process-wide one"
+    ] = None,
+) -> AsyncIterator[AccountResult]:
+    """Run `operation` once per account and yield each result as soon as it is ready.
+
+    Every account gets its own backend, so at most `max_accounts` times
+    `account_concurrency` API requests are in flight. All accounts still share the
+    process-wide quota scheduler and caches. A failing or slow account is
+    reported in its own AccountResult and never holds back the others."""
+    gate = asyncio.Semaphore(max_accounts)
+
+    async def run(account: str, credentials: Credentials) -> AccountResult:
+        async with gate:
+            started = time.monotonic()
+            backend = AsyncYouTubeBackend(
+                credentials,
+                factory=factory,
+                max_concurrency=account_concurrency,
+                priority=priority,
+            )
+            try:
+                result = await asyncio.wait_for(operation(backend), timeout)
+            except asyncio.TimeoutError:
+                return AccountResult(
+                    account,
+                    error=f"Timed out after {timeout} seconds",
+                    timed_out=True,
+                    elapsed=time.monotonic() - started,
+                )
+            except Exception as e:
+                return AccountResult(
+                    account, error=str(e) or type(e).__name__, elapsed=time.monotonic() - started
+                )
+            return AccountResult(account, result=result, elapsed=time.monotonic() - started)
+
+    tasks = [asyncio.create_task(run(account, creds)) for account, creds in accounts.items()]
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            yield await next_done
+    finally:
+        for task in tasks:
+            task.cancel()
@@ -0,0 +1,52 @@
+"""Declarative part/fields projections for YouTube API list calls."""
+from dataclasses import dataclass
+from typing import Any
+
+
+@dataclass(frozen=True)
+class Projection:
+    """Which resource parts to request and, optionally, a partial-response field mask.
+
+    The API only serializes the masked fields, so both the payload and the JSON
+    the client has to decode shrink to what the caller actually reads. List
+    projections must keep `nextPageToken` for pagination, and video projections
+    keep `etag` so cached entries can be revalidated."""
+
+    part: str
+    fields: str | None = None
+
+    @property
+    def params(self) -> dict[str, Any]:
+        """Query parameters for this projection."""
+        return {"part": self.part, "fields": self.fields} if self.fields else {"part": self.part}
+
+    def cache_namespace(self, resource: str) -> str:
+        """Cache namespace, so items fetched under different projections never mix."""
+        if self == FULL_PROJECTIONS.get(resource):
+            return resource
+        return f"{resource}:{self.part}:{self.fields or ''}"
+
+
+ACTIVITY_FULL = Projection("snippet,contentDetails")
+# Everything ActivityRecord reads: title, channel, description, time and video ID
+ACTIVITY_HISTORY = Projection(
+    "snippet,contentDetails",
+    "nextPageToken,items(id,snippet(publishedAt,title,description,channelTitle),"
+    "contentDetails(watch/videoId,playlistItem/resourceId/videoId))",
+)
+
+SUBSCRIPTION_FULL = Projection("snippet")
+# Everything SubscriptionRecord reads
+SUBSCRIPTION_SUMMARY = Projection(
+    "snippet", "nextPageToken,items(snippet(title,publishedAt,resourceId/channelId))"
+)
+
+VIDEO_FULL = Projection("snippet,contentDetails")
+# Only what watch-time statistics need
+VIDEO_DURATION = Projection("contentDetails", "etag,items(id,contentDetails/duration)")
+
+FULL_PROJECTIONS = {
+    "activities": ACTIVITY_FULL,
+    "subscriptions": SUBSCRIPTION_FULL,
+    "videos": VIDEO_FULL,
+}
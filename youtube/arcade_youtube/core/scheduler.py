@@ -0,0 +1,245 @@
+"""Quota-aware scheduling and retries for YouTube API requests."""
+import asyncio
+import datetime
+import hashlib
+import json
+import random
+import threading
+import time
+from collections.abc import Awaitable, Callable
+from enum import IntEnum
+from typing import Annotated, TypeVar
+from zoneinfo import ZoneInfo
+
+import httpx
+from google.auth.credentials import Credentials
+from googleapiclient.errors import HttpError
+
+from .constants import (
+    CREDENTIAL_REQUESTS_PER_SECOND,
+    DAILY_QUOTA_UNITS,
+    MAX_RETRIES,
+    PROJECT_REQUESTS_PER_SECOND,
+    QUOTA_COSTS,
+    QUOTA_RESERVE_RATIO,
+    QUOTA_TIMEZONE,
+    RETRY_BACKOFF_BASE,
+    RETRY_BACKOFF_CAP,
+    RETRYABLE_ERROR_REASONS,
+    RETRYABLE_STATUS_CODES,
+)
+
+T = TypeVar("T")
+
+
+class YouTubeQuotaExceededError(Exception):
+    """Raised when the daily quota is spent, or nearly spent for low-priority work."""
+
+    def __init__(self, reserved: bool = False) -> None:
+        if reserved:
+            super().__init__(
+                "The daily YouTube API quota is nearly exhausted; "
+                "low-priority requests are paused until it resets."
+            )
+        else:
+            super().__init__(
+                "The daily YouTube API quota is exhausted; it resets at midnight Pacific time."
+            )
+        # True when only the quota kept for interactive requests is left
+        self.reserved = reserved
+
+
+class Priority(IntEnum):
+    """How important a request is when the daily quota runs low."""
+
+    BACKGROUND = 0
+    INTERACTIVE = 1
+
+
+class TokenBucket:
+    """Classic token bucket; reservations may go negative and are paid off by waiting."""
+
+    def __init__(self, rate: float, capacity: float | None = None):
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else rate
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self, tokens: float = 1) -> float:
+        """Take tokens now and return how many seconds to wait before using them."""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= tokens
+            return max(0.0, -self._tokens / self.rate)
+
+
+def credential_key(credentials: Credentials) -> str:
+    """Stable, non-secret identifier for the account behind a set of credentials."""
+    secret = getattr(credentials, "refresh_token", None) or getattr(credentials, "token", None)
+    if not secret:
+        return "anonymous"
+    return hashlib.sha256(secret.encode()).hexdigest()[:16]
+
+
+def project_key(credentials: Credentials) -> str:
+    """Identifier of the Google Cloud project whose quota a request is billed to."""
+    return getattr(credentials, "client_id", None) or "default"
+
+
+def error_status_and_reason(error: Exception) -> tuple[int, str] | None:
+    """Extract the HTTP status and YouTube error reason from a transport error."""
+    if isinstance(error, HttpError):
+        status, body = error.resp.status, error.content
+    elif isinstance(error, httpx.HTTPStatusError):
+        status, body = error.response.status_code, error.response.content
+    else:
+        return None
+    try:
+        reason = json.loads(body)["error"]["errors"][0]["reason"]
+    except (ValueError, KeyError, IndexError, TypeError):
+        reason = ""
+    return int(status), reason
+
+
+class QuotaScheduler:
+    """Admits requests against per-project quota and rate limits, retrying transient errors.
+
+    Every request is charged its QUOTA_COSTS units against the project's daily
+    budget and takes a token from both a per-project and a per-credential
+    bucket. Once less than `reserve_ratio` of the budget is left, BACKGROUND
+    requests are refused so interactive calls keep working until the reset.
+    Rate-limit and 5xx errors are retried with full-jitter exponential backoff;
+    quotaExceeded marks the project exhausted until the next quota day."""
+
+    def __init__(
+        self,
+        daily_quota: Annotated[int, "Quota units per project per day"] = DAILY_QUOTA_UNITS,
+        reserve_ratio: Annotated[float, "Share of the budget reserved for interactive calls"] = (
+            QUOTA_RESERVE_RATIO
+        ),
+        project_rate: Annotated[float, "Requests per second per project"] = (
+            PROJECT_REQUESTS_PER_SECOND
+        ),
+        credential_rate: Annotated[float, "Requests per second per credential"] = (
+            CREDENTIAL_REQUESTS_PER_SECOND
+        ),
+        max_retries: Annotated[int, "Retries for transient errors"] = MAX_RETRIES,
+    ):
+        self.daily_quota = daily_quota
+        self.reserve_ratio = reserve_ratio
+        self.project_rate = project_rate
+        self.credential_rate = credential_rate
+        self.max_retries = max_retries
+        self._buckets: dict[str, TokenBucket] = {}
+        self._usage: dict[str, int] = {}
+        self._exhausted: set[str] = set()
+        self._day = self._quota_day()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _quota_day() -> datetime.date:
+        return datetime.datetime.now(ZoneInfo(QUOTA_TIMEZONE)).date()
+
+    def _bucket(self, key: str, rate: float) -> TokenBucket:
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = self._buckets.setdefault(key, TokenBucket(rate))
+        return bucket
+
+    def _roll_day(self) -> None:
+        today = self._quota_day()
+        if today != self._day:
+            self._day = today
+            self._usage.clear()
+            self._exhausted.clear()
+
+    def used(self, credentials: Credentials) -> int:
+        """Quota units charged today to the project behind the credentials."""
+        with self._lock:
+            self._roll_day()
+            return self._usage.get(project_key(credentials), 0)
+
+    def _admit(self, method: str, credentials: Credentials, priority: Priority) -> float:
+        """Charge a request against quota and return how long to wait before sending it."""
+        cost = QUOTA_COSTS.get(method, 1)
+        project = project_key(credentials)
+        with self._lock:
+            self._roll_day()
+            used = self._usage.get(project, 0)
+            if project in self._exhausted or used + cost > self.daily_quota:
+                raise YouTubeQuotaExceededError()
+            reserve_floor = self.daily_quota * (1 - self.reserve_ratio)
+            if priority < Priority.INTERACTIVE and used + cost > reserve_floor:
+                raise YouTubeQuotaExceededError(reserved=True)
+            self._usage[project] = used + cost
+            project_bucket = self._bucket(f"project:{project}", self.project_rate)
+            credential_bucket = self._bucket(
+                f"credential:{credential_key(credentials)}", self.credential_rate
+            )
+        return max(project_bucket.reserve(), credential_bucket.reserve())
+
+    def _retry_delay(self, error: Exception, credentials: Credentials, attempt: int) -> float:
+        """Return the backoff before retrying, or re-raise if the error is not transient."""
+        status_and_reason = error_status_and_reason(error)
+        if status_and_reason is None:
+            raise error
+        status, reason = status_and_reason
+        if reason in ("quotaExceeded", "dailyLimitExceeded"):
+            with self._lock:
+                self._exhausted.add(project_key(credentials))
+            raise YouTubeQuotaExceededError() from error
+        transient = status in RETRYABLE_STATUS_CODES or reason in RETRYABLE_ERROR_REASONS
+        if not transient or attempt >= self.max_retries:
+            raise error
+        return random.uniform(0, min(RETRY_BACKOFF_CAP, RETRY_BACKOFF_BASE * 2**attempt))  # noqa: S311
+
+    def execute(
+        self,
+        call: Callable[[], T],
+        method: Annotated[str, "API method ID, e.g. youtube.videos.list"],
+        credentials: Credentials,
+        priority: Priority = Priority.INTERACTIVE,
+    ) -> T:
+        """Run a blocking request under quota, rate limits and retries."""
+        attempt = 0
+        while True:
+            time.sleep(self._admit(method, credentials, priority))
+            try:
+                return call()
+            except Exception as e:
+                time.sleep(self._retry_delay(e, credentials, attempt))
+                attempt += 1
+
+    async def execute_async(
+        self,
+        call: Callable[[], Awaitable[T]],
+        method: Annotated[str, "API method ID, e.g. youtube.videos.list"],
+        credentials: Credentials,
+        priority: Priority = Priority.INTERACTIVE,
+    ) -> T:
+        """Run an async request under quota, rate limits and retries."""
+        attempt = 0
+        while True:
+            await asyncio.sleep(self._admit(method, credentials, priority))
+            try:
+                return await call()
+            except Exception as e:
+                await asyncio.sleep(self._retry_delay(e, credentials, attempt))
+                attempt += 1
+
+
+_default_scheduler: QuotaScheduler | None = None
+_default_scheduler_lock = threading.Lock()
+
+
+def get_quota_scheduler() -> QuotaScheduler:
+    """Return the process-wide quota scheduler, creating it on first use."""
+    global _default_scheduler
+    if _default_scheduler is None:
+        with _default_scheduler_lock:
+            if _default_scheduler is None:
+                _default_scheduler = QuotaScheduler()
+    return _default_scheduler
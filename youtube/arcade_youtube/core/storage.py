@@ -0,0 +1,25 @@
+"""SQLite connections shared safely between threads and processes."""
+import os
+import sqlite3
+from typing import Annotated
+
+from .constants import SQLITE_BUSY_TIMEOUT
+
+
+def open_database(
+    path: Annotated[str, "SQLite database path, or ':memory:'"],
+) -> sqlite3.Connection:
+    """Open a SQLite database in autocommit mode for use from any thread.
+
+    Files are switched to write-ahead logging, so readers in other worker
+    processes never block on a writer, and writers wait up to
+    SQLITE_BUSY_TIMEOUT for each other instead of failing."""
+    if path != ":memory:":
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    db = sqlite3.connect(
+        path, timeout=SQLITE_BUSY_TIMEOUT, check_same_thread=False, isolation_level=None
+    )
+    if path != ":memory:":
+        db.execute("PRAGMA journal_mode=WAL")
+        db.execute("PRAGMA synchronous=NORMAL")
+    return db
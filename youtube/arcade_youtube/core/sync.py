@@ -0,0 +1,290 @@
+"""Incremental watch-history sync into a local append-only activity store."""
+import asyncio
+import datetime
+import json
+import threading
+import time
+from collections.abc import Iterator, Sequence
+from typing import Annotated
+
+from .async_backend import AsyncYouTubeBackend
+from .constants import (
+    ACTIVITY_BACKFILL_LIMIT,
+    ACTIVITY_STORE_PATH,
+    ACTIVITY_SYNC_INTERVAL,
+    MAX_PAGE_SIZE,
+)
+from .projection import ACTIVITY_HISTORY, Projection
+from .scheduler import credential_key
+from .storage import open_database
+
+# Rows read from SQLite per round trip while iterating
+_FETCH_SIZE = 200
+
+
+def normalize_timestamp(value: str) -> str:
+    """Convert an RFC 3339 timestamp to UTC `YYYY-MM-DDTHH:MM:SSZ` so it sorts as text."""
+    parsed = datetime.datetime.fromisoformat(value.replace("Z", "+00:00"))
+    return parsed.astimezone(datetime.timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+class ActivityStore:
+    """Append-only SQLite store of raw activities, partitioned by account.
+
+    Activities are never updated or deleted; re-syncing an activity that is
+    already stored is a no-op. Each account also has a watermark, the newest
+    publishedAt seen, from which the next sync resumes, and a backfill depth,
+    how many of its most recent activities have been pulled so far."""
+
+    def __init__(
+        self, path: Annotated[str, "SQLite database path, or ':memory:'"] = ACTIVITY_STORE_PATH
+    ):
+        self._db = open_database(path)
+        self._db.executescript(
+            "CREATE TABLE IF NOT EXISTS activities ("
+            " account TEXT NOT NULL, activity_id TEXT NOT NULL, published_at TEXT NOT NULL,"
+            " data TEXT NOT NULL, PRIMARY KEY (account, activity_id));"
+            "CREATE INDEX IF NOT EXISTS activities_by_time ON activities (account, published_at);"
+            "CREATE TABLE IF NOT EXISTS sync_state ("
+            " account TEXT PRIMARY KEY, watermark TEXT, synced_at REAL NOT NULL);"
+            "CREATE TABLE IF NOT EXISTS backfill_state ("
+            " account TEXT PRIMARY KEY, depth INTEGER NOT NULL, complete INTEGER NOT NULL);"
+        )
+        self._lock = threading.Lock()
+
+    def append(self, account: str, activities: list[dict]) -> int:
+        """Store activities that are not stored yet and return how many were new."""
+        rows = [
+            (
+                account,
+                activity["id"],
+                normalize_timestamp(activity["snippet"]["publishedAt"]),
+                json.dumps(activity),
+            )
+            for activity in activities
+        ]
+        with self._lock:
+            before = self._db.total_changes
+            self._db.executemany("INSERT OR IGNORE INTO activities VALUES (?, ?, ?, ?)", rows)
+            return self._db.total_changes - before
+
+    def sync_state(self, account: str) -> tuple[str | None, float | None]:
+        """Return the account's watermark and when it last finished syncing."""
+        with self._lock:
+            row = self._db.execute(
+                "SELECT watermark, synced_at FROM sync_state WHERE account = ?", (account,)
+            ).fetchone()
+        return (row[0], row[1]) if row else (None, None)
+
+    def mark_synced(self, account: str, watermark: str | None) -> None:
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO sync_state VALUES (?, ?, ?)",
+                (account, watermark, time.time()),
+            )
+
+    def backfill_state(self, account: str) -> tuple[int, bool]:
+        """Return how many recent activities were backfilled and whether that was all of them."""
+        with self._lock:
+            row = self._db.execute(
+                "SELECT depth, complete FROM backfill_state WHERE account = ?", (account,)
+            ).fetchone()
+        return (row[0], bool(row[1])) if row else (0, False)
+
+    def mark_backfilled(self, account: str, depth: int, complete: bool) -> None:
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO backfill_state VALUES (?, ?, ?)",
+                (account, depth, int(complete)),
+            )
+
+    def iter_activities(
+        self,
+        account: str,
+        published_after: Annotated[str | None, "Only activities at or after this time"] = None,
+        published_before: Annotated[str | None, "Only activities before this time"] = None,
+    ) -> Iterator[dict]:
+        """Iterate over an account's stored activities, newest first."""
+        for _, activity in self.iter_keyed_activities(account, published_after, published_before):
+            yield activity
+
+    def iter_keyed_activities(
+        self,
+        account: str,
+        published_after: Annotated[str | None, "Only activities at or after this time"] = None,
+        published_before: Annotated[str | None, "Only activities before this time"] = None,
+        after_key: Annotated[
+            tuple[str, int] | None, "Resume after the activity with this key"
+        ] = None,
+    ) -> Iterator[tuple[tuple[str, int], dict]]:
+        """Iterate over an account's stored activities, newest first, with their keys.
+
+        A key is the activity's position in that order. Passing the last key seen
+        as `after_key` continues exactly where iteration stopped, even if newer
+        activities have been stored since."""
+        rows = self._select(
+            "published_at, rowid, data", [], account, published_after, published_before, after_key
+        )
+        for published_at, rowid, data in rows:
+            yield (published_at, rowid), json.loads(data)
+
+    def iter_activity_fields(
+        self,
+        account: str,
+        paths: Annotated[Sequence[str], "JSON paths into each activity, e.g. '$.snippet.title'"],
+        published_after: Annotated[str | None, "Only activities at or after this time"] = None,
+        published_before: Annotated[str | None, "Only activities before this time"] = None,
+    ) -> Iterator[tuple]:
+        """Iterate over the values at `paths` of an account's stored activities, newest first.
+
+        SQLite extracts the values, so activities are never decoded whole in Python."""
+        columns = ", ".join(["json_extract(data, ?)"] * len(paths))
+        return self._select(columns, list(paths), account, published_after, published_before)
+
+    def _select(
+        self,
+        columns: str,
+        column_params: list[str],
+        account: str,
+        published_after: str | None,
+        published_before: str | None,
+        after_key: tuple[str, int] | None = None,
+    ) -> Iterator[tuple]:
+        """Run a query over an account's activities in key order, fetching rows in chunks."""
+        # `columns` is built in this module; only values are taken from callers
+        query = "SELECT " + columns + " FROM activities WHERE account = ?"  # noqa: S608
+        params: list[str | int] = [*column_params, account]
+        if published_after:
+            query += " AND published_at >= ?"
+            params.append(normalize_timestamp(published_after))
+        if published_before:
+            query += " AND published_at < ?"
+            params.append(normalize_timestamp(published_before))
+        if after_key:
+            query += " AND (published_at, rowid) < (?, ?)"
+            params.extend(after_key)
+        query += " ORDER BY published_at DESC, rowid DESC"
+        with self._lock:
+            cursor = self._db.execute(query, params)
+        while True:
+            with self._lock:
+                rows = cursor.fetchmany(_FETCH_SIZE)
+            if not rows:
+                return
+            yield from rows
+
+
+class ActivitySyncEngine:
+    """Pulls only activities newer than each account's watermark into the store.
+
+    The first sync of an account is a bounded backfill of its most recent
+    activities, deepened later if a caller needs more of them. Syncs within
+    `interval` seconds of the last one are skipped unless forced, so data can be
+    up to `interval` seconds stale."""
+
+    def __init__(
+        self,
+        store: Annotated[
+            ActivityStore | None, "Activity store, defaults to the process-wide one"
+        ] = None,
+        interval: Annotated[float, "Seconds a sync is trusted before syncing again"] = (
+            ACTIVITY_SYNC_INTERVAL
+        ),
+        projection: Annotated[Projection, "Activity fields kept in the store"] = ACTIVITY_HISTORY,
+        backfill: Annotated[int, "Most activities a backfill pulls"] = ACTIVITY_BACKFILL_LIMIT,
+    ):
+        self.store = store or get_activity_store()
+        self.interval = interval
+        self.projection = projection
+        self.backfill = backfill
+        self._locks: dict[str, asyncio.Lock] = {}
+
+    async def sync(
+        self,
+        backend: AsyncYouTubeBackend,
+        force: Annotated[bool, "Sync even if the last sync is recent"] = False,
+        limit: Annotated[
+            int | None, "Recent activities the caller needs, bounding the backfill"
+        ] = None,
+    ) -> Annotated[str, "Account key the activities are stored under"]:
+        """Bring the store up to date for the backend's account.
+
+        Until `limit` (at most `backfill`) recent activities are stored, the
+        newest ones are pulled without a watermark; after that, the watermark is
+        passed as publishedAfter so API traffic is proportional to new items.
+        Pages are stored as they arrive."""
+        account = credential_key(backend.credentials)
+        depth = min(limit or self.backfill, self.backfill)
+        lock = self._locks.setdefault(account, asyncio.Lock())
+        async with lock:
+            watermark, synced_at = self.store.sync_state(account)
+            backfilled, complete = self.store.backfill_state(account)
+            deepen = not complete and depth > backfilled
+            fresh = synced_at is not None and time.time() - synced_at < self.interval
+            if not deepen and not force and fresh:
+                return account
+            if deepen:
+                newest, pulled = await self._pull(backend, account, None, depth)
+                self.store.mark_backfilled(account, depth, complete=pulled < depth)
+            else:
+                newest, _ = await self._pull(backend, account, watermark, None)
+            self.store.mark_synced(account, max(newest, watermark or "") or None)
+        return account
+
+    async def _pull(
+        self,
+        backend: AsyncYouTubeBackend,
+        account: str,
+        published_after: str | None,
+        max_items: int | None,
+    ) -> tuple[str, int]:
+        """Append activities page by page; return the newest publishedAt and the count."""
+        page_size = min(max_items or MAX_PAGE_SIZE, MAX_PAGE_SIZE)
+        newest, pulled = "", 0
+        page: list[dict] = []
+        activities = backend.iter_activities(
+            page_size=page_size,
+            max_items=max_items,
+            published_after=published_after,
+            projection=self.projection,
+        )
+        async for activity in activities:
+            page.append(activity)
+            if len(page) == page_size:
+                newest = max(newest, self._append(account, page))
+                pulled += len(page)
+                page = []
+        if page:
+            newest = max(newest, self._append(account, page))
+            pulled += len(page)
+        return newest, pulled
+
+    def _append(self, account: str, page: list[dict]) -> str:
+        self.store.append(account, page)
+        return max(normalize_timestamp(a["snippet"]["publishedAt"]) for a in page)
+
+
+_default_store: ActivityStore | None = None
+_default_store_lock = threading.Lock()
+_default_engine: ActivitySyncEngine | None = None
+_default_engine_lock = threading.Lock()
+
+
+def get_activity_store() -> ActivityStore:
+    """Return the process-wide activity store, creating it on first use."""
+    global _default_store
+    if _default_store is None:
+        with _default_store_lock:
+            if _default_store is None:
+                _default_store = ActivityStore()
+    return _default_store
+
+
+def get_sync_engine() -> ActivitySyncEngine:
+    """Return the process-wide sync engine, creating it on first use."""
+    global _default_engine
+    if _default_engine is None:
+        with _default_engine_lock:
+            if _default_engine is None:
+                _default_engine = ActivitySyncEngine()
+    return _default_engine
@@ -1,10 +1,19 @@
 import os
+import weakref
+from dataclasses import dataclass
 from pathlib import Path
 
+import httpx
 import pytest
 from dotenv import load_dotenv
+from google.auth.credentials import AnonymousCredentials
 from google.oauth2.credentials import Credentials
+from googleapiclient.http import HttpMockSequence
 
+from arcade_youtube.core import cache, client, coalesce, scheduler, sync
+from arcade_youtube.core import credentials as credential_managers
+from arcade_youtube.core.async_backend import AsyncYouTubeBackend
+from arcade_youtube.core.backend import YouTubeBackend
 from arcade_youtube.core.constants import YOUTUBE_READONLY_SCOPE
 
 # Load environment variables from .env file
@@ -12,6 +21,73 @@ env_path = Path(__file__).parent / ".env"
 load_dotenv(env_path)
 
 
+@dataclass
+class Singletons:
+    """The process-wide objects the toolkit creates on first use."""
+
+    metadata_cache: cache.MetadataCache
+    quota_scheduler: scheduler.QuotaScheduler
+    sync_engine: sync.ActivitySyncEngine
+    single_flight: coalesce.SingleFlight
+    client_factory: client.YouTubeClientFactory
+
+
+@pytest.fixture(autouse=True)
+def singletons(monkeypatch):
+    """Give every test fresh process-wide singletons, so no state leaks between tests.
+
+    The caches and the activity store are empty and in memory, no quota is used,
+    nothing is in flight and no credentials have a manager. The client factory
+    has no pooled transports, since reused connections would carry requests past
+    the cassette they belong to."""
+    fresh = Singletons(
+        metadata_cache=cache.MetadataCache(":memory:"),
+        quota_scheduler=scheduler.QuotaScheduler(),
+        sync_engine=sync.ActivitySyncEngine(sync.ActivityStore(":memory:")),
+        single_flight=coalesce.SingleFlight(),
+        client_factory=client.YouTubeClientFactory(),
+    )
+    monkeypatch.setattr(cache, "_default_cache", fresh.metadata_cache)
+    monkeypatch.setattr(scheduler, "_default_scheduler", fresh.quota_scheduler)
+    monkeypatch.setattr(sync, "_default_store", fresh.sync_engine.store)
+    monkeypatch.setattr(sync, "_default_engine", fresh.sync_engine)
+    monkeypatch.setattr(coalesce, "_default_single_flight", fresh.single_flight)
+    monkeypatch.setattr(client, "_default_factory", fresh.client_factory)
+    monkeypatch.setattr(credential_managers, "_managers", weakref.WeakKeyDictionary())
+    yield fresh
+    fresh.client_factory.close()
+
+
+@pytest.fixture
+def mock_backend():
+    """Provide a maker of backends whose transport replays (headers, body) responses.
+
+    Each backend comes with its HttpMockSequence, whose request_sequence lists
+    the requests it sent."""
+
+    def make(
+        responses: list[tuple[dict, str]], **kwargs
+    ) -> tuple[YouTubeBackend, HttpMockSequence]:
+        http = HttpMockSequence(responses)
+        factory = client.YouTubeClientFactory(pool_size=1, http_factory=lambda: http)
+        return YouTubeBackend(AnonymousCredentials(), factory=factory, **kwargs), http
+
+    return make
+
+
+@pytest.fixture
+def mock_async_backend():
+    """Provide a maker of async backends whose requests are answered by `handler`."""
+
+    def make(handler, credentials=None, **kwargs) -> AsyncYouTubeBackend:
+        factory = client.YouTubeClientFactory(async_transport=httpx.MockTransport(handler))
+        return AsyncYouTubeBackend(
+            credentials or AnonymousCredentials(), factory=factory, **kwargs
+        )
+
+    return make
+
+
 @pytest.fixture
 def credentials():
     """Provide OAuth credentials for testing."""
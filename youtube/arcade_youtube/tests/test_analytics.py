@@ -0,0 +1,57 @@
+import time
+
+import numpy as np
+
+from arcade_youtube.tools.analytics import compute_watch_analytics
+from arcade_youtube.tools.records import ActivityColumns, from_epoch
+
+
+def activity(channel: str, published_at: str) -> dict:
+    return {
+        "snippet": {"title": "", "publishedAt": published_at, "channelTitle": channel},
+        "contentDetails": {"watch": {"videoId": "v"}},
+    }
+
+
+def test_breakdowns_by_day_hour_and_channel():
+    columns = ActivityColumns.from_api([
+        activity("A", "2025-05-01T10:15:00Z"),
+        activity("B", "2025-05-01T23:30:00Z"),
+        activity("A", "2025-05-03T10:45:00Z"),
+        activity("B", "2025-05-03T11:00:00Z"),
+    ])
+    result = compute_watch_analytics(columns, [600, 300, 1200, -1], rolling_window=2)
+
+    assert result["total_seconds"] == 2100
+    assert result["video_count"] == 3
+    assert result["hourly_seconds"][10] == 1800
+    assert result["hourly_seconds"][23] == 300
+    assert [(d["date"], d["seconds"]) for d in result["daily"]] == [
+        ("2025-05-01", 900), ("2025-05-02", 0), ("2025-05-03", 1200)
+    ]
+    assert [d["rolling_average_seconds"] for d in result["daily"]] == [900, 450, 600]
+    assert result["channels"][0] == {"channel_title": "A", "seconds": 1800, "videos": 2}
+
+
+def test_utc_offset_shifts_buckets():
+    columns = ActivityColumns.from_api([activity("A", "2025-05-01T23:30:00Z")])
+    result = compute_watch_analytics(columns, [60], utc_offset_minutes=60)
+
+    assert result["daily"][0]["date"] == "2025-05-02"
+    assert result["hourly_seconds"][0] == 60
+
+
+def test_large_history_is_fast():
+    rng = np.random.default_rng(0)
+    now = int(time.time())
+    columns = ActivityColumns.from_api(
+        activity(f"channel {rng.integers(500)}", from_epoch(now - int(rng.integers(180 * 86400))))
+        for _ in range(100_000)
+    )
+    durations = rng.integers(1, 3600, size=len(columns))
+
+    start = time.perf_counter()
+    result = compute_watch_analytics(columns, durations)
+
+    assert time.perf_counter() - start < 1
+    assert result["video_count"] == 100_000
@@ -0,0 +1,91 @@
+import asyncio
+import json
+
+import httpx
+import pytest
+
+from arcade_youtube.core.projection import VIDEO_DURATION
+
+
+@pytest.mark.asyncio
+async def test_iter_activities_follows_page_tokens(mock_async_backend):
+    """Test that activities are paged lazily and pagination stops at max_items."""
+    pages = {
+        None: {"items": [{"id": "a1"}, {"id": "a2"}], "nextPageToken": "page2"},
+        "page2": {"items": [{"id": "a3"}, {"id": "a4"}], "nextPageToken": "page3"},
+        "page3": {"items": [{"id": "a5"}]},
+    }
+    requested = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        token = request.url.params.get("pageToken")
+        requested.append(token)
+        return httpx.Response(200, json=pages[token])
+
+    backend = mock_async_backend(handler)
+    result = [item async for item in backend.iter_activities(page_size=2, max_items=3)]
+
+    assert [item["id"] for item in result] == ["a1", "a2", "a3"]
+    assert requested == [None, "page2"]
+
+
+@pytest.mark.asyncio
+async def test_fetch_video_details_batch_bounds_concurrency(mock_async_backend):
+    """Test that video chunks are fetched concurrently up to max_concurrency."""
+    in_flight = 0
+    peak = 0
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        ids = request.url.params["id"].split(",")
+        return httpx.Response(200, content=json.dumps({"items": [{"id": i} for i in ids]}))
+
+    backend = mock_async_backend(handler, max_concurrency=2)
+    result = await backend.fetch_video_details_batch(f"video{i}" for i in range(200))
+
+    assert len(result) == 200
+    assert peak == 2
+
+
+@pytest.mark.asyncio
+async def test_projection_sends_field_mask_and_caches_separately(mock_async_backend):
+    """Test that lean projections send a fields mask and never serve full lookups."""
+    requested = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requested.append(dict(request.url.params))
+        return httpx.Response(200, json={"items": [{"id": "v1"}]})
+
+    backend = mock_async_backend(handler)
+    await backend.fetch_video_details("v1", VIDEO_DURATION)
+    await backend.fetch_video_details("v1", VIDEO_DURATION)
+    await backend.fetch_video_details("v1")
+
+    assert len(requested) == 2
+    assert requested[0]["part"] == VIDEO_DURATION.part
+    assert requested[0]["fields"] == VIDEO_DURATION.fields
+    assert "fields" not in requested[1]
+
+
+@pytest.mark.asyncio
+async def test_fetch_subscriptions_page_returns_next_token(mock_async_backend):
+    """Test that a single subscriptions page is fetched from the given token."""
+    requested = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requested.append(request.url.params.get("pageToken"))
+        return httpx.Response(200, json={"items": [{"id": "s3"}], "nextPageToken": "page3"})
+
+    backend = mock_async_backend(handler)
+    items, next_token = await backend.fetch_subscriptions_page(
+        page_size=1,
+        page_token="page2",  # noqa: S106
+    )
+
+    assert items == [{"id": "s3"}]
+    assert next_token == "page3"  # noqa: S105
+    assert requested == ["page2"]
@@ -1,10 +1,14 @@
+import json
 from pathlib import Path
 
 import pytest
 import vcr
 from dotenv import load_dotenv
+from google.auth.credentials import AnonymousCredentials
+from googleapiclient.http import HttpMockSequence
 
 from arcade_youtube.core.backend import YouTubeBackend
+from arcade_youtube.core.client import YouTubeClientFactory
 
 # Load environment variables from .env file
 env_path = Path(__file__).parent / ".env"
@@ -37,6 +41,11 @@ def backend(credentials):
     return YouTubeBackend(credentials)
 
 
+def ok(pages: list[dict]) -> list[tuple[dict, str]]:
+    """Successful responses carrying the given pages."""
+    return [({"status": "200"}, json.dumps(page)) for page in pages]
+
+
 @my_vcr.use_cassette("test_fetch_activities.yaml")
 def test_fetch_activities(backend):
     """Test fetching activities using recorded API responses."""
@@ -90,3 +99,54 @@ def test_fetch_video_details_not_found(backend):
 
     # Verify the result
     assert result is None
+
+
+def test_fetch_video_details_batch_dedups_and_chunks(mock_backend):
+    """Test that batch lookups dedup IDs and send at most 50 IDs per request."""
+    video_ids = [f"video{i}" for i in range(60)] + ["video0", "video59", None]
+    pages = [
+        {"items": [{"id": f"video{i}"} for i in range(50)]},
+        {"items": [{"id": f"video{i}"} for i in range(50, 60)]},
+    ]
+    backend, http = mock_backend(ok(pages))
+
+    result = backend.fetch_video_details_batch(video_ids)
+
+    assert len(http.request_sequence) == 2
+    assert set(result) == {f"video{i}" for i in range(60)}
+    assert result["video59"] == {"id": "video59"}
+
+
+def test_iter_activities_follows_page_tokens(mock_backend):
+    """Test that activities are paged lazily and pagination stops at max_items."""
+    pages = [
+        {"items": [{"id": "a1"}, {"id": "a2"}], "nextPageToken": "page2"},
+        {"items": [{"id": "a3"}, {"id": "a4"}], "nextPageToken": "page3"},
+        {"items": [{"id": "a5"}]},
+    ]
+    backend, http = mock_backend(ok(pages))
+
+    result = list(backend.iter_activities(page_size=2, max_items=3))
+
+    assert [item["id"] for item in result] == ["a1", "a2", "a3"]
+    assert len(http.request_sequence) == 2
+    assert "pageToken=page2" in http.request_sequence[1][0]
+
+
+def test_client_factory_reuses_service_and_transports():
+    """Test that backends share one service and return transports to the pool."""
+    created = []
+
+    def http_factory():
+        created.append(object())
+        return HttpMockSequence([({"status": "200"}, json.dumps({"items": []}))] * 3)
+
+    factory = YouTubeClientFactory(pool_size=1, http_factory=http_factory)
+    first = YouTubeBackend(AnonymousCredentials(), factory=factory)
+    second = YouTubeBackend(AnonymousCredentials(), factory=factory)
+
+    assert first.youtube is second.youtube
+    first.fetch_subscriptions(max_results=1)
+    second.fetch_subscriptions(max_results=1)
+    # One transport backs the discovery service, one is pooled and reused
+    assert len(created) == 2
@@ -0,0 +1,96 @@
+import json
+
+from arcade_youtube.core import cache
+from arcade_youtube.core.cache import MetadataCache, VideoRequest
+
+
+def test_fresh_entries_are_served_from_cache(singletons, mock_backend):
+    """Test that a second lookup for the same videos makes no request."""
+    metadata_cache = singletons.metadata_cache
+    page = {"etag": "list-etag", "items": [{"id": "v1"}, {"id": "v2"}]}
+    backend, _ = mock_backend([({"status": "200"}, json.dumps(page))])
+
+    first = backend.fetch_video_details_batch(["v1", "v2"])
+    second = backend.fetch_video_details_batch(["v2", "v1"])
+
+    assert first == second == {"v1": {"id": "v1"}, "v2": {"id": "v2"}}
+    assert metadata_cache.stats.as_dict()["hits"] == 2
+    assert metadata_cache.stats.as_dict()["misses"] == 2
+
+
+def test_stale_entries_are_revalidated_with_etag(mock_backend):
+    """Test that stale entries are replayed with If-None-Match and kept on 304."""
+    metadata_cache = MetadataCache(":memory:", ttls={"videos": 0})
+    page = {"etag": "list-etag", "items": [{"id": "v1"}, {"id": "v2"}]}
+    backend, _ = mock_backend(
+        [({"status": "200"}, json.dumps(page)), ({"status": "304"}, "")], cache=metadata_cache
+    )
+
+    backend.fetch_video_details_batch(["v1", "v2"])
+    result = backend.fetch_video_details_batch(["v1"])
+
+    assert result == {"v1": {"id": "v1"}}
+    assert metadata_cache.stats.not_modified == 1
+
+
+def test_sqlite_store_evicts_least_recently_used(tmp_path):
+    """Test that entries survive a restart and the store stays within max_entries."""
+    path = str(tmp_path / "metadata.sqlite3")
+    metadata_cache = MetadataCache(path, max_entries=2)
+    for video_id in ("v1", "v2", "v3"):
+        metadata_cache.put("videos", video_id, {"id": video_id}, None, video_id)
+
+    reopened = MetadataCache(path)
+    assert reopened.get("videos", "v1") is None
+    assert reopened.get("videos", "v3").value == {"id": "v3"}
+    assert metadata_cache.stats.evictions == 1
+
+
+def test_lookups_served_from_sqlite_count_as_recent_use(tmp_path, monkeypatch):
+    """Test that entries read back from SQLite by a batch lookup are not evicted first."""
+    path = str(tmp_path / "metadata.sqlite3")
+    clock = iter(range(100))
+    monkeypatch.setattr(cache.time, "time", lambda: float(next(clock)))
+    writer = MetadataCache(path, max_entries=2)
+    for video_id in ("v1", "v2"):
+        writer.put("videos", video_id, {"id": video_id}, None, video_id)
+
+    reader = MetadataCache(path, max_entries=2)
+    plan = reader.plan_video_requests(["v1", "v1"])
+    reader.put("videos", "v3", {"id": "v3"}, None, "v3")
+
+    assert plan.requests == []
+    assert reader.stats.hits == 2
+    assert reader.get("videos", "v1") is not None
+    assert MetadataCache(path).get("videos", "v2") is None
+
+
+def test_memory_hits_count_as_recent_use(tmp_path, monkeypatch):
+    """Test that entries served from memory are not evicted first once written back."""
+    path = str(tmp_path / "metadata.sqlite3")
+    clock = iter(range(100))
+    monkeypatch.setattr(cache.time, "time", lambda: float(next(clock)))
+    metadata_cache = MetadataCache(path, max_entries=2)
+    for video_id in ("v1", "v2"):
+        metadata_cache.put("videos", video_id, {"id": video_id}, None, video_id)
+
+    assert metadata_cache.get("videos", "v1") is not None
+    metadata_cache.put("videos", "v3", {"id": "v3"}, None, "v3")
+
+    reopened = MetadataCache(path)
+    assert reopened.get("videos", "v1") is not None
+    assert reopened.get("videos", "v2") is None
+
+
+def test_response_is_stored_in_one_write(tmp_path):
+    """Test that a page of videos is stored and evicted for once, not once per video."""
+    metadata_cache = MetadataCache(str(tmp_path / "metadata.sqlite3"), max_entries=2)
+    statements: list[str] = []
+    metadata_cache._db.set_trace_callback(statements.append)
+    page = {"etag": "list-etag", "items": [{"id": f"v{i}"} for i in range(3)]}
+
+    stored = metadata_cache.store_video_response(VideoRequest(["v0", "v1", "v2"]), page)
+
+    assert list(stored) == ["v0", "v1", "v2"]
+    assert sum("COUNT(*)" in statement for statement in statements) == 1
+    assert metadata_cache.stats.evictions == 1
@@ -0,0 +1,90 @@
+import asyncio
+import threading
+
+import httpx
+import pytest
+
+from arcade_youtube.core.coalesce import SingleFlight
+
+
+@pytest.mark.asyncio
+async def test_concurrent_backends_share_one_request(singletons, mock_async_backend):
+    """Test that identical requests from separate backends are sent once."""
+    single_flight = singletons.single_flight
+    requested = []
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        requested.append(request.url.params["id"])
+        await asyncio.sleep(0.01)
+        return httpx.Response(200, json={"items": [{"id": "v1"}]})
+
+    backends = [mock_async_backend(handler) for _ in range(5)]
+    results = await asyncio.gather(*(
+        backend._execute_request("videos", {"id": "v1", "part": "snippet"})
+        for backend in backends
+    ))
+
+    assert requested == ["v1"]
+    assert all(result == {"items": [{"id": "v1"}]} for result in results)
+    assert single_flight.stats.as_dict() == {"leaders": 1, "joined": 4}
+
+
+@pytest.mark.asyncio
+async def test_do_async_shares_errors_and_survives_cancelled_callers():
+    """Test that joined callers see the leader's error and a cancelled caller stops nobody."""
+    single_flight = SingleFlight()
+    calls = 0
+
+    async def fail():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        raise ValueError("boom")
+
+    leader = asyncio.create_task(single_flight.do_async("key", fail))
+    follower = asyncio.create_task(single_flight.do_async("key", fail))
+    await asyncio.sleep(0)
+    leader.cancel()
+
+    with pytest.raises(ValueError, match="boom"):
+        await follower
+    assert calls == 1
+
+    # Nothing is remembered once the call has finished
+    with pytest.raises(ValueError):
+        await single_flight.do_async("key", fail)
+    assert calls == 2
+
+
+def test_do_shares_result_between_threads():
+    """Test that threads asking for the same key while it runs share one call."""
+    single_flight = SingleFlight()
+    started = threading.Event()
+    release = threading.Event()
+    calls = 0
+
+    def work():
+        nonlocal calls
+        calls += 1
+        started.set()
+        release.wait()
+        return {"items": []}
+
+    results = []
+    leader = threading.Thread(target=lambda: results.append(single_flight.do("key", work)))
+    leader.start()
+    started.wait()
+    followers = [
+        threading.Thread(target=lambda: results.append(single_flight.do("key", work)))
+        for _ in range(3)
+    ]
+    for thread in followers:
+        thread.start()
+    while single_flight.stats.joined < 3:
+        threading.Event().wait(0.001)
+    release.set()
+    for thread in [leader, *followers]:
+        thread.join()
+
+    assert calls == 1
+    assert len(results) == 4 and all(result is results[0] for result in results)
@@ -0,0 +1,118 @@
+import asyncio
+import datetime
+import threading
+
+import httpx
+import pytest
+from google.oauth2.credentials import Credentials
+
+from arcade_youtube.core.credentials import (
+    CredentialManager,
+    TokenStore,
+    get_credential_manager,
+)
+
+
+class CountingCredentials(Credentials):
+    """Credentials whose refresh issues numbered tokens without network access."""
+
+    def __init__(self, lifetime: float = 3600, **kwargs):
+        super().__init__(token=None, refresh_token="refresh", **kwargs)  # noqa: S106
+        self.lifetime = lifetime
+        self.refresh_count = 0
+        self._count_lock = threading.Lock()
+
+    def refresh(self, request):
+        with self._count_lock:
+            self.refresh_count += 1
+            self.token = f"token{self.refresh_count}"
+        now = datetime.datetime.now(datetime.timezone.utc).replace(tzinfo=None)
+        self.expiry = now + datetime.timedelta(seconds=self.lifetime)
+
+
+@pytest.mark.asyncio
+async def test_concurrent_refreshes_are_collapsed():
+    """Test that many callers needing a refresh at once trigger a single one."""
+    credentials = CountingCredentials()
+    manager = CredentialManager(lambda: credentials)
+
+    results = await asyncio.gather(*(manager.get_fresh() for _ in range(10)))
+
+    assert credentials.refresh_count == 1
+    assert all(result is credentials for result in results)
+    assert credentials.token == "token1"  # noqa: S105
+
+
+@pytest.mark.asyncio
+async def test_tokens_close_to_expiry_are_refreshed_in_the_background():
+    """Test that get() serves the current token and refreshes it before it expires."""
+    credentials = CountingCredentials(lifetime=60)
+    manager = CredentialManager(lambda: credentials, refresh_margin=300)
+    await manager.get_fresh()
+
+    assert manager.get().token == "token1"  # noqa: S105
+    await manager.refresh()
+
+    assert credentials.token == "token2"  # noqa: S105
+
+
+@pytest.mark.asyncio
+async def test_token_refreshed_by_another_process_is_adopted():
+    """Test that a fresher token in the shared store is used instead of refreshing."""
+    store = TokenStore(":memory:")
+    first = CountingCredentials()
+    await CredentialManager(lambda: first, store=store).get_fresh()
+    second = CountingCredentials()
+
+    await CredentialManager(lambda: second, store=store).get_fresh()
+
+    assert second.token == "token1"  # noqa: S105
+    assert second.refresh_count == 0
+
+
+@pytest.mark.asyncio
+async def test_backend_refreshes_through_the_credentials_manager(mock_async_backend):
+    """Test that concurrent requests refresh an expired and then a revoked token once each."""
+    credentials = CountingCredentials()
+    manager = CredentialManager(lambda: credentials)
+    assert get_credential_manager(manager.credentials) is manager
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        if request.headers["Authorization"] == "Bearer token1":
+            return httpx.Response(401, json={"error": {"code": 401}})
+        return httpx.Response(200, json={"items": [{"id": request.url.params["id"]}]})
+
+    backend = mock_async_backend(handler, credentials)
+    results = await asyncio.gather(
+        *(backend._execute_request("videos", {"id": f"video{i}"}) for i in range(5))
+    )
+
+    assert [result["items"][0]["id"] for result in results] == [f"video{i}" for i in range(5)]
+    assert credentials.refresh_count == 2
+    assert manager.refreshes == 2
+    assert credentials.token == "token2"  # noqa: S105
+
+
+def test_bare_credentials_get_a_manager_of_their_own():
+    credentials = CountingCredentials()
+
+    manager = get_credential_manager(credentials)
+
+    assert manager.credentials is credentials
+    assert get_credential_manager(credentials) is manager
+
+
+@pytest.mark.asyncio
+async def test_token_without_expiry_is_refreshed_to_learn_it():
+    """Test that the background refresh does not give up on a token of unknown expiry."""
+    credentials = CountingCredentials()
+    credentials.token, credentials.expiry = "x", None
+    manager = CredentialManager(lambda: credentials)
+
+    manager.start()
+    await asyncio.sleep(0.1)
+    await manager.stop()
+
+    assert credentials.refresh_count == 1
+    assert credentials.token == "token1"  # noqa: S105
+    assert manager.seconds_left() is not None
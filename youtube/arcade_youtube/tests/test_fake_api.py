@@ -0,0 +1,44 @@
+import pytest
+from google.auth.credentials import AnonymousCredentials
+
+from arcade_youtube.core.async_backend import AsyncYouTubeBackend
+from arcade_youtube.core.backend import YouTubeBackend
+from arcade_youtube.core.client import YouTubeClientFactory
+from benchmarks.fake_youtube import FakeDataset, FakeYouTubeServer
+
+
+@pytest.fixture
+def fake_api():
+    """Serve a small synthetic account from the benchmarks' fake YouTube API."""
+    with FakeYouTubeServer(FakeDataset(activities=120, subscriptions=60, videos=80)) as server:
+        yield server
+
+
+@pytest.mark.asyncio
+async def test_async_backend_pages_and_revalidates_against_fake_api(fake_api):
+    """Test that the async backend follows pages and gets 304s for unchanged ETags."""
+    factory = YouTubeClientFactory(api_root=fake_api.url)
+    backend = AsyncYouTubeBackend(AnonymousCredentials(), factory=factory)
+
+    activities = [activity async for activity in backend.iter_activities()]
+    response = await backend._execute_request("videos", {"id": "vid00000001"})
+    revalidated = await backend._execute_request(
+        "videos", {"id": "vid00000001"}, etag=response["etag"]
+    )
+
+    assert len(activities) == 120
+    assert len({activity["id"] for activity in activities}) == 120
+    assert revalidated is None
+    assert fake_api.stats.requests == {"activities": 3, "videos": 2}
+    assert fake_api.stats.not_modified == 1
+
+
+def test_sync_backend_uses_configured_api_root(fake_api):
+    """Test that the discovery-built service sends requests to the configured root."""
+    factory = YouTubeClientFactory(api_root=fake_api.url)
+    backend = YouTubeBackend(AnonymousCredentials(), factory=factory)
+
+    subscriptions = backend.fetch_subscriptions(max_results=60)
+
+    assert len(subscriptions) == 60
+    assert fake_api.stats.requests == {"subscriptions": 2}
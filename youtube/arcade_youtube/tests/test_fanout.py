@@ -0,0 +1,90 @@
+import asyncio
+
+import httpx
+import pytest
+from google.auth.credentials import AnonymousCredentials
+
+from arcade_youtube.core.client import YouTubeClientFactory
+from arcade_youtube.core.fanout import fan_out
+
+
+def mock_factory(handler) -> YouTubeClientFactory:
+    """Provide a client factory whose requests are answered by `handler`."""
+    return YouTubeClientFactory(async_transport=httpx.MockTransport(handler))
+
+
+@pytest.mark.asyncio
+async def test_fan_out_streams_results_as_accounts_finish():
+    """Test that fast accounts are yielded before slow ones and failures stay isolated."""
+    delays = {"slow": 0.05, "fast": 0.0, "broken": 0.01}
+    accounts = {name: AnonymousCredentials() for name in delays}
+    names = {id(credentials): name for name, credentials in accounts.items()}
+
+    async def operation(backend):
+        name = names[id(backend.credentials)]
+        await asyncio.sleep(delays[name])
+        if name == "broken":
+            raise RuntimeError("token revoked")
+        return name.upper()
+
+    results = [result async for result in fan_out(accounts, operation)]
+
+    assert [result.account for result in results] == ["fast", "broken", "slow"]
+    assert [result.result for result in results] == ["FAST", None, "SLOW"]
+    assert results[1].error == "token revoked"
+    assert not results[1].ok
+
+
+@pytest.mark.asyncio
+async def test_fan_out_reports_timeouts_per_account():
+    """Test that an account exceeding its timeout is reported without failing the rest."""
+    accounts = {"hung": AnonymousCredentials(), "fine": AnonymousCredentials()}
+
+    async def operation(backend):
+        if backend.credentials is accounts["hung"]:
+            await asyncio.sleep(10)
+        return "done"
+
+    results = {
+        result.account: result async for result in fan_out(accounts, operation, timeout=0.05)
+    }
+
+    assert results["fine"].result == "done"
+    assert results["hung"].timed_out
+    assert results["hung"].as_dict()["ok"] is False
+
+
+@pytest.mark.asyncio
+async def test_fan_out_bounds_accounts_and_requests_in_flight():
+    """Test that max_accounts and account_concurrency cap concurrent API requests."""
+    in_flight = 0
+    peak = 0
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        ids = request.url.params["id"].split(",")
+        return httpx.Response(200, json={"items": [{"id": i} for i in ids]})
+
+    accounts = {f"account{i}": AnonymousCredentials() for i in range(6)}
+
+    async def operation(backend):
+        videos = await backend.fetch_video_details_batch(f"video{i}" for i in range(200))
+        return len(videos)
+
+    results = [
+        result
+        async for result in fan_out(
+            accounts,
+            operation,
+            max_accounts=2,
+            account_concurrency=2,
+            factory=mock_factory(handler),
+        )
+    ]
+
+    assert [result.result for result in results] == [200] * 6
+    assert peak <= 4
@@ -0,0 +1,108 @@
+from arcade_youtube.core.sync import ActivityStore
+from arcade_youtube.tools.records import (
+    ACTIVITY_FIELD_PATHS,
+    ActivityColumns,
+    SubscriptionColumns,
+)
+
+
+def activity(
+    video_id: str, channel: str, kind: str = "watch", published_at: str = "2025-05-02T03:16:22Z"
+) -> dict:
+    content_details = (
+        {"watch": {"videoId": video_id}}
+        if kind == "watch"
+        else {"playlistItem": {"resourceId": {"videoId": video_id}}}
+    )
+    return {
+        "snippet": {
+            "title": f"Title {video_id}",
+            "publishedAt": published_at,
+            "channelTitle": channel,
+            "description": "",
+        },
+        "contentDetails": content_details,
+    }
+
+
+def test_activity_columns_to_dicts():
+    """Test that columnar records convert to the dicts get_watch_history returns."""
+    activities = [activity("v1", "Chan"), activity("v2", "Chan", "playlistItem")]
+    columns = ActivityColumns.from_api(activities)
+
+    assert columns.to_dicts() == [
+        {
+            "title": f"Title {video_id}",
+            "video_id": video_id,
+            "published_at": "2025-05-02T03:16:22Z",
+            "channel_title": "Chan",
+            "description": "",
+        }
+        for video_id in ("v1", "v2")
+    ]
+    assert list(columns.is_watch) == [1, 0]
+
+
+def test_activity_columns_keep_original_timestamps():
+    """Test that offsets and fractional seconds survive the epoch column."""
+    timestamps = ["2025-05-02T03:16:22.724739Z", "2025-05-02T05:16:22+02:00", ""]
+    columns = ActivityColumns.from_api(
+        activity(f"v{i}", "Chan", published_at=published_at)
+        for i, published_at in enumerate(timestamps)
+    )
+
+    assert [record.published_at for record in columns] == timestamps
+    assert list(columns.published_at) == [1746155782, 1746155782, 0]
+
+
+def test_activity_columns_from_stored_fields_match_from_api():
+    """Test that columns built from fields SQLite extracted equal those from whole activities."""
+    timestamps = ["2025-05-02T03:16:22Z", "2025-05-02T05:16:22+02:00", "2025-05-01T00:00:00Z"]
+    activities = [
+        {**activity(f"v{i}", f"Chan {i % 2}", kind), "id": f"a{i}"}
+        for i, kind in enumerate(("watch", "playlistItem", "watch"))
+    ]
+    for item, published_at in zip(activities, timestamps, strict=True):
+        item["snippet"]["publishedAt"] = published_at
+    store = ActivityStore(":memory:")
+    store.append("account", activities)
+
+    columns = ActivityColumns.from_fields(
+        store.iter_activity_fields("account", ACTIVITY_FIELD_PATHS)
+    )
+    expected = ActivityColumns.from_api(store.iter_activities("account"))
+
+    assert columns.to_dicts() == expected.to_dicts()
+    assert list(columns.published_at) == list(expected.published_at)
+    assert list(columns.is_watch) == list(expected.is_watch) == [0, 1, 1]
+
+
+def test_activity_columns_intern_channel_titles():
+    """Test that repeated channel titles are stored once."""
+    columns = ActivityColumns.from_api(
+        activity(f"v{i}", "Chan A" if i % 2 else "Chan B") for i in range(10)
+    )
+
+    assert len(columns) == 10
+    assert columns.channels == ["Chan B", "Chan A"]
+    assert list(columns.channel_codes[:4]) == [0, 1, 0, 1]
+
+
+def test_subscription_columns_to_dicts():
+    subscriptions = [
+        {
+            "snippet": {
+                "title": "Chan",
+                "publishedAt": "2025-05-02T03:16:22.724739Z",
+                "resourceId": {"channelId": "UC1"},
+            }
+        }
+    ]
+
+    assert SubscriptionColumns.from_api(subscriptions).to_dicts() == [
+        {
+            "channel_title": "Chan",
+            "channel_id": "UC1",
+            "subscribed_at": "2025-05-02T03:16:22.724739Z",
+        }
+    ]
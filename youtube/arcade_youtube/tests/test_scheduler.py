@@ -0,0 +1,56 @@
+import json
+
+import pytest
+
+from arcade_youtube.core import scheduler
+from arcade_youtube.core.scheduler import Priority, QuotaScheduler, YouTubeQuotaExceededError
+
+
+def error_body(reason: str) -> str:
+    return json.dumps({"error": {"errors": [{"reason": reason}], "message": reason}})
+
+
+@pytest.fixture(autouse=True)
+def no_backoff(monkeypatch):
+    """Skip the real backoff sleeps."""
+    monkeypatch.setattr(scheduler.time, "sleep", lambda seconds: None)
+
+
+def test_transient_errors_are_retried(singletons, mock_backend):
+    """Test that rate limits and 5xx errors are retried until the request succeeds."""
+    quota_scheduler = singletons.quota_scheduler
+    backend, _ = mock_backend([
+        ({"status": "403"}, error_body("rateLimitExceeded")),
+        ({"status": "503"}, error_body("backendError")),
+        ({"status": "200"}, json.dumps({"items": [{"id": "s1"}]})),
+    ])
+
+    assert backend.fetch_subscriptions(max_results=1) == [{"id": "s1"}]
+    assert quota_scheduler.used(backend.credentials) == 3
+
+
+def test_quota_exceeded_is_not_retried(mock_backend):
+    """Test that quotaExceeded stops further requests until the quota resets."""
+    backend, _ = mock_backend([({"status": "403"}, error_body("quotaExceeded"))])
+
+    with pytest.raises(YouTubeQuotaExceededError):
+        backend.fetch_subscriptions(max_results=1)
+    with pytest.raises(YouTubeQuotaExceededError):
+        backend.fetch_subscriptions(max_results=1)
+
+
+def test_background_work_is_shed_before_interactive(mock_backend):
+    """Test that low-priority requests are refused once only the reserve is left."""
+    quota_scheduler = QuotaScheduler(daily_quota=10, reserve_ratio=0.5)
+    page = ({"status": "200"}, json.dumps({"items": []}))
+    interactive, _ = mock_backend([page] * 10, scheduler=quota_scheduler)
+    background, _ = mock_backend(
+        [page] * 10, scheduler=quota_scheduler, priority=Priority.BACKGROUND
+    )
+
+    for _ in range(5):
+        background.fetch_activities(max_results=1)
+    with pytest.raises(YouTubeQuotaExceededError, match="nearly exhausted") as refused:
+        background.fetch_activities(max_results=1)
+    assert refused.value.reserved
+    assert interactive.fetch_activities(max_results=1) == []
@@ -0,0 +1,123 @@
+import httpx
+import pytest
+
+from arcade_youtube.core.sync import ActivityStore, ActivitySyncEngine
+
+
+def activity(activity_id: str, published_at: str) -> dict:
+    return {
+        "id": activity_id,
+        "snippet": {"publishedAt": published_at},
+        "contentDetails": {"watch": {"videoId": f"video-{activity_id}"}},
+    }
+
+
+@pytest.mark.asyncio
+async def test_sync_only_pulls_activities_after_watermark(mock_async_backend):
+    """Test that repeat syncs resume from the newest stored activity."""
+    feed = [activity("a2", "2025-05-02T10:00:00Z"), activity("a1", "2025-05-01T10:00:00+00:00")]
+    requested_after = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        published_after = request.url.params.get("publishedAfter")
+        requested_after.append(published_after)
+        items = [
+            a for a in feed
+            if not published_after or a["snippet"]["publishedAt"] >= published_after
+        ]
+        return httpx.Response(200, json={"items": items})
+
+    backend = mock_async_backend(handler)
+    engine = ActivitySyncEngine(ActivityStore(":memory:"))
+
+    account = await engine.sync(backend)
+    feed.insert(0, activity("a3", "2025-05-03T10:00:00Z"))
+    await engine.sync(backend, force=True)
+
+    assert requested_after == [None, "2025-05-02T10:00:00Z"]
+    assert [a["id"] for a in engine.store.iter_activities(account)] == ["a3", "a2", "a1"]
+
+
+@pytest.mark.asyncio
+async def test_recent_sync_is_not_repeated(mock_async_backend):
+    """Test that a sync within the interval is served from the store alone."""
+    calls = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(request)
+        return httpx.Response(200, json={"items": [activity("a1", "2025-05-01T10:00:00Z")]})
+
+    backend = mock_async_backend(handler)
+    engine = ActivitySyncEngine(ActivityStore(":memory:"), interval=60)
+
+    await engine.sync(backend)
+    await engine.sync(backend)
+
+    assert len(calls) == 1
+
+
+@pytest.mark.asyncio
+async def test_first_sync_is_bounded_by_limit(mock_async_backend):
+    """Test that the first sync pulls only what the caller needs, up to the backfill."""
+    feed = [activity(f"a{i:03d}", f"2025-05-01T{i // 60:02d}:{i % 60:02d}:00Z") for i in range(120)]
+    feed.reverse()
+    requested = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        size = int(request.url.params["maxResults"])
+        offset = int(request.url.params.get("pageToken") or 0)
+        requested.append((offset, size))
+        body = {"items": feed[offset:offset + size], "nextPageToken": str(offset + size)}
+        return httpx.Response(200, json=body)
+
+    backend = mock_async_backend(handler)
+    engine = ActivitySyncEngine(ActivityStore(":memory:"), backfill=100)
+
+    account = await engine.sync(backend, limit=4)
+    first = [a["id"] for a in engine.store.iter_activities(account)]
+    await engine.sync(backend)
+
+    assert first == [a["id"] for a in feed[:4]]
+    assert requested == [(0, 4), (0, 50), (50, 50)]
+    assert [a["id"] for a in engine.store.iter_activities(account)] == [
+        a["id"] for a in feed[:100]
+    ]
+
+
+@pytest.mark.asyncio
+async def test_sync_keeps_pages_stored_before_a_failure(mock_async_backend):
+    """Test that pages are stored as they arrive, so a failed sync keeps its progress."""
+    feed = [activity(f"a{i:03d}", f"2025-05-01T{i // 60:02d}:{i % 60:02d}:00Z") for i in range(120)]
+    feed.reverse()
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        if request.url.params.get("pageToken"):
+            return httpx.Response(403, json={"error": {"errors": [{"reason": "forbidden"}]}})
+        return httpx.Response(200, json={"items": feed[:50], "nextPageToken": "50"})
+
+    backend = mock_async_backend(handler)
+    engine = ActivitySyncEngine(ActivityStore(":memory:"), backfill=100)
+
+    with pytest.raises(httpx.HTTPStatusError):
+        await engine.sync(backend)
+
+    assert len(list(engine.store.iter_activities("anonymous"))) == 50
+    assert engine.store.sync_state("anonymous") == (None, None)
+
+
+def test_keyed_iteration_resumes_after_key():
+    """Test that keyset pagination is stable across ties and newly stored activities."""
+    store = ActivityStore(":memory:")
+    store.append("account", [
+        activity("a1", "2025-05-01T10:00:00Z"),
+        activity("a2", "2025-05-02T10:00:00Z"),
+        activity("a3", "2025-05-02T10:00:00Z"),
+    ])
+
+    keyed = store.iter_keyed_activities("account")
+    first_key, first = next(keyed)
+    store.append("account", [activity("a4", "2025-05-03T10:00:00Z")])
+    rest = [a["id"] for _, a in store.iter_keyed_activities("account", after_key=first_key)]
+
+    assert first["id"] == "a3"
+    assert rest == ["a2", "a1"]
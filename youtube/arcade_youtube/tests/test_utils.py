@@ -0,0 +1,45 @@
+import pytest
+
+from arcade_youtube.tools.utils import (
+    INVALID_DURATION,
+    DurationParseError,
+    parse_duration,
+    parse_durations,
+)
+
+
+@pytest.mark.parametrize(
+    ("duration", "seconds"),
+    [
+        ("PT1H2M3S", 3723),
+        ("PT10M", 600),
+        ("P1DT2H", 93600),
+        ("P1W", 604800),
+        ("PT4.5S", 5),
+        ("P0D", 0),
+    ],
+)
+def test_parse_duration(duration, seconds):
+    assert parse_duration(duration) == seconds
+
+
+@pytest.mark.parametrize("duration", ["", "P", "PT", "P1DT", "1H", "PT1H2X", "PT1S "])
+def test_parse_duration_rejects_malformed_input(duration):
+    with pytest.raises(DurationParseError):
+        parse_duration(duration)
+
+
+def test_parse_durations_bulk():
+    assert list(parse_durations(["PT1S", "PT1M", "PT1S"])) == [1, 60, 1]
+    assert list(parse_durations(["PT1S", "bogus"], strict=False)) == [1, INVALID_DURATION]
+    with pytest.raises(DurationParseError):
+        parse_durations(["PT1S", "bogus"])
+
+
+def test_parse_durations_marks_non_strings_invalid():
+    """Test that non-string entries, even unhashable ones, never escape as TypeError."""
+    durations = ["PT1S", ["PT1S"], None, {"seconds": 1}]
+
+    assert list(parse_durations(durations, strict=False)) == [1] + [INVALID_DURATION] * 3
+    with pytest.raises(DurationParseError):
+        parse_durations(durations)
@@ -0,0 +1,296 @@
+"""Compact record types and columnar containers for formatted YouTube data.
+
+Tools build these straight from raw API items and only turn them into dicts
+at the tool boundary, which keeps multi-thousand-item histories small: one
+slot-based object per record instead of a dict, or parallel arrays with
+interned channel titles for whole histories."""
+import datetime
+import sys
+from array import array
+from collections.abc import Iterable, Iterator, Sequence
+from dataclasses import dataclass
+from typing import Any
+
+from arcade_youtube.tools.constants import RESOURCE_ID_PATH, SNIPPET_PATH
+from arcade_youtube.tools.utils import get_activity_video_id
+
+
+def to_epoch(timestamp: str) -> int:
+    """Convert an RFC 3339 timestamp to epoch seconds; empty strings map to 0."""
+    if not timestamp:
+        return 0
+    parsed = datetime.datetime.fromisoformat(timestamp.replace("Z", "+00:00"))
+    return int(parsed.timestamp())
+
+
+def to_epochs(timestamps: Sequence[str]) -> array:
+    """Convert many RFC 3339 timestamps to an array('q') of epoch seconds in one pass.
+
+    UTC timestamps are parsed together as NumPy datetime64 values; the rare ones
+    with another offset go through to_epoch. Empty strings map to 0."""
+    import numpy as np
+
+    text = np.array(timestamps, dtype=np.str_)
+    utc = np.strings.endswith(text, "Z") | (text == "")
+    parsed = np.strings.rstrip(text[utc], "Z").astype("datetime64[s]")
+    seconds = np.zeros(text.size, dtype=np.int64)
+    seconds[utc] = np.where(np.isnat(parsed), 0, parsed.astype(np.int64))
+    for index in np.flatnonzero(~utc):
+        seconds[index] = to_epoch(str(text[index]))
+    result = array("q")
+    result.frombytes(seconds.tobytes())
+    return result
+
+
+def from_epoch(seconds: int) -> str:
+    """Format epoch seconds as an RFC 3339 UTC timestamp; 0 maps back to ''."""
+    if not seconds:
+        return ""
+    parsed = datetime.datetime.fromtimestamp(seconds, datetime.timezone.utc)
+    return parsed.strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+@dataclass(slots=True, frozen=True)
+class ActivityRecord:
+    """One watched video, as returned by get_watch_history."""
+
+    title: str
+    video_id: str | None
+    published_at: str
+    channel_title: str
+    description: str
+
+    @classmethod
+    def from_api(cls, activity: dict) -> "ActivityRecord":
+        snippet = activity.get(SNIPPET_PATH, {})
+        return cls(
+            title=snippet.get("title", ""),
+            video_id=get_activity_video_id(activity),
+            published_at=snippet.get("publishedAt", ""),
+            channel_title=snippet.get("channelTitle", ""),
+            description=snippet.get("description", ""),
+        )
+
+    def to_dict(self) -> dict:
+        return {
+            "title": self.title,
+            "video_id": self.video_id,
+            "published_at": self.published_at,
+            "channel_title": self.channel_title,
+            "description": self.description,
+        }
+
+
+@dataclass(slots=True, frozen=True)
+class SubscriptionRecord:
+    """One channel subscription, as returned by get_subscriptions."""
+
+    channel_title: str | None
+    channel_id: str | None
+    subscribed_at: str | None
+
+    @classmethod
+    def from_api(cls, subscription: dict) -> "SubscriptionRecord":
+        snippet = subscription.get(SNIPPET_PATH, {})
+        return cls(
+            channel_title=snippet.get("title"),
+            channel_id=snippet.get(RESOURCE_ID_PATH, {}).get("channelId"),
+            subscribed_at=snippet.get("publishedAt"),
+        )
+
+    def to_dict(self) -> dict:
+        return {
+            "channel_title": self.channel_title,
+            "channel_id": self.channel_id,
+            "subscribed_at": self.subscribed_at,
+        }
+
+
+# Activity fields read by ActivityColumns.from_fields, as SQLite JSON paths; the
+# last two are the video IDs of watch and playlistItem activities
+ACTIVITY_FIELD_PATHS = (
+    "$.snippet.publishedAt",
+    "$.snippet.title",
+    "$.snippet.channelTitle",
+    "$.snippet.description",
+    "$.contentDetails.watch.videoId",
+    "$.contentDetails.playlistItem.resourceId.videoId",
+)
+
+
+class ActivityColumns:
+    """Columnar store of activities: parallel arrays with interned channel titles.
+
+    Times are kept as epoch seconds in an array('q') for analytics, alongside
+    the API's own timestamp strings, which records return unchanged. Channels
+    are indexes into a table of distinct titles and the watch/playlistItem kind
+    is one byte."""
+
+    __slots__ = (
+        "_channel_codes",
+        "channel_codes",
+        "channels",
+        "descriptions",
+        "is_watch",
+        "published_at",
+        "published_at_text",
+        "titles",
+        "video_ids",
+    )
+
+    def __init__(self) -> None:
+        self.titles: list[str] = []
+        self.video_ids: list[str | None] = []
+        self.published_at = array("q")
+        self.published_at_text: list[str] = []
+        self.channels: list[str] = []
+        self.channel_codes = array("l")
+        self.descriptions: list[str] = []
+        self.is_watch = bytearray()
+        self._channel_codes: dict[str, int] = {}
+
+    @classmethod
+    def from_api(cls, activities: Iterable[dict]) -> "ActivityColumns":
+        columns = cls()
+        columns.extend(activities)
+        return columns
+
+    @classmethod
+    def from_fields(cls, rows: Iterable[Sequence[Any]]) -> "ActivityColumns":
+        """Build columns from the values at ACTIVITY_FIELD_PATHS of each activity.
+
+        Lets a store extract just these fields instead of decoding whole activities."""
+        columns = cls()
+        for published_at, title, channel, description, watch_id, playlist_id in rows:
+            columns._add(
+                published_at or "",
+                title or "",
+                channel or "",
+                description or "",
+                watch_id or playlist_id,
+                watch_id is not None,
+            )
+        columns.published_at.extend(to_epochs(columns.published_at_text))
+        return columns
+
+    def append(self, activity: dict) -> None:
+        """Append one raw API activity."""
+        self.extend((activity,))
+
+    def extend(self, activities: Iterable[dict]) -> None:
+        start = len(self.published_at_text)
+        for activity in activities:
+            snippet = activity.get(SNIPPET_PATH, {})
+            self._add(
+                snippet.get("publishedAt", ""),
+                snippet.get("title", ""),
+                snippet.get("channelTitle", ""),
+                snippet.get("description", ""),
+                get_activity_video_id(activity),
+                "watch" in activity.get("contentDetails", {}),
+            )
+        # Timestamps are converted together, which is far cheaper than one at a time
+        self.published_at.extend(to_epochs(self.published_at_text[start:]))
+
+    def _add(
+        self,
+        published_at: str,
+        title: str,
+        channel: str,
+        description: str,
+        video_id: str | None,
+        is_watch: bool,
+    ) -> None:
+        """Append every column of one activity but its epoch time."""
+        channel = sys.intern(channel)
+        code = self._channel_codes.get(channel)
+        if code is None:
+            code = self._channel_codes[channel] = len(self.channels)
+            self.channels.append(channel)
+        self.titles.append(title)
+        self.video_ids.append(video_id)
+        self.published_at_text.append(published_at)
+        self.channel_codes.append(code)
+        self.descriptions.append(description)
+        self.is_watch.append(is_watch)
+
+    def __len__(self) -> int:
+        return len(self.titles)
+
+    def __getitem__(self, index: int) -> ActivityRecord:
+        return ActivityRecord(
+            title=self.titles[index],
+            video_id=self.video_ids[index],
+            published_at=self.published_at_text[index],
+            channel_title=self.channels[self.channel_codes[index]],
+            description=self.descriptions[index],
+        )
+
+    def __iter__(self) -> Iterator[ActivityRecord]:
+        return (self[index] for index in range(len(self)))
+
+    def to_dicts(self) -> list[dict]:
+        """Convert to the dicts tools return; only call this at the tool boundary."""
+        return [record.to_dict() for record in self]
+
+    def to_numpy(self) -> dict[str, Any]:
+        """Export the columns as NumPy arrays (requires numpy)."""
+        import numpy as np
+
+        return {
+            "title": np.array(self.titles, dtype=object),
+            "video_id": np.array(self.video_ids, dtype=object),
+            "published_at": np.frombuffer(self.published_at, dtype=np.int64),
+            "channel_code": np.frombuffer(
+                self.channel_codes, dtype=np.dtype(f"i{self.channel_codes.itemsize}")
+            ),
+            "channel": np.array(self.channels, dtype=object),
+            "description": np.array(self.descriptions, dtype=object),
+            "is_watch": np.frombuffer(self.is_watch, dtype=np.bool_),
+        }
+
+    def to_arrow(self) -> Any:
+        """Export the columns as a pyarrow Table, channels dictionary-encoded (requires pyarrow)."""
+        import pyarrow as pa
+
+        return pa.table({
+            "title": pa.array(self.titles, pa.string()),
+            "video_id": pa.array(self.video_ids, pa.string()),
+            "published_at": pa.array(self.published_at, pa.int64()).cast(pa.timestamp("s", "UTC")),
+            "channel_title": pa.DictionaryArray.from_arrays(
+                pa.array(self.channel_codes, pa.int32()), pa.array(self.channels, pa.string())
+            ),
+            "description": pa.array(self.descriptions, pa.string()),
+            "is_watch": pa.array(list(map(bool, self.is_watch)), pa.bool_()),
+        })
+
+
+class SubscriptionColumns:
+    """Columnar store of subscriptions as parallel lists."""
+
+    __slots__ = ("channel_ids", "channel_titles", "subscribed_at")
+
+    def __init__(self) -> None:
+        self.channel_titles: list[str | None] = []
+        self.channel_ids: list[str | None] = []
+        self.subscribed_at: list[str | None] = []
+
+    @classmethod
+    def from_api(cls, subscriptions: Iterable[dict]) -> "SubscriptionColumns":
+        columns = cls()
+        for subscription in subscriptions:
+            record = SubscriptionRecord.from_api(subscription)
+            columns.channel_titles.append(record.channel_title)
+            columns.channel_ids.append(record.channel_id)
+            columns.subscribed_at.append(record.subscribed_at)
+        return columns
+
+    def __len__(self) -> int:
+        return len(self.channel_ids)
+
+    def __iter__(self) -> Iterator[SubscriptionRecord]:
+        return map(SubscriptionRecord, self.channel_titles, self.channel_ids, self.subscribed_at)
+
+    def to_dicts(self) -> list[dict]:
+        """Convert to the dicts tools return; only call this at the tool boundary."""
+        return [record.to_dict() for record in self]
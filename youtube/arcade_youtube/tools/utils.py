@@ -1,45 +1,75 @@
 import re
-
-from arcade_youtube.tools.constants import (
-    RESOURCE_ID_PATH,
-    SNIPPET_PATH,
-)
+from array import array
+from collections.abc import Iterable
+from functools import lru_cache
 
 
-def format_activity(activity: dict) -> dict:
-    """Format a YouTube activity into a standardized structure."""
-    snippet = activity.get("snippet", {})
+def get_activity_video_id(activity: dict) -> str | None:
+    """Extract the video ID from either a watch or a playlistItem activity."""
     content_details = activity.get("contentDetails", {})
-
-    # Extract video ID from either watch or playlistItem
-    video_id = None
+    video_id: str | None = None
     if "watch" in content_details:
         video_id = content_details["watch"].get("videoId")
     elif "playlistItem" in content_details:
         video_id = content_details["playlistItem"].get("resourceId", {}).get("videoId")
+    return video_id
+
+
+_DURATION_PATTERN = re.compile(
+    r"P(?:(?P<weeks>\d+)W)?(?:(?P<days>\d+)D)?"
+    r"(?:T(?:(?P<hours>\d+)H)?(?:(?P<minutes>\d+)M)?(?:(?P<seconds>\d+(?:[.,]\d+)?)S)?)?"
+)
+_DURATION_UNITS = {"weeks": 604800, "days": 86400, "hours": 3600, "minutes": 60}
 
-    return {
-        "title": snippet.get("title", ""),
-        "video_id": video_id,
-        "published_at": snippet.get("publishedAt", ""),
-        "channel_title": snippet.get("channelTitle", ""),
-        "description": snippet.get("description", ""),
-    }
+# Marks unparseable entries in parse_durations(..., strict=False)
+INVALID_DURATION = -1
 
 
-def format_subscription(subscription: dict) -> dict:
-    """Format subscription data into a clean structure."""
-    return {
-        "channel_title": subscription.get(SNIPPET_PATH, {}).get("title"),
-        "channel_id": subscription.get(SNIPPET_PATH, {}).get(RESOURCE_ID_PATH, {}).get("channelId"),
-        "subscribed_at": subscription.get(SNIPPET_PATH, {}).get("publishedAt"),
-    }
+class DurationParseError(ValueError):
+    """Raised when a string is not an ISO 8601 duration."""
 
+    def __init__(self, duration: object) -> None:
+        super().__init__(f"Invalid ISO 8601 duration: {duration!r}")
 
+
+@lru_cache(maxsize=4096)
 def parse_duration(duration: str) -> int:
-    """Parse ISO 8601 duration into seconds."""
-    match = re.match(r"PT(?:(\d+)H)?(?:(\d+)M)?(?:(\d+)S)?", duration)
-    if match:
-        hours, minutes, seconds = (int(x) if x else 0 for x in match.groups())
-        return hours * 3600 + minutes * 60 + seconds
-    return 0
+    """Parse an ISO 8601 duration such as PT1H2M3S, P1DT2H or PT4.5S into whole seconds.
+
+    Weeks and days are supported; fractional seconds are rounded. Anything that
+    is not a complete duration raises DurationParseError instead of counting as 0."""
+    match = _DURATION_PATTERN.fullmatch(duration) if isinstance(duration, str) else None
+    if not match or duration.endswith(("P", "T")):
+        raise DurationParseError(duration)
+    parts = match.groupdict()
+    seconds = float(parts.pop("seconds").replace(",", ".")) if parts["seconds"] else 0.0
+    seconds += sum(int(value) * _DURATION_UNITS[unit] for unit, value in parts.items() if value)
+    return int(seconds + 0.5)
+
+
+def parse_durations(durations: Iterable[str], strict: bool = True) -> array:
+    """Parse many ISO 8601 durations in one pass into an array('q') of seconds.
+
+    Repeated values are parsed once. With strict=False, unparseable entries
+    become INVALID_DURATION instead of raising DurationParseError. The array
+    exposes the buffer protocol, so numpy.frombuffer can wrap it without a copy."""
+    parsed: dict[str, int] = {}
+    result = array("q")
+    for duration in durations:
+        if not isinstance(duration, str):
+            # Possibly unhashable, so never looked up in `parsed`
+            if strict:
+                raise DurationParseError(duration)
+            result.append(INVALID_DURATION)
+            continue
+        seconds = parsed.get(duration)
+        if seconds is None:
+            try:
+                seconds = parse_duration(duration)
+            except DurationParseError:
+                if strict:
+                    raise
+                seconds = INVALID_DURATION
+            parsed[duration] = seconds
+        result.append(seconds)
+    return result
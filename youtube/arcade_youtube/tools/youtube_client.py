@@ -1,17 +1,36 @@
+import asyncio
 import logging
+import time
+from collections.abc import Iterable
+from itertools import islice
 from typing import Annotated
 
 from arcade.sdk import ToolContext, tool
 from arcade.sdk.auth import Google
 from google.oauth2.credentials import Credentials
 
-from arcade_youtube.core.backend import YouTubeBackend
+from arcade_youtube.core.async_backend import AsyncYouTubeBackend
+from arcade_youtube.core.constants import DEFAULT_MAX_RESULTS
+from arcade_youtube.core.projection import SUBSCRIPTION_SUMMARY, VIDEO_DURATION
+from arcade_youtube.core.scheduler import Priority
+from arcade_youtube.core.sync import get_sync_engine
+from arcade_youtube.tools.analytics import DEFAULT_TOP_CHANNELS, compute_watch_analytics
 from arcade_youtube.tools.constants import (
     CONTENT_DETAILS_PATH,
     WATCH_PATH,
     YOUTUBE_READONLY_SCOPE,
 )
-from arcade_youtube.tools.utils import format_activity, format_subscription, parse_duration
+from arcade_youtube.tools.records import (
+    ACTIVITY_FIELD_PATHS,
+    ActivityColumns,
+    SubscriptionColumns,
+    from_epoch,
+)
+from arcade_youtube.tools.utils import (
+    INVALID_DURATION,
+    get_activity_video_id,
+    parse_durations,
+)
 
 # Set up logging
 logging.basicConfig(level=logging.DEBUG)
@@ -22,29 +41,15 @@ async def get_watch_history(
     context: ToolContext,
     credentials: Annotated[Credentials, "OAuth credentials for YouTube API"],
     limit: Annotated[int, "Number of history items to return"] = 5,
+    refresh: Annotated[
+        bool, "Ask YouTube for new activity even if it was checked within the last minute"
+    ] = False,
 ) -> list[dict]:
-    """Get recent watch history."""
-    backend = YouTubeBackend(credentials)
-    activities = backend.fetch_activities(max_results=limit)
-    logger.debug(f"Raw activities from API: {activities}")
-
-    # Process both watch and playlistItem activities
-    watch_activities = []
-    for activity in activities:
-        content_details = activity.get(CONTENT_DETAILS_PATH, {})
-        # Check for watch activity
-        watch_video_id = content_details.get(WATCH_PATH, {}).get("videoId")
-        playlist_video_id = content_details.get("playlistItem", {}) \
-            .get("resourceId", {}) \
-            .get("videoId")
-        if watch_video_id or playlist_video_id:
-            watch_activities.append(activity)
-
-    logger.debug(f"Filtered watch activities: {watch_activities}")
-
-    formatted = [format_activity(a) for a in watch_activities]
-    logger.debug(f"Formatted activities: {formatted}")
-    return formatted
+    """Get recent watch history.
+
+    History is served from a local copy that is synced with YouTube at most once
+    a minute, so videos watched since may be missing unless `refresh` is set."""
+    return await _watch_history(AsyncYouTubeBackend(credentials), limit, refresh)
 
 
 @tool(requires_auth=Google(scopes=[YOUTUBE_READONLY_SCOPE]))
@@ -55,40 +60,122 @@ async def get_subscriptions(
 ) -> list[dict]:
     """Get recent channel subscriptions."""
 
-    backend = YouTubeBackend(credentials)
-    subscriptions = backend.fetch_subscriptions(max_results=limit)
-    return list(map(format_subscription, subscriptions))
+    return await _subscriptions(AsyncYouTubeBackend(credentials), limit)
 
 
 @tool(requires_auth=Google(scopes=[YOUTUBE_READONLY_SCOPE]))
 async def get_watch_time_stats(
     context: ToolContext,
     credentials: Annotated[Credentials, "OAuth credentials for YouTube API"],
+    refresh: Annotated[
+        bool, "Ask YouTube for new activity even if it was checked within the last minute"
+    ] = False,
 ) -> dict:
-    """Get watch time statistics."""
+    """Get watch time statistics.
+
+    Computed from the local copy of the history, synced at most once a minute
+    unless `refresh` is set."""
 
-    backend = YouTubeBackend(credentials)
-    activities = backend.fetch_activities()
+    # Stats are the first thing shed when the daily quota runs low
+    backend = AsyncYouTubeBackend(credentials, priority=Priority.BACKGROUND)
+    return await _watch_time_stats(backend, refresh)
 
-    durations = []
-    for activity in activities:
-        content_details = activity.get(CONTENT_DETAILS_PATH, {})
-        watch_info = content_details.get(WATCH_PATH, {})
-        video_id = watch_info.get("videoId")
 
-        if not video_id:
-            continue
+@tool(requires_auth=Google(scopes=[YOUTUBE_READONLY_SCOPE]))
+async def get_watch_time_breakdown(
+    context: ToolContext,
+    credentials: Annotated[Credentials, "OAuth credentials for YouTube API"],
+    days: Annotated[int, "Number of days of history to analyze"] = 30,
+    utc_offset_minutes: Annotated[
+        int, "Viewer's offset from UTC in minutes, used for day and hour-of-day buckets"
+    ] = 0,
+    top_channels: Annotated[int, "Number of most-watched channels to include"] = (
+        DEFAULT_TOP_CHANNELS
+    ),
+    refresh: Annotated[
+        bool, "Ask YouTube for new activity even if it was checked within the last minute"
+    ] = False,
+) -> dict:
+    """Get watch time broken down by day, hour of day and channel, with percentiles.
+
+    Computed from the local copy of the history, synced at most once a minute
+    unless `refresh` is set."""
+
+    backend = AsyncYouTubeBackend(credentials, priority=Priority.BACKGROUND)
+    engine = get_sync_engine()
+    account = await engine.sync(backend, force=refresh)
+    since = from_epoch(int(time.time()) - days * 86400)
+    rows = engine.store.iter_activity_fields(account, ACTIVITY_FIELD_PATHS, published_after=since)
+    # Only activities with a watch or playlistItem video ID count
+    activities = ActivityColumns.from_fields(row for row in rows if any(row[-2:]))
+
+    # Every activity kept has a video ID
+    video_ids = [video_id or "" for video_id in activities.video_ids]
+    videos = await backend.fetch_video_details_batch(video_ids, VIDEO_DURATION)
+    durations = parse_durations(
+        (
+            videos.get(video_id, {}).get(CONTENT_DETAILS_PATH, {}).get("duration", "")
+            for video_id in video_ids
+        ),
+        strict=False,
+    )
+
+    return compute_watch_analytics(
+        activities,
+        durations,
+        utc_offset_minutes=utc_offset_minutes,
+        top_channels=top_channels,
+    )
+
+
+async def _watch_history(
+    backend: AsyncYouTubeBackend, limit: int, refresh: bool = False
+) -> list[dict]:
+    """Sync the backend's account and return its most recent watched videos."""
+    engine = get_sync_engine()
+    account = await engine.sync(backend, force=refresh, limit=limit)
+
+    # Process both watch and playlistItem activities from the synced local store
+    activities = engine.store.iter_activities(account)
+    watch_activities = ActivityColumns.from_api(
+        islice((a for a in activities if get_activity_video_id(a)), limit)
+    )
 
-        video = backend.fetch_video_details(video_id)
-        if not video:
-            continue
+    formatted = watch_activities.to_dicts()
+    logger.debug(f"Formatted activities: {formatted}")
+    return formatted
 
-        video_content = video.get(CONTENT_DETAILS_PATH, {})
-        duration = video_content.get("duration", "PT0S")
-        seconds = parse_duration(duration)
 
-        if seconds:
-            durations.append(seconds)
+async def _subscriptions(backend: AsyncYouTubeBackend, limit: int) -> list[dict]:
+    """Return the backend's account's most recent subscriptions."""
+    subscriptions = await backend.fetch_subscriptions(
+        max_results=limit, projection=SUBSCRIPTION_SUMMARY
+    )
+    return SubscriptionColumns.from_api(subscriptions).to_dicts()
+
+
+async def _watch_time_stats(backend: AsyncYouTubeBackend, refresh: bool = False) -> dict:
+    """Sync the backend's account and total up the duration of its recent watches."""
+    engine = get_sync_engine()
+    account = await engine.sync(backend, force=refresh, limit=DEFAULT_MAX_RESULTS)
+    activities = list(islice(engine.store.iter_activities(account), DEFAULT_MAX_RESULTS))
+
+    video_ids = [
+        activity.get(CONTENT_DETAILS_PATH, {}).get(WATCH_PATH, {}).get("videoId")
+        for activity in activities
+    ]
+    # Chunks of video IDs are looked up concurrently, bounded by YOUTUBE_MAX_CONCURRENCY
+    videos = await backend.fetch_video_details_batch(video_ids, VIDEO_DURATION)
+
+    raw_durations = [
+        videos[video_id].get(CONTENT_DETAILS_PATH, {}).get("duration", "PT0S")
+        for video_id in video_ids
+        if video_id in videos
+    ]
+    parsed = parse_durations(raw_durations, strict=False)
+    if INVALID_DURATION in parsed:
+        logger.warning(f"Skipping {parsed.count(INVALID_DURATION)} videos with invalid durations")
+    durations = [seconds for seconds in parsed if seconds > 0]
 
     total = sum(durations)
     count = len(durations)
@@ -99,3 +186,36 @@ async def get_watch_time_stats(
         "video_count": count,
         "average_duration": round(total / count if count else 0, 2),
     }
+
+
+class UnknownAccountOperationError(ValueError):
+    """Raised when `fetch_account_overview` is asked for an operation it does not know."""
+
+    def __init__(self, names: list[str]) -> None:
+        super().__init__(f"Unknown account operations: {', '.join(names)}")
+
+
+# Per-account work available to `fetch_account_overview`
+ACCOUNT_OPERATIONS = {
+    "history": lambda backend, limit: _watch_history(backend, limit),
+    "subscriptions": lambda backend, limit: _subscriptions(backend, limit),
+    "stats": lambda backend, limit: _watch_time_stats(backend),
+}
+
+
+async def fetch_account_overview(
+    backend: Annotated[AsyncYouTubeBackend, "Backend for the account to inspect"],
+    operations: Annotated[
+        Iterable[str], "Keys of ACCOUNT_OPERATIONS to run"
+    ] = tuple(ACCOUNT_OPERATIONS),
+    limit: Annotated[int, "Number of history items and subscriptions to return"] = 5,
+) -> dict:
+    """Run several per-account operations concurrently, keyed by operation name.
+
+    Meant as the per-account step of `arcade_youtube.core.fanout.fan_out`."""
+    names = list(dict.fromkeys(operations))
+    unknown = [name for name in names if name not in ACCOUNT_OPERATIONS]
+    if unknown:
+        raise UnknownAccountOperationError(unknown)
+    results = await asyncio.gather(*(ACCOUNT_OPERATIONS[name](backend, limit) for name in names))
+    return dict(zip(names, results, strict=True))
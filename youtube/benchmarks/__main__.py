@@ -0,0 +1,93 @@
+"""Run the benchmark suite and compare it with the stored baseline.
+
+    python -m benchmarks                      # small profile, compare with baseline.json
+    python -m benchmarks --profile large --latency 0.05 --only tool.
+    python -m benchmarks --update-baseline    # record the current numbers
+
+Exits with status 1 if any scenario regressed or went over its time budget."""
+
+import argparse
+import asyncio
+import dataclasses
+import logging
+import sys
+
+from benchmarks.fake_youtube import FakeYouTubeServer
+from benchmarks.suite import (
+    BASELINE_PATH,
+    PROFILES,
+    compare,
+    exceeded_budgets,
+    load_baseline,
+    run_suite,
+    save_baseline,
+)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Offline benchmarks against a fake YouTube API")
+    parser.add_argument("--profile", choices=PROFILES, default="small", help="dataset size")
+    parser.add_argument("--activities", type=int, help="override the profile's activity count")
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds per API request")
+    parser.add_argument("--jitter", type=float, default=0.0, help="extra random latency")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="share of failing requests")
+    parser.add_argument("--repeat", type=int, default=3, help="timed runs per scenario")
+    parser.add_argument("--only", help="run scenarios whose name contains this text")
+    parser.add_argument("--baseline", default=str(BASELINE_PATH))
+    parser.add_argument("--update-baseline", action="store_true")
+    parser.add_argument("--time-tolerance", type=float, default=0.5)
+    parser.add_argument("--memory-tolerance", type=float, default=0.25)
+    args = parser.parse_args()
+
+    # The tools log every formatted item at DEBUG, which would dominate the timings
+    logging.disable(logging.INFO)
+
+    dataset = PROFILES[args.profile]
+    if args.activities is not None:
+        dataset = dataclasses.replace(dataset, activities=args.activities)
+    # Baselines are only comparable under the conditions they were recorded in
+    profile = args.profile
+    if args.activities is not None or args.latency or args.jitter or args.error_rate:
+        profile = (
+            f"{args.profile}:activities={dataset.activities},latency={args.latency},"
+            f"jitter={args.jitter},error_rate={args.error_rate}"
+        )
+
+    with FakeYouTubeServer(dataset, args.latency, args.jitter, args.error_rate) as server:
+        results = asyncio.run(run_suite(server, args.repeat, args.only))
+
+    print(f"{'scenario':40} {'wall s':>9} {'calls':>7} {'quota':>7} {'peak KiB':>10}")
+    for name, measurement in results.items():
+        print(
+            f"{name:40} {measurement.wall_time:9.4f} {measurement.api_calls:7d}"
+            f" {measurement.quota_units:7d} {measurement.peak_memory / 1024:10.1f}"
+        )
+
+    # Budgets are absolute targets, checked whatever the baseline says
+    exceeded = exceeded_budgets(results)
+    for name, wall_time, budget in exceeded:
+        print(f"OVER BUDGET {name}: {wall_time}s, budget {budget}s")
+
+    if args.update_baseline:
+        save_baseline(args.baseline, profile, results)
+        print(f"\nBaseline for {profile!r} written to {args.baseline}")
+        return 1 if exceeded else 0
+
+    baseline = load_baseline(args.baseline, profile)
+    if not baseline:
+        print(f"\nNo baseline for {profile!r}; record one with --update-baseline")
+        return 1 if exceeded else 0
+    regressions = [
+        c
+        for c in compare(results, baseline, args.time_tolerance, args.memory_tolerance)
+        if c.regressed
+    ]
+    for c in regressions:
+        print(f"REGRESSION {c.name} {c.metric}: {c.baseline} -> {c.current} ({c.change:+.0%})")
+    if not regressions:
+        print(f"\nNo regressions against the {profile!r} baseline")
+    return 1 if regressions or exceeded else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
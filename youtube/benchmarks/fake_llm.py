@@ -0,0 +1,197 @@
+"""Local stand-in for an OpenAI-compatible chat completions endpoint.
+
+Answers POST /v1/chat/completions with a canned analysis that fits
+`app.models.AIAnalysis`, streamed as server-sent events when the request asks
+for it. Batch prompts get one analysis per "Video ID:" line, keyed by ID. The
+time to the first token and the delay between chunks are configurable, so the
+load harness can model a slow model without paying for one.
+
+Run it on its own with `python -m benchmarks.fake_llm` and point the app at it
+with LLM_BASE_URL."""
+
+import argparse
+import json
+import re
+import threading
+import time
+from dataclasses import asdict, dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Annotated, Any
+
+ANALYSIS = {
+    "educational_score": 6.5,
+    "topics": ["strategy", "history"],
+    "age_appropriateness": "All Ages",
+    "learning_potential": "Medium",
+    "concerns": [],
+    "explanation": "Synthetic analysis returned by the fake LLM endpoint.",
+}
+
+_VIDEO_ID = re.compile(r"^Video ID: (\S+)$", re.MULTILINE)
+
+
+@dataclass
+class FakeLLMStats:
+    requests: int = 0
+    in_flight: int = 0
+    peak_in_flight: int = 0
+
+    def as_dict(self) -> dict[str, int]:
+        return asdict(self)
+
+
+class FakeLLMServer:
+    """Threaded HTTP server answering chat completions after a configurable delay."""
+
+    def __init__(
+        self,
+        latency: Annotated[float, "Seconds before the first token"] = 0.0,
+        chunk_delay: Annotated[float, "Seconds between streamed chunks"] = 0.0,
+        chunks: Annotated[int, "Number of chunks a streamed answer is split into"] = 8,
+        host: str = "127.0.0.1",
+        port: Annotated[int, "Port to listen on, 0 picks a free one"] = 0,
+    ):
+        self.latency = latency
+        self.chunk_delay = chunk_delay
+        self.chunks = max(chunks, 1)
+        self.stats = FakeLLMStats()
+        self._lock = threading.Lock()
+        self._host = host
+        self._server = ThreadingHTTPServer((host, port), _handler(self))
+        self._server.daemon_threads = True
+        self._thread: threading.Thread | None = None
+
+    @property
+    def url(self) -> str:
+        """Base URL to use as LLM_BASE_URL."""
+        return f"http://{self._host}:{self._server.server_port}/v1"
+
+    def start(self) -> "FakeLLMServer":
+        self._thread = threading.Thread(
+            target=self._server.serve_forever, name="fake-llm", daemon=True
+        )
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+        if self._thread is not None:
+            self._thread.join()
+
+    def __enter__(self) -> "FakeLLMServer":
+        return self.start()
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.stop()
+
+    @staticmethod
+    def answer(prompt: str) -> str:
+        """The JSON text the model "writes" for a prompt."""
+        video_ids = _VIDEO_ID.findall(prompt)
+        if video_ids:
+            return json.dumps(dict.fromkeys(video_ids, ANALYSIS))
+        return json.dumps(ANALYSIS)
+
+    def split(self, content: str) -> list[str]:
+        size = -(-len(content) // self.chunks)
+        return [content[start : start + size] for start in range(0, len(content), size)]
+
+
+def _completion(model: str, content: str | None, delta: bool, finish: str | None) -> dict:
+    message = {"content": content} if content is not None else {}
+    if not delta:
+        message["role"] = "assistant"
+    return {
+        "id": "chatcmpl-fake",
+        "object": "chat.completion.chunk" if delta else "chat.completion",
+        "created": int(time.time()),
+        "model": model,
+        "choices": [
+            {
+                "index": 0,
+                "delta" if delta else "message": message,
+                "finish_reason": finish,
+            }
+        ],
+    }
+
+
+def _handler(server: FakeLLMServer) -> type[BaseHTTPRequestHandler]:
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_POST(self) -> None:
+            body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))))
+            if not self.path.rstrip("/").endswith("/chat/completions"):
+                self.send_error(404)
+                return
+            with server._lock:
+                server.stats.requests += 1
+                server.stats.in_flight += 1
+                server.stats.peak_in_flight = max(
+                    server.stats.peak_in_flight, server.stats.in_flight
+                )
+            try:
+                self._complete(body)
+            finally:
+                with server._lock:
+                    server.stats.in_flight -= 1
+
+        def _complete(self, body: dict[str, Any]) -> None:
+            prompt = body["messages"][-1]["content"]
+            model = body.get("model", "fake")
+            content = server.answer(prompt)
+            time.sleep(server.latency)
+            if not body.get("stream"):
+                payload = json.dumps(_completion(model, content, False, "stop")).encode()
+                self._send(200, "application/json", payload)
+                return
+            self.send_response(200)
+            self.send_header("Content-Type", "text/event-stream")
+            self.send_header("Transfer-Encoding", "chunked")
+            self.end_headers()
+            for index, piece in enumerate(server.split(content)):
+                if index and server.chunk_delay:
+                    time.sleep(server.chunk_delay)
+                self._write_event(json.dumps(_completion(model, piece, True, None)))
+            self._write_event(json.dumps(_completion(model, None, True, "stop")))
+            self._write_event("[DONE]")
+            self.wfile.write(b"0\r\n\r\n")
+
+        def _write_event(self, data: str) -> None:
+            payload = f"data: {data}\n\n".encode()
+            self.wfile.write(f"{len(payload):x}\r\n".encode() + payload + b"\r\n")
+            self.wfile.flush()
+
+        def _send(self, status: int, media_type: str, payload: bytes) -> None:
+            self.send_response(status)
+            self.send_header("Content-Type", media_type)
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def log_message(self, *args: Any) -> None:
+            # Keep the load test output free of a line per request
+            pass
+
+    return Handler
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--port", type=int, default=8091)
+    parser.add_argument("--latency", type=float, default=1.0, help="seconds to first token")
+    parser.add_argument("--chunk-delay", type=float, default=0.05)
+    args = parser.parse_args()
+    server = FakeLLMServer(args.latency, args.chunk_delay, port=args.port)
+    print(f"Serving a fake OpenAI-compatible API at {server.url}")
+    server.start()
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
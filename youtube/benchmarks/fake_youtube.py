@@ -0,0 +1,331 @@
+"""Local stand-in for the YouTube Data API list endpoints, serving synthetic data.
+
+Answers activities.list, subscriptions.list and videos.list the way the real API
+does as far as this toolkit cares: 50-item pages chained by nextPageToken,
+publishedAfter filtering, ETags with If-None-Match revalidation, and Google-style
+error bodies. Items are generated from their index on demand, so 100k activities
+cost no memory until they are requested. Part and field masks are ignored and
+every item is returned in full.
+
+Run it on its own with `python -m benchmarks.fake_youtube` and point the toolkit
+at it with YOUTUBE_API_ROOT."""
+
+import argparse
+import datetime
+import hashlib
+import json
+import random
+import threading
+import time
+from collections.abc import Callable
+from dataclasses import asdict, dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Annotated, Any
+from urllib.parse import parse_qs, urlsplit
+
+API_PATH = "/youtube/v3"
+MAX_PAGE_SIZE = 50
+
+
+def _hash(*parts: object) -> int:
+    """Deterministic pseudo-random integer for a tuple of values."""
+    digest = hashlib.blake2b(repr(parts).encode(), digest_size=8).digest()
+    return int.from_bytes(digest, "big")
+
+
+def _timestamp(seconds: float) -> str:
+    moment = datetime.datetime.fromtimestamp(seconds, datetime.timezone.utc)
+    return moment.strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+@dataclass
+class FakeDataset:
+    """Shape of the synthetic account: how much of everything, and how it is spread."""
+
+    activities: int = 1000
+    subscriptions: int = 200
+    videos: int = 500
+    channels: int = 50
+    # Seconds between consecutive activities, newest first from `now`
+    spacing: float = 3600.0
+    now: float = field(default_factory=lambda: float(int(time.time()) // 3600 * 3600))
+    seed: int = 0
+
+    def video_id(self, index: int) -> str:
+        return f"vid{index % self.videos:08d}"
+
+    def activity(self, index: int) -> dict[str, Any]:
+        """The index-th most recent activity: mostly watches, some playlist adds and others."""
+        video = _hash(self.seed, "activity", index) % self.videos
+        kind = ("watch", "watch", "watch", "playlistItem", "subscription")[index % 5]
+        channel = video % self.channels
+        details: dict[str, Any]
+        if kind == "watch":
+            details = {"watch": {"videoId": self.video_id(video)}}
+        elif kind == "playlistItem":
+            details = {"playlistItem": {"resourceId": {"videoId": self.video_id(video)}}}
+        else:
+            details = {"subscription": {"resourceId": {"channelId": self.channel_id(channel)}}}
+        return {
+            "kind": "youtube#activity",
+            "id": f"act{index:09d}",
+            "snippet": {
+                "publishedAt": _timestamp(self.now - index * self.spacing),
+                "title": f"Video {video}",
+                "description": f"Synthetic description of video {video}",
+                "channelId": self.channel_id(channel),
+                "channelTitle": f"Channel {channel}",
+                "type": kind,
+            },
+            "contentDetails": details,
+        }
+
+    def channel_id(self, index: int) -> str:
+        return f"UC{index:022d}"
+
+    def subscription(self, index: int) -> dict[str, Any]:
+        channel = index % self.channels
+        return {
+            "kind": "youtube#subscription",
+            "id": f"sub{index:09d}",
+            "snippet": {
+                "publishedAt": _timestamp(self.now - index * 86400),
+                "title": f"Channel {channel}",
+                "description": f"Synthetic channel {channel}",
+                "resourceId": {"kind": "youtube#channel", "channelId": self.channel_id(channel)},
+            },
+        }
+
+    def video(self, video_id: str) -> dict[str, Any] | None:
+        """Details of a video, or None for IDs the dataset does not contain."""
+        if not video_id.startswith("vid") or not video_id[3:].isdigit():
+            return None
+        index = int(video_id[3:])
+        if index >= self.videos:
+            return None
+        seconds = 30 + _hash(self.seed, "duration", index) % 7200
+        hours, rest = divmod(seconds, 3600)
+        minutes, seconds = divmod(rest, 60)
+        channel = index % self.channels
+        return {
+            "kind": "youtube#video",
+            "id": video_id,
+            "snippet": {
+                "publishedAt": _timestamp(self.now - 86400 * 365 - index * 600),
+                "title": f"Video {index}",
+                "description": f"Synthetic description of video {index}",
+                "channelId": self.channel_id(channel),
+                "channelTitle": f"Channel {channel}",
+                "categoryId": str(_hash(self.seed, "category", index) % 30),
+            },
+            "contentDetails": {"duration": f"PT{hours}H{minutes}M{seconds}S"},
+        }
+
+    def activities_after(self, published_after: str | None) -> int:
+        """Number of activities published at or after a timestamp (all of them without one)."""
+        if not published_after:
+            return self.activities
+        after = datetime.datetime.fromisoformat(published_after).timestamp()
+        if after > self.now:
+            return 0
+        return min(self.activities, int((self.now - after) // self.spacing) + 1)
+
+
+@dataclass
+class FakeAPIStats:
+    """What the server was asked for, per resource."""
+
+    requests: dict[str, int] = field(default_factory=dict)
+    not_modified: int = 0
+    errors: int = 0
+    items: int = 0
+    bytes_sent: int = 0
+
+    @property
+    def total_requests(self) -> int:
+        return sum(self.requests.values())
+
+    def as_dict(self) -> dict[str, Any]:
+        return {**asdict(self), "total_requests": self.total_requests}
+
+
+class FakeYouTubeServer:
+    """Threaded HTTP server answering YouTube list calls from a `FakeDataset`.
+
+    Every request sleeps `latency` seconds (plus up to `jitter`) before it is
+    answered, and fails with `error_status` with probability `error_rate`."""
+
+    def __init__(
+        self,
+        dataset: Annotated[FakeDataset | None, "Synthetic data to serve"] = None,
+        latency: Annotated[float, "Seconds added to every response"] = 0.0,
+        jitter: Annotated[float, "Up to this many extra seconds, uniformly random"] = 0.0,
+        error_rate: Annotated[float, "Probability that a request fails"] = 0.0,
+        error_status: Annotated[int, "Status of injected failures"] = 503,
+        host: str = "127.0.0.1",
+        port: Annotated[int, "Port to listen on, 0 picks a free one"] = 0,
+    ):
+        self.dataset = dataset or FakeDataset()
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.stats = FakeAPIStats()
+        self._random = random.Random(self.dataset.seed)  # noqa: S311
+        self._lock = threading.Lock()
+        self._host = host
+        self._server = ThreadingHTTPServer((host, port), _handler(self))
+        self._server.daemon_threads = True
+        self._thread: threading.Thread | None = None
+
+    @property
+    def url(self) -> str:
+        """Root URL to use as YOUTUBE_API_ROOT."""
+        return f"http://{self._host}:{self._server.server_port}"
+
+    def start(self) -> "FakeYouTubeServer":
+        self._thread = threading.Thread(
+            target=self._server.serve_forever, name="fake-youtube", daemon=True
+        )
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+        if self._thread is not None:
+            self._thread.join()
+
+    def __enter__(self) -> "FakeYouTubeServer":
+        return self.start()
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.stop()
+
+    def reset_stats(self) -> None:
+        with self._lock:
+            self.stats = FakeAPIStats()
+
+    def _delay_and_fail(self) -> bool:
+        """Sleep the injected latency; True if this request should fail."""
+        with self._lock:
+            delay = self.latency + self._random.uniform(0, self.jitter)
+            fail = self._random.random() < self.error_rate
+        if delay:
+            time.sleep(delay)
+        return fail
+
+    def respond(
+        self, resource: str, params: dict[str, str], etag: str | None
+    ) -> tuple[int, dict[str, Any] | None]:
+        """Status and JSON body for a list call; a None body means no content."""
+        with self._lock:
+            self.stats.requests[resource] = self.stats.requests.get(resource, 0) + 1
+        if self._delay_and_fail():
+            with self._lock:
+                self.stats.errors += 1
+            return self.error_status, _error(self.error_status, "backendError", "Injected failure")
+        if resource == "activities":
+            total = self.dataset.activities_after(params.get("publishedAfter"))
+            body = self._page("youtube#activityListResponse", self.dataset.activity, total, params)
+        elif resource == "subscriptions":
+            body = self._page(
+                "youtube#subscriptionListResponse",
+                self.dataset.subscription,
+                self.dataset.subscriptions,
+                params,
+            )
+        elif resource == "videos":
+            ids = [video_id for video_id in params.get("id", "").split(",") if video_id]
+            if len(ids) > MAX_PAGE_SIZE:
+                return 400, _error(400, "invalidParameter", "Too many video IDs")
+            items = [video for video in map(self.dataset.video, ids) if video is not None]
+            body = {"kind": "youtube#videoListResponse", "items": items}
+        else:
+            return 404, _error(404, "notFound", f"Unknown resource {resource}")
+        body["etag"] = hashlib.sha256(json.dumps(body, sort_keys=True).encode()).hexdigest()[:27]
+        if etag is not None and etag == body["etag"]:
+            with self._lock:
+                self.stats.not_modified += 1
+            return 304, None
+        with self._lock:
+            self.stats.items += len(body["items"])
+        return 200, body
+
+    @staticmethod
+    def _page(
+        kind: str,
+        item: Callable[[int], dict[str, Any]],
+        total: int,
+        params: dict[str, str],
+    ) -> dict[str, Any]:
+        size = max(0, min(int(params.get("maxResults", 5)), MAX_PAGE_SIZE))
+        token = params.get("pageToken", "")
+        offset = int(token[1:]) if token.startswith("p") and token[1:].isdigit() else 0
+        end = min(offset + size, total)
+        body: dict[str, Any] = {
+            "kind": kind,
+            "pageInfo": {"totalResults": total, "resultsPerPage": size},
+            "items": [item(index) for index in range(offset, end)],
+        }
+        if end < total:
+            body["nextPageToken"] = f"p{end}"
+        return body
+
+
+def _error(status: int, reason: str, message: str) -> dict[str, Any]:
+    return {"error": {"code": status, "message": message, "errors": [{"reason": reason}]}}
+
+
+def _handler(server: FakeYouTubeServer) -> type[BaseHTTPRequestHandler]:
+    class Handler(BaseHTTPRequestHandler):
+        # Keep-alive, so pooled transports reuse their connections as against the real API
+        protocol_version = "HTTP/1.1"
+
+        def do_GET(self) -> None:
+            url = urlsplit(self.path)
+            resource = url.path.removeprefix(API_PATH).strip("/")
+            params = {key: values[-1] for key, values in parse_qs(url.query).items()}
+            status, body = server.respond(resource, params, self.headers.get("If-None-Match"))
+            payload = json.dumps(body).encode() if body is not None else b""
+            self.send_response(status)
+            if body is not None:
+                self.send_header("Content-Type", "application/json; charset=UTF-8")
+                self.send_header("ETag", body.get("etag", ""))
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+            with server._lock:
+                server.stats.bytes_sent += len(payload)
+
+        def log_message(self, *args: Any) -> None:
+            # Keep the benchmark output free of a line per request
+            pass
+
+    return Handler
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--port", type=int, default=8090)
+    parser.add_argument("--activities", type=int, default=FakeDataset.activities)
+    parser.add_argument("--subscriptions", type=int, default=FakeDataset.subscriptions)
+    parser.add_argument("--videos", type=int, default=FakeDataset.videos)
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds per request")
+    parser.add_argument("--jitter", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    args = parser.parse_args()
+    dataset = FakeDataset(
+        activities=args.activities, subscriptions=args.subscriptions, videos=args.videos
+    )
+    server = FakeYouTubeServer(dataset, args.latency, args.jitter, args.error_rate, port=args.port)
+    print(f"Serving a fake YouTube Data API at {server.url}")
+    server.start()
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,298 @@
+"""Load test of the web app against local fake YouTube and LLM backends.
+
+Starts `app.web_interface:app` under uvicorn in a subprocess, wired to the fake
+YouTube Data API and a fake OpenAI-compatible endpoint, then keeps
+`--concurrency` clients requesting the target paths for `--duration` seconds
+and reports throughput and p50/p95/p99 latency per path.
+
+A probe requests a cheap endpoint at a steady rate alongside the load. Its
+latency should stay flat whatever the load does; when it rises with the
+target's latency, something is blocking the event loop.
+
+    python -m benchmarks.load --concurrency 50 --duration 30
+    python -m benchmarks.load --path /api/analyze-latest/stream --no-analysis-cache \\
+        --llm-latency 2 --fail-probe-p99 0.1"""
+
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass
+from pathlib import Path
+
+import httpx
+
+from benchmarks.fake_llm import FakeLLMServer
+from benchmarks.fake_youtube import FakeDataset, FakeYouTubeServer
+
+PROJECT_ROOT = Path(__file__).parent.parent
+PROBE_PATH = "/api/analysis-stats"
+
+
+class WebAppStartupError(RuntimeError):
+    """Raised when the web app under test exits or does not answer in time."""
+
+    def __init__(self, returncode: int | None = None) -> None:
+        if returncode is None:
+            super().__init__("The web app did not start in time")
+        else:
+            super().__init__(f"The web app exited with status {returncode}")
+
+
+@dataclass
+class LatencySummary:
+    """Throughput and latency percentiles, in seconds, of a set of requests."""
+
+    requests: int
+    errors: int
+    throughput: float
+    p50: float
+    p95: float
+    p99: float
+    max: float
+
+    @classmethod
+    def from_samples(cls, latencies: list[float], errors: int, elapsed: float) -> "LatencySummary":
+        ordered = sorted(latencies)
+        return cls(
+            requests=len(ordered),
+            errors=errors,
+            throughput=round(len(ordered) / elapsed, 2) if elapsed else 0.0,
+            p50=round(percentile(ordered, 50), 4),
+            p95=round(percentile(ordered, 95), 4),
+            p99=round(percentile(ordered, 99), 4),
+            max=round(ordered[-1], 4) if ordered else 0.0,
+        )
+
+    def as_dict(self) -> dict[str, float]:
+        return asdict(self)
+
+
+def percentile(ordered: list[float], q: float) -> float:
+    """Nearest-rank percentile of already sorted values."""
+    if not ordered:
+        return 0.0
+    rank = max(1, -(-len(ordered) * q // 100))
+    return ordered[int(rank) - 1]
+
+
+@dataclass
+class Samples:
+    latencies: list[float]
+    errors: int = 0
+
+    def record(self, latency: float, ok: bool) -> None:
+        self.latencies.append(latency)
+        if not ok:
+            self.errors += 1
+
+
+async def _timed_get(http: httpx.AsyncClient, path: str, samples: Samples) -> None:
+    started = time.perf_counter()
+    try:
+        # Streaming endpoints count as done once their whole body has arrived
+        response = await http.get(path)
+        ok = response.is_success
+    except httpx.HTTPError:
+        ok = False
+    samples.record(time.perf_counter() - started, ok)
+
+
+async def generate_load(
+    base_url: str,
+    paths: list[str],
+    concurrency: int,
+    duration: float,
+    probe_interval: float,
+) -> tuple[dict[str, Samples], Samples, float]:
+    """Keep `concurrency` clients busy for `duration` seconds, cycling through `paths`.
+
+    Returns the samples per path, the probe's samples and the elapsed time."""
+    samples = {path: Samples([]) for path in paths}
+    probe = Samples([])
+    cycle = itertools.cycle(paths)
+    # One connection per client plus one for the probe
+    limits = httpx.Limits(
+        max_connections=concurrency + 1, max_keepalive_connections=concurrency + 1
+    )
+    timeout = httpx.Timeout(300.0)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=timeout) as http:
+        deadline = time.perf_counter() + duration
+
+        async def client() -> None:
+            while time.perf_counter() < deadline:
+                path = next(cycle)
+                await _timed_get(http, path, samples[path])
+
+        async def prober() -> None:
+            while time.perf_counter() < deadline:
+                await _timed_get(http, PROBE_PATH, probe)
+                await asyncio.sleep(probe_interval)
+
+        started = time.perf_counter()
+        await asyncio.gather(prober(), *(client() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+    return samples, probe, elapsed
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port: int = sock.getsockname()[1]
+        return port
+
+
+@contextmanager
+def web_app(env: dict[str, str], workers: int, startup_timeout: float = 30.0) -> Iterator[str]:
+    """Run the web app under uvicorn in a subprocess and yield its base URL."""
+    port = _free_port()
+    command = [
+        sys.executable,
+        "-m",
+        "uvicorn",
+        "app.web_interface:app",
+        "--host",
+        "127.0.0.1",
+        "--port",
+        str(port),
+        "--workers",
+        str(workers),
+        "--log-level",
+        "warning",
+        "--no-access-log",
+    ]
+    process = subprocess.Popen(command, cwd=PROJECT_ROOT, env={**os.environ, **env})  # noqa: S603
+    url = f"http://127.0.0.1:{port}"
+    try:
+        deadline = time.monotonic() + startup_timeout
+        while True:
+            if process.poll() is not None:
+                raise WebAppStartupError(process.returncode)
+            try:
+                if httpx.get(url + PROBE_PATH, timeout=1.0).is_success:
+                    break
+            except httpx.HTTPError:
+                pass
+            if time.monotonic() > deadline:
+                raise WebAppStartupError()
+            time.sleep(0.1)
+        yield url
+    finally:
+        process.terminate()
+        try:
+            process.wait(timeout=30)
+        except subprocess.TimeoutExpired:
+            process.kill()
+
+
+def app_environment(
+    youtube: FakeYouTubeServer, llm: FakeLLMServer, state_dir: str, analysis_cache: bool
+) -> dict[str, str]:
+    """Environment pointing the app at the fakes, with its state in a scratch directory."""
+    env = {
+        "YOUTUBE_API_ROOT": youtube.url,
+        "LLM_BASE_URL": llm.url,
+        "ARCADE_API_KEY": "load-test",
+        # Without a refresh token this token is never refreshed; blank out any .env one
+        "YOUTUBE_TOKEN": "load-test",
+        "YOUTUBE_REFRESH_TOKEN": "",
+        "YOUTUBE_ACCOUNTS_FILE": "",
+        "YOUTUBE_DAILY_QUOTA": str(10**9),
+        "YOUTUBE_CACHE_PATH": os.path.join(state_dir, "metadata.sqlite3"),
+        "YOUTUBE_ACTIVITY_STORE_PATH": os.path.join(state_dir, "activities.sqlite3"),
+        "YOUTUBE_TOKEN_STORE_PATH": os.path.join(state_dir, "tokens.sqlite3"),
+        "ANALYSIS_CACHE_PATH": os.path.join(state_dir, "analyses.sqlite3"),
+        "MONITOR_LOCK_PATH": os.path.join(state_dir, "monitor.lock"),
+        "MONITOR_EVENTS_PATH": os.path.join(state_dir, "events.sqlite3"),
+    }
+    if not analysis_cache:
+        # Every analysis goes to the LLM: nothing is cached or confidently pre-classified
+        env["ANALYSIS_CACHE_TTL"] = "0"
+        env["PRECLASSIFIER_THRESHOLD"] = "2"
+    return env
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Load test the web app against fake backends")
+    parser.add_argument("--path", action="append", dest="paths", help="path to request, repeatable")
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--duration", type=float, default=20.0, help="seconds of measured load")
+    parser.add_argument("--warmup", type=float, default=2.0, help="seconds of unmeasured load")
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn worker processes")
+    parser.add_argument("--activities", type=int, default=1000)
+    parser.add_argument("--youtube-latency", type=float, default=0.05)
+    parser.add_argument("--llm-latency", type=float, default=1.0, help="seconds to first token")
+    parser.add_argument("--llm-chunk-delay", type=float, default=0.02)
+    parser.add_argument("--no-analysis-cache", dest="analysis_cache", action="store_false")
+    parser.add_argument("--probe-interval", type=float, default=0.05)
+    parser.add_argument("--json", action="store_true", help="print the report as JSON")
+    parser.add_argument("--fail-p99", type=float, help="exit 1 if any path's p99 exceeds this")
+    parser.add_argument(
+        "--fail-probe-p99", type=float, help="exit 1 if the probe's p99 exceeds this"
+    )
+    args = parser.parse_args()
+    paths = args.paths or ["/api/analyze-latest"]
+
+    youtube = FakeYouTubeServer(
+        FakeDataset(activities=args.activities), latency=args.youtube_latency
+    )
+    llm = FakeLLMServer(latency=args.llm_latency, chunk_delay=args.llm_chunk_delay)
+    with youtube, llm, tempfile.TemporaryDirectory() as state_dir:
+        env = app_environment(youtube, llm, state_dir, args.analysis_cache)
+        with web_app(env, args.workers) as url:
+            if args.warmup:
+                asyncio.run(generate_load(url, paths, args.concurrency, args.warmup, 1.0))
+            youtube.reset_stats()
+            llm_requests = llm.stats.requests
+            samples, probe, elapsed = asyncio.run(
+                generate_load(url, paths, args.concurrency, args.duration, args.probe_interval)
+            )
+
+    summaries = {
+        path: LatencySummary.from_samples(s.latencies, s.errors, elapsed)
+        for path, s in samples.items()
+    }
+    probe_summary = LatencySummary.from_samples(probe.latencies, probe.errors, elapsed)
+    report = {
+        "concurrency": args.concurrency,
+        "duration": round(elapsed, 2),
+        "paths": {path: summary.as_dict() for path, summary in summaries.items()},
+        "probe": probe_summary.as_dict(),
+        "youtube_requests": youtube.stats.total_requests,
+        "llm_requests": llm.stats.requests - llm_requests,
+        "llm_peak_in_flight": llm.stats.peak_in_flight,
+    }
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print(
+            f"{args.concurrency} clients for {elapsed:.1f}s; "
+            f"{report['youtube_requests']} YouTube and {report['llm_requests']} LLM requests\n"
+        )
+        print(f"{'path':36} {'req/s':>8} {'errors':>7} {'p50':>8} {'p95':>8} {'p99':>8}")
+        for path, summary in [*summaries.items(), (f"{PROBE_PATH} (probe)", probe_summary)]:
+            print(
+                f"{path:36} {summary.throughput:8.1f} {summary.errors:7d}"
+                f" {summary.p50:8.4f} {summary.p95:8.4f} {summary.p99:8.4f}"
+            )
+
+    failed = False
+    if args.fail_p99 is not None:
+        failed |= any(summary.p99 > args.fail_p99 for summary in summaries.values())
+    if args.fail_probe_p99 is not None:
+        failed |= probe_summary.p99 > args.fail_probe_p99
+    failed |= any(summary.errors for summary in summaries.values())
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
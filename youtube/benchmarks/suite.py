@@ -0,0 +1,289 @@
+"""Benchmarks of the tools and web endpoints against the fake YouTube Data API.
+
+Each scenario runs against fresh in-memory caches, activity store and quota
+scheduler, so it measures a cold start unless it is marked warm, in which case
+it is run once untimed first. Rate limits are lifted so timings reflect the code
+rather than the request budget; quota units are still counted."""
+
+import asyncio
+import json
+import statistics
+import time
+import tracemalloc
+from collections.abc import Awaitable, Callable
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, cast
+
+import httpx
+from google.auth.credentials import AnonymousCredentials
+from google.oauth2.credentials import Credentials
+
+from arcade_youtube.core import cache, client, coalesce, scheduler, sync
+from arcade_youtube.core.backend import YouTubeBackend
+from arcade_youtube.tools.analytics import compute_watch_analytics
+from arcade_youtube.tools.records import ACTIVITY_FIELD_PATHS, ActivityColumns
+from arcade_youtube.tools.utils import parse_durations
+from benchmarks.fake_youtube import FakeDataset, FakeYouTubeServer
+
+BASELINE_PATH = Path(__file__).parent / "baseline.json"
+
+# Growth below these absolute amounts is noise, whatever the relative change
+MIN_TIME_DELTA = 0.01
+MIN_MEMORY_DELTA = 64 * 1024
+
+# Activities in the analytics scenario, whatever the profile, and the most seconds it may take
+ANALYTICS_ACTIVITIES = 100_000
+BUDGETS = {"analytics.watch_time_breakdown.100k": 1.0}
+
+# Dataset sizes selectable with --profile
+PROFILES = {
+    "small": FakeDataset(activities=1_000, subscriptions=200, videos=500),
+    "medium": FakeDataset(activities=10_000, subscriptions=2_000, videos=5_000),
+    "large": FakeDataset(activities=100_000, subscriptions=10_000, videos=50_000),
+}
+
+
+@dataclass
+class Measurement:
+    """Cost of one scenario: median wall time, API traffic and peak traced memory."""
+
+    wall_time: float
+    api_calls: int
+    quota_units: int
+    peak_memory: int
+
+    def as_dict(self) -> dict[str, Any]:
+        return asdict(self)
+
+
+@dataclass
+class Scenario:
+    name: str
+    run: Callable[[], Awaitable[Any]]
+    # Run once before measuring, so caches and the activity store are populated
+    warm: bool = False
+
+
+def anonymous_credentials() -> Credentials:
+    """Credentials that send no Authorization header, which is all the fake API needs."""
+    return cast(Credentials, AnonymousCredentials())
+
+
+def reset_state(api_root: str) -> None:
+    """Swap every process-wide singleton for a fresh one talking to `api_root`."""
+    cache._default_cache = cache.MetadataCache(":memory:")
+    sync._default_store = sync.ActivityStore(":memory:")
+    sync._default_engine = sync.ActivitySyncEngine(sync._default_store)
+    scheduler._default_scheduler = scheduler.QuotaScheduler(
+        daily_quota=10**9, project_rate=1e6, credential_rate=1e6
+    )
+    coalesce._default_single_flight = coalesce.SingleFlight()
+    client._default_factory = client.YouTubeClientFactory(api_root=api_root)
+
+
+def tool_scenarios(credentials: Credentials, dataset: FakeDataset) -> list[Scenario]:
+    from arcade_youtube.tools.youtube_client import (
+        get_subscriptions,
+        get_watch_history,
+        get_watch_time_breakdown,
+        get_watch_time_stats,
+    )
+
+    def video_details() -> Awaitable[dict]:
+        backend = YouTubeBackend(credentials)
+        ids = [dataset.video_id(index) for index in range(min(dataset.videos, 1000))]
+        return asyncio.to_thread(backend.fetch_video_details_batch, ids)
+
+    return [
+        Scenario(
+            "tool.get_watch_history",
+            lambda: get_watch_history(None, credentials=credentials, limit=50),
+        ),
+        Scenario(
+            "tool.get_subscriptions",
+            lambda: get_subscriptions(None, credentials=credentials, limit=dataset.subscriptions),
+        ),
+        Scenario("tool.get_watch_time_stats", lambda: get_watch_time_stats(None, credentials)),
+        Scenario(
+            "tool.get_watch_time_stats.warm",
+            lambda: get_watch_time_stats(None, credentials),
+            warm=True,
+        ),
+        Scenario(
+            "tool.get_watch_time_breakdown",
+            lambda: get_watch_time_breakdown(None, credentials=credentials, days=30),
+        ),
+        Scenario("backend.fetch_video_details_batch", video_details),
+        Scenario("backend.fetch_video_details_batch.warm", video_details, warm=True),
+    ]
+
+
+def analytics_scenarios(seed: int) -> list[Scenario]:
+    """The watch-time breakdown's local work: stored activities to analytics, no API calls."""
+    dataset = FakeDataset(
+        activities=ANALYTICS_ACTIVITIES, videos=ANALYTICS_ACTIVITIES // 2, seed=seed
+    )
+    store: sync.ActivityStore | None = None
+    durations: dict[str, str] = {}
+
+    def populate() -> sync.ActivityStore:
+        # Built on the untimed warm-up run and kept, since it outlives reset_state
+        nonlocal store
+        if store is None:
+            store = sync.ActivityStore(":memory:")
+            store.append("bench", [dataset.activity(index) for index in range(dataset.activities)])
+            for index in range(dataset.videos):
+                video = dataset.video(dataset.video_id(index)) or {}
+                durations[dataset.video_id(index)] = video["contentDetails"]["duration"]
+        return store
+
+    async def breakdown() -> dict[str, Any]:
+        rows = populate().iter_activity_fields("bench", ACTIVITY_FIELD_PATHS)
+        columns = ActivityColumns.from_fields(row for row in rows if any(row[-2:]))
+        seconds = parse_durations(
+            (durations.get(video_id or "", "") for video_id in columns.video_ids), strict=False
+        )
+        return compute_watch_analytics(columns, seconds)
+
+    return [Scenario("analytics.watch_time_breakdown.100k", breakdown, warm=True)]
+
+
+def endpoint_scenarios(credentials: Credentials) -> list[Scenario]:
+    from app import web_interface
+
+    # Endpoints look the credentials up on every request
+    web_interface.get_credentials = lambda: credentials
+    transport = httpx.ASGITransport(app=web_interface.app)
+
+    def get(path: str) -> Callable[[], Awaitable[httpx.Response]]:
+        async def request() -> httpx.Response:
+            async with httpx.AsyncClient(transport=transport, base_url="http://bench") as http:
+                response = await http.get(path)
+            response.raise_for_status()
+            return response
+
+        return request
+
+    return [
+        Scenario("api.history", get("/api/history?limit=100")),
+        Scenario("api.history.warm", get("/api/history?limit=100"), warm=True),
+        Scenario("api.subscriptions", get("/api/subscriptions?limit=100")),
+        Scenario("api.watch_analytics", get("/api/watch-analytics?days=30")),
+        Scenario("api.accounts_overview", get("/api/accounts/overview")),
+    ]
+
+
+async def measure(scenario: Scenario, server: FakeYouTubeServer, repeat: int) -> Measurement:
+    """Time a scenario `repeat` times, then run it once more under tracemalloc."""
+    credentials = anonymous_credentials()
+    times: list[float] = []
+    for _ in range(repeat + 1):
+        reset_state(server.url)
+        if scenario.warm:
+            await scenario.run()
+        server.reset_stats()
+        quota_before = scheduler.get_quota_scheduler().used(credentials)
+        tracing = len(times) == repeat
+        if tracing:
+            tracemalloc.start()
+        started = time.perf_counter()
+        await scenario.run()
+        elapsed = time.perf_counter() - started
+        if tracing:
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+        else:
+            times.append(elapsed)
+    return Measurement(
+        wall_time=round(statistics.median(times), 4),
+        api_calls=server.stats.total_requests,
+        quota_units=scheduler.get_quota_scheduler().used(credentials) - quota_before,
+        peak_memory=peak,
+    )
+
+
+async def run_suite(
+    server: FakeYouTubeServer, repeat: int = 3, selected: str | None = None
+) -> dict[str, Measurement]:
+    credentials = anonymous_credentials()
+    scenarios = [
+        *tool_scenarios(credentials, server.dataset),
+        *analytics_scenarios(server.dataset.seed),
+        *endpoint_scenarios(credentials),
+    ]
+    results = {}
+    for scenario in scenarios:
+        if selected and selected not in scenario.name:
+            continue
+        results[scenario.name] = await measure(scenario, server, repeat)
+    return results
+
+
+def exceeded_budgets(results: dict[str, Measurement]) -> list[tuple[str, float, float]]:
+    """Scenarios slower than their entry in BUDGETS, with their wall time and budget."""
+    return [
+        (name, results[name].wall_time, budget)
+        for name, budget in BUDGETS.items()
+        if name in results and results[name].wall_time > budget
+    ]
+
+
+@dataclass
+class Comparison:
+    name: str
+    metric: str
+    baseline: float
+    current: float
+    regressed: bool
+
+    @property
+    def change(self) -> float:
+        return (self.current - self.baseline) / self.baseline if self.baseline else 0.0
+
+
+def compare(
+    results: dict[str, Measurement],
+    baseline: dict[str, dict[str, Any]],
+    time_tolerance: float,
+    memory_tolerance: float,
+) -> list[Comparison]:
+    """Compare results with a baseline.
+
+    API calls and quota units are deterministic and may not grow at all; wall
+    time and peak memory may grow by their tolerance, a fraction of the baseline,
+    or by MIN_TIME_DELTA and MIN_MEMORY_DELTA, whichever is larger."""
+    tolerances = {
+        "wall_time": (time_tolerance, MIN_TIME_DELTA),
+        "peak_memory": (memory_tolerance, MIN_MEMORY_DELTA),
+        "api_calls": (0.0, 0),
+        "quota_units": (0.0, 0),
+    }
+    comparisons = []
+    for name, measurement in results.items():
+        if name not in baseline:
+            continue
+        for metric, (tolerance, floor) in tolerances.items():
+            before = baseline[name][metric]
+            after = getattr(measurement, metric)
+            allowed = max(before * tolerance, floor)
+            comparisons.append(Comparison(name, metric, before, after, after > before + allowed))
+    return comparisons
+
+
+def load_baseline(path: Path | str, profile: str) -> dict[str, dict[str, Any]]:
+    path = Path(path)
+    if not path.exists():
+        return {}
+    stored: dict[str, dict[str, dict[str, Any]]] = json.loads(path.read_text())
+    return stored.get(profile, {})
+
+
+def save_baseline(path: Path | str, profile: str, results: dict[str, Measurement]) -> None:
+    path = Path(path)
+    stored = json.loads(path.read_text()) if path.exists() else {}
+    stored[profile] = {
+        **stored.get(profile, {}),
+        **{name: measurement.as_dict() for name, measurement in results.items()},
+    }
+    path.write_text(json.dumps(stored, indent=2, sort_keys=True) + "\n")
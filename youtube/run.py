@@ -7,4 +7,6 @@ import uvicorn
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 if __name__ == "__main__":
+    # Pick up template edits without restarting, like reload=True does for code
+    os.environ.setdefault("RELOAD_ASSETS", "1")
     uvicorn.run("app.web_interface:app", host="127.0.0.1", port=8000, reload=True)
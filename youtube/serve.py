@@ -0,0 +1,29 @@
+import os
+import sys
+
+import uvicorn
+
+# Add the current directory to Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+CACHE_DIR = os.path.expanduser("~/.cache/arcade_youtube")
+
+if __name__ == "__main__":
+    # Every worker opens the same SQLite files, so video metadata, watch history,
+    # analyses and refreshed tokens are fetched once and shared by all of them,
+    # a lock file elects the single worker that polls for new videos and refreshes
+    # tokens at startup, and its events reach clients connected to any worker
+    os.environ.setdefault("YOUTUBE_TOKEN_STORE_PATH", os.path.join(CACHE_DIR, "tokens.sqlite3"))
+    os.environ.setdefault("MONITOR_LOCK_PATH", os.path.join(CACHE_DIR, "monitor.lock"))
+    os.environ.setdefault("MONITOR_EVENTS_PATH", os.path.join(CACHE_DIR, "events.sqlite3"))
+    os.makedirs(CACHE_DIR, exist_ok=True)
+
+    uvicorn.run(
+        "app.web_interface:app",
+        # Local only unless HOST is set, e.g. to 0.0.0.0 behind a proxy or in a container
+        host=os.getenv("HOST", "127.0.0.1"),
+        port=int(os.getenv("PORT", "8000")),
+        workers=int(os.getenv("WEB_CONCURRENCY", str(os.cpu_count() or 1))),
+        timeout_graceful_shutdown=30,
+        proxy_headers=True,
+    )